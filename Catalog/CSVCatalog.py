@@ -0,0 +1,377 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                      CSV Catalog Version 1.0                           |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Loads the CSV files exported by the ATNF pulsar catalog web interface  |
+    | (e.g. psrcat_web_output_short_csv_noerrors.txt, or the 17 column       |
+    | psrcat_web_output_detailed.txt), into a columnar PulsarCatalog. The    |
+    | columns present are found from the header row, and only the columns    |
+    | asked for are converted, each in a single numpy operation.             |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+import os
+
+import numpy as np
+
+from CatalogParser import STRING_PARAMETERS
+from Categorical import encode
+from CatalogStore import CatalogStore
+from PulsarCatalog import PulsarCatalog
+
+# Header labels (upper case, units and spaces removed) which differ from the
+# catalog parameter key of the column.
+HEADER_KEYS = {"BINARYPERIOD"  : "PB",
+               "SEMI-MAJORAXIS": "A1"}
+
+# The markers used by the web interface for a missing value.
+MISSING_MARKERS = ["*", ""]
+
+# The number of rows read at a time by chunks(). At 17 columns a chunk of
+# text takes roughly 100MB while it is converted.
+CHUNK_ROWS = 100000
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class CSVCatalog:
+    """
+    Reads a web interface CSV export, for example:
+
+    catalog = CSVCatalog(["NAME","P0","P1"]).load("psrcat_web_output_detailed.txt")
+    periods = catalog["P0"]            # float64 array, NaN where missing.
+
+    The header row, e.g. "#,NAME,Gl(deg),Gb(deg),P0(s),P1,F0(Hz),DM", names
+    the columns. Each label is mapped to a catalog parameter key by removing
+    its units, so "Gl(deg)" becomes GL, and "Binary Period (days)" becomes
+    PB. The first column, "#", holds the row number in the catalog.
+
+    Text columns (those in STRING_PARAMETERS) are loaded as string arrays,
+    with "" marking missing values. Every other column is loaded as a
+    float64 array with NaN marking missing values, and in place of any
+    field that is not a number.
+
+    With compact set, each numeric column is then narrowed to the smallest
+    type able to hold its values (see PulsarCatalog.compactType()), e.g.
+    GL, GB and DM become float32, and the row number "#" becomes int16.
+    The spin parameters (e.g. P0, P1 and F0) always stay float64.
+
+    Text columns with few distinct values, such as BINARY and BINCOMP, can
+    instead be loaded dictionary encoded, by loadCategorical().
+
+    Files too large to hold in memory, e.g. synthetic populations of many
+    millions of pulsars, can be read a chunk of rows at a time:
+
+    for chunk in CSVCatalog(["P0","P1"]).chunks("population.csv",100000):
+        ...                            # chunk is a PulsarCatalog.
+
+    A CSV file already converted to binary form by Data/ParseCSVFile.py may
+    be loaded in the same way, by passing the path of the converted store
+    directory. Its columns are then memory mapped rather than parsed.
+    """
+
+    def __init__(self,usecols=None,compact=False):
+        """
+        Creates a new loader.
+
+        Parameters:
+        usecols    -    optional list of the parameter keys of the columns to
+                        load, e.g. ["GL","GB"]. All columns are loaded if None.
+        compact    -    if True numeric columns are narrowed after loading.
+
+        Returns:
+        N/A
+        """
+
+        self.usecols = usecols
+        self.compact = compact
+
+    # ****************************************************************************************************
+
+    def columnKey(self,label):
+        """
+        Returns the parameter key of a header label, e.g. "P0 (s)" becomes "P0".
+        """
+
+        key = label.split("(")[0].strip().upper().replace(" ","")
+
+        return HEADER_KEYS.get(key,key)
+
+    # ****************************************************************************************************
+
+    def readHeader(self,path):
+        """
+        Reads the parameter keys of the columns in a CSV file.
+
+        Parameters:
+        path    -    the path to the CSV file.
+
+        Returns:
+        a list of parameter keys, in column order.
+        """
+
+        csvFile = open(path,'r')
+
+        header = ""
+        for line in csvFile:
+            if(line.strip()):
+                header = line
+                break
+
+        csvFile.close()
+
+        return [self.columnKey(label) for label in header.rstrip('\r\n').split(",")]
+
+    # ****************************************************************************************************
+
+    def toText(self,values):
+        """
+        Converts a list of field strings to a string array, with "" for missing values.
+        """
+
+        column = np.array(values,dtype=str)
+        column[column == "*"] = ""
+
+        return column
+
+    # ****************************************************************************************************
+
+    def toFloat(self,values):
+        """
+        Converts a list of field strings to a float64 array, with NaN for
+        missing values. The conversion is done by numpy in one operation.
+        Fields which are not numbers (e.g. from a corrupted line) are also
+        converted to NaN, so the column is always numeric.
+
+        Returns:
+        the array.
+        """
+
+        # The extra "nan" widens the string type to hold it, however short
+        # the fields are (e.g. a column of "*" alone is of type <U1).
+        column = np.array(list(values) + ["nan"],dtype=str)[:-1]
+        column[np.isin(column,MISSING_MARKERS)] = "nan"
+
+        try:
+            return column.astype(np.float64)
+        except ValueError:
+            return np.array([self.toNumber(value) for value in column],dtype=np.float64)
+
+    # ****************************************************************************************************
+
+    def toNumber(self,value):
+        """
+        Converts a single field string to a float, NaN if it is not a number.
+        """
+
+        try:
+            return float(value)
+        except ValueError:
+            return np.nan
+
+    # ****************************************************************************************************
+
+    def load(self,path):
+        """
+        Loads a CSV file.
+
+        Parameters:
+        path    -    the path to the CSV file, or to a converted store directory.
+
+        Returns:
+        a PulsarCatalog holding the columns asked for.
+        """
+
+        if(os.path.isdir(path)):
+            catalog = CatalogStore(path).read(self.usecols)
+            return catalog.compact() if self.compact else catalog
+
+        csvFile = open(path,'r')
+        lines = [line.rstrip('\r\n') for line in csvFile if line.strip()]
+        csvFile.close()
+
+        if(not lines):
+            return PulsarCatalog()
+
+        keys = [self.columnKey(label) for label in lines[0].split(",")]
+
+        usecols = self.selectColumns(keys,path)
+        catalog = self.toCatalog(keys,usecols,self.schema(usecols),lines[1:])
+
+        return catalog.compact() if self.compact else catalog
+
+    # ****************************************************************************************************
+
+    def selectColumns(self,keys,path):
+        """
+        Returns the parameter keys of the columns to load from a file.
+
+        Parameters:
+        keys    -    the parameter keys of the columns in the file.
+        path    -    the path to the file, used in error messages.
+
+        Returns:
+        a list of parameter keys.
+        """
+
+        if(self.usecols is None):
+            return keys
+
+        unknown = [key for key in self.usecols if key not in keys]
+
+        if(unknown):
+            raise ValueError("Columns " + ", ".join(unknown) + " not found in " + path +
+                             ", which holds " + ", ".join(keys) + ".")
+
+        return self.usecols
+
+    # ****************************************************************************************************
+
+    def schema(self,usecols):
+        """
+        Returns the type of each column, found from its parameter key alone:
+        str for the keys in STRING_PARAMETERS, and np.float64 for the rest.
+        The values in a file never change the type of a column, so every
+        chunk of a file read by chunks() has the same column types.
+
+        Parameters:
+        usecols    -    the parameter keys of the columns to load.
+
+        Returns:
+        a dictionary mapping each parameter key to its type.
+        """
+
+        return dict((key, str if key in STRING_PARAMETERS else np.float64) for key in usecols)
+
+    # ****************************************************************************************************
+
+    def toCatalog(self,keys,usecols,schema,lines):
+        """
+        Converts lines of a CSV file to a catalog.
+
+        Parameters:
+        keys       -    the parameter keys of the columns in the file.
+        usecols    -    the parameter keys of the columns to convert.
+        schema     -    the type of each column, see schema().
+        lines      -    the lines to convert, without the header row.
+
+        Returns:
+        a PulsarCatalog.
+        """
+
+        # Split each line once. Short lines are padded as missing values.
+        width = len(keys)
+        rows = [line.split(",") for line in lines]
+        rows = [row if len(row) >= width else row + ["*"] * (width - len(row)) for row in rows]
+
+        columns = {}
+        for key in usecols:
+            index = keys.index(key)
+            values = [row[index].strip() for row in rows]
+
+            if(schema[key] is str):
+                columns[key] = self.toText(values)
+            else:
+                columns[key] = self.toFloat(values)
+
+        return PulsarCatalog(columns)
+
+    # ****************************************************************************************************
+
+    def chunks(self,path,chunkRows=CHUNK_ROWS):
+        """
+        Reads a CSV file a chunk of rows at a time. Only one chunk is held
+        in memory at once, however large the file. The column types are
+        fixed once, from the header (see schema()), so a numeric column is
+        float64 in every chunk, even one where all its values are missing.
+        Chunks are never compacted, even with compact set, as narrowing
+        each chunk on its own would give the chunks different types.
+
+        Parameters:
+        path         -    the path to the CSV file, or to a converted store directory.
+        chunkRows    -    the number of rows in each chunk.
+
+        Returns:
+        a generator of PulsarCatalog objects, one per chunk.
+        """
+
+        if(os.path.isdir(path)):
+            # The columns are memory mapped, so each chunk is only paged in
+            # when it is sliced.
+            catalog = CatalogStore(path).read(self.usecols)
+
+            for start in range(0,len(catalog),chunkRows):
+                yield catalog.select(slice(start,start + chunkRows))
+
+            return
+
+        csvFile = open(path,'r')
+
+        try:
+            keys = None
+            lines = []
+
+            for line in csvFile:
+                if(not line.strip()):
+                    continue
+
+                line = line.rstrip('\r\n')
+
+                if(keys is None):
+                    keys = [self.columnKey(label) for label in line.split(",")]
+                    usecols = self.selectColumns(keys,path)
+                    schema = self.schema(usecols)
+                    continue
+
+                lines.append(line)
+
+                if(len(lines) == chunkRows):
+                    yield self.toCatalog(keys,usecols,schema,lines)
+                    lines = []
+
+            if(lines):
+                yield self.toCatalog(keys,usecols,schema,lines)
+        finally:
+            csvFile.close()
+
+    # ****************************************************************************************************
+
+    def loadCategorical(self,path,name):
+        """
+        Loads a text column dictionary encoded. From a converted store
+        directory only the integer codes are read, and nothing is decoded.
+
+        Parameters:
+        path    -    the path to the CSV file, or to a converted store directory.
+        name    -    the parameter key of the column, e.g. "BINCOMP".
+
+        Returns:
+        a Categorical.
+        """
+
+        if(os.path.isdir(path)):
+            return CatalogStore(path).categorical(name)
+
+        return encode(CSVCatalog([name]).load(path)[name])
+
+    # ****************************************************************************************************
@@ -0,0 +1,256 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                     Catalog Cache Version 1.0                          |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Persistent binary cache of parsed catalog data. The first time a       |
+    | source file is loaded its parsed columns are written to a ColumnStore  |
+    | directory. Later loads memory map the stored columns instead of        |
+    | parsing text, for as long as the source file is unchanged.             |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+import os
+import hashlib
+
+from CatalogLoader import CatalogLoader
+from ColumnStore import ColumnStore
+from CSVCatalog import CSVCatalog
+from PulsarCatalog import PulsarCatalog
+from PulsarCatalog import DEFAULT_PARAMETERS
+
+# Incremented whenever the layout of cached data changes, so that caches
+# written by older code are rebuilt rather than misread.
+CACHE_FORMAT = 1
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class CatalogCache:
+    """
+    Caches PulsarCatalog objects built from source files. A cache entry is
+    keyed on the source file's size, modification time and SHA-1 content
+    hash:
+
+    - if the size and modification time match the cached values, the
+      cached columns are used straight away.
+    - if only the modification time differs, the content hash is computed.
+      If it matches, the file was touched but not changed, and the cached
+      columns are used (the stored modification time is refreshed).
+    - otherwise the catalog is rebuilt from the source and the cache entry
+      is replaced.
+
+    By default cache entries are stored alongside the source file, in a
+    directory named <source file>.cache.
+    """
+
+    def __init__(self,cacheDirectory=None,verbose=False):
+        """
+        Creates a new cache.
+
+        Parameters:
+        cacheDirectory    -    optional directory to hold cache entries. If
+                               None, entries are stored next to each source.
+        verbose           -    verbose debugging flag.
+
+        Returns:
+        N/A
+        """
+
+        self.cacheDirectory = cacheDirectory
+        self.verbose = verbose
+
+    # ****************************************************************************************************
+
+    def entryDirectory(self,path,variant):
+        """
+        Returns the directory used to cache a source file.
+
+        Parameters:
+        path       -    the path to the source file.
+        variant    -    a string distinguishing different builds of the same
+                        file (e.g. the parameters extracted from it).
+
+        Returns:
+        the path to the cache entry directory.
+        """
+
+        variantKey = hashlib.sha1(variant.encode("utf-8")).hexdigest()[0:12]
+
+        if(self.cacheDirectory is None):
+            return os.path.join(path + ".cache",variantKey)
+        else:
+            sourceKey = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[0:12]
+            return os.path.join(self.cacheDirectory,os.path.basename(path) + "_" + sourceKey,variantKey)
+
+    # ****************************************************************************************************
+
+    def contentHash(self,path):
+        """
+        Computes the SHA-1 hash of a file's contents, reading it in blocks.
+
+        Parameters:
+        path    -    the path to the file to hash.
+
+        Returns:
+        the hex digest of the file contents.
+        """
+
+        sha1 = hashlib.sha1()
+        sourceFile = open(path,'rb')
+
+        block = sourceFile.read(1 << 20)
+        while(block):
+            sha1.update(block)
+            block = sourceFile.read(1 << 20)
+
+        sourceFile.close()
+
+        return sha1.hexdigest()
+
+    # ****************************************************************************************************
+
+    def load(self,path,builder,variant=""):
+        """
+        Returns the catalog built from a source file, using the cache where
+        it is still valid.
+
+        Parameters:
+        path       -    the path to the source file.
+        builder    -    a function which takes the source path, and returns
+                        a freshly built PulsarCatalog.
+        variant    -    a string distinguishing different builds of the same file.
+
+        Returns:
+        a PulsarCatalog, whose columns are memory mapped if read from the cache.
+        """
+
+        store = ColumnStore(self.entryDirectory(path,variant))
+        status = os.stat(path)
+
+        if(store.exists()):
+            names, metadata = store.readManifest()
+
+            if(metadata.get("format") == CACHE_FORMAT and metadata.get("size") == status.st_size):
+
+                if(metadata.get("mtime") == status.st_mtime):
+                    return self.restore(store)
+
+                # Touched, but possibly unchanged...
+                if(metadata.get("sha1") == self.contentHash(path)):
+                    metadata["mtime"] = status.st_mtime
+                    store.writeMetadata(names,metadata)
+                    return self.restore(store)
+
+        if(self.verbose):
+            print("\tRebuilding catalog cache for: " + path)
+
+        catalog = builder(path)
+
+        metadata = {"format" : CACHE_FORMAT,
+                    "size"   : status.st_size,
+                    "mtime"  : status.st_mtime,
+                    "sha1"   : self.contentHash(path),
+                    "version": catalog.version}
+
+        try:
+            store.write(catalog.columns,metadata)
+        except (IOError, OSError):
+            # The cache is an optimisation only, so an unwritable cache
+            # location must not stop the catalog being used.
+            if(self.verbose):
+                print("\tUnable to write catalog cache for: " + path)
+
+        return catalog
+
+    # ****************************************************************************************************
+
+    def restore(self,store):
+        """
+        Reads a catalog back from a cache entry.
+
+        Parameters:
+        store    -    the ColumnStore holding the cache entry.
+
+        Returns:
+        the cached PulsarCatalog.
+        """
+
+        columns, metadata = store.read(mmap=True)
+
+        return PulsarCatalog(columns,str(metadata.get("version","")))
+
+    # ****************************************************************************************************
+
+    def loadDatabase(self,path,parameters=None,processes=1):
+        """
+        Returns the catalog held in a psrcat.db file, using the cache where
+        it is still valid.
+
+        Parameters:
+        path          -    the path to the psrcat.db file to load.
+        parameters    -    the parameters to load, see PulsarCatalog.loadDatabase.
+        processes     -    the number of processes used to parse the file,
+                           should the cache need to be rebuilt.
+
+        Returns:
+        a PulsarCatalog.
+        """
+
+        def builder(sourcePath):
+            if(processes == 1):
+                return PulsarCatalog().loadDatabase(sourcePath,parameters)
+            else:
+                return CatalogLoader(processes,parameters).load(sourcePath)
+
+        variant = "psrcat.db:" + ",".join(parameters or DEFAULT_PARAMETERS)
+
+        return self.load(path,builder,variant)
+
+    # ****************************************************************************************************
+
+    def loadCSV(self,path,usecols=None,compact=False):
+        """
+        Returns the catalog held in a web interface CSV export, using the
+        cache where it is still valid.
+
+        Parameters:
+        path       -    the path to the CSV file. A store directory converted
+                        by Data/ParseCSVFile.py is already binary, and is
+                        read directly rather than cached.
+        usecols    -    the columns to load, see CSVCatalog. All if None.
+        compact    -    if True numeric columns are narrowed, see CSVCatalog.
+
+        Returns:
+        a PulsarCatalog.
+        """
+
+        csvCatalog = CSVCatalog(usecols,compact)
+
+        if(os.path.isdir(path)):
+            return csvCatalog.load(path)
+
+        variant = "csv:" + ",".join(usecols or ["*"]) + (":compact" if compact else "")
+
+        return self.load(path,csvCatalog.load,variant)
+
+    # ****************************************************************************************************
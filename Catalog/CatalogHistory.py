@@ -0,0 +1,430 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                    Catalog History Version 1.0                         |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Stores many versions of the ATNF pulsar catalog in one indexed,        |
+    | columnar structure, with one row per pulsar per catalog version. The   |
+    | history of a parameter for one pulsar, or the whole catalog at one     |
+    | version, can then be read back without parsing any text.               |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | Required Command Line Arguments:                                       |
+    |                                                                        |
+    | -s (string) full path to the directory holding the history store.     |
+    |                                                                        |
+    **************************************************************************
+    | Optional Command Line Arguments:                                       |
+    |                                                                        |
+    | Any further arguments are paths to psrcat.db files to ingest.          |
+    |                                                                        |
+    | -n (string) name of a pulsar (PSRJ) whose history should be printed.   |
+    |                                                                        |
+    | -q (string) comma separated parameters to print, e.g. "P0,DM".         |
+    |                                                                        |
+    | -p (int) number of processes used to parse catalog files.              |
+    |                                                                        |
+    | -v (boolean) verbose debugging flag.                                   |
+    |                                                                        |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+
+import os, sys
+
+import numpy as np
+
+from CatalogLoader import CatalogLoader
+from ColumnStore import ColumnStore
+from PulsarCatalog import PulsarCatalog
+
+# The column holding the index (into the list of versions) of each row.
+VERSION_COLUMN = "VERSION"
+
+# The column holding the rows of the store ordered by version.
+BY_VERSION_COLUMN = "BY_VERSION"
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class CatalogHistory:
+    """
+    A history of catalog versions held in a ColumnStore directory. Rows are
+    sorted by pulsar name (PSRJ) and then by version, so the rows of one
+    pulsar are contiguous and are found by binary search. A second stored
+    permutation orders the rows by version, so the rows of one version are
+    found the same way.
+
+    history = CatalogHistory("history_store")
+    history.ingest(["psrcat_1.53.db","psrcat_1.54.db"])
+    versions, DMs = history.history("J0006+1834","DM")
+    catalog = history.snapshot("1.54")
+    """
+
+    def __init__(self,storeDirectory=None,processes=1,verbose=False):
+        """
+        Creates a new history object.
+
+        Parameters:
+        storeDirectory    -    the directory holding the history store.
+        processes         -    the number of processes used to parse catalog files.
+        verbose           -    verbose debugging flag.
+
+        Returns:
+        N/A
+        """
+
+        self.store = ColumnStore(storeDirectory)
+        self.processes = processes
+        self.verbose = verbose
+
+        self.columns = None
+        self.versions = []
+
+    # ****************************************************************************************************
+
+    def versionKey(self,version):
+        """
+        Returns a key which sorts catalog versions numerically, so that for
+        example "1.9" comes before "1.10".
+        """
+
+        key = []
+        for part in version.split("."):
+            try:
+                key.append((0,int(part)))
+            except ValueError:
+                key.append((1,part))
+
+        return key
+
+    # ****************************************************************************************************
+
+    def open(self):
+        """
+        Opens the store for queries, memory mapping its columns. Called
+        automatically by the query methods.
+
+        Parameters:
+        N/A
+
+        Returns:
+        N/A
+        """
+
+        if(self.columns is not None):
+            return
+
+        if(self.store.exists()):
+            self.columns, metadata = self.store.read(mmap=True)
+            self.versions = [str(version) for version in metadata["versions"]]
+        else:
+            self.columns = {}
+            self.versions = []
+
+    # ****************************************************************************************************
+
+    def ingest(self,paths):
+        """
+        Adds catalog files to the store. A file whose version is already
+        held in the store replaces the rows of that version.
+
+        Parameters:
+        paths    -    the paths to the psrcat.db files to add.
+
+        Returns:
+        the versions that were added.
+        """
+
+        catalogs = CatalogLoader(self.processes).loadAll(paths)
+
+        # Existing rows, read fully into memory as the store is rewritten.
+        existing = {}
+        versions = []
+
+        if(self.store.exists()):
+            existing, metadata = self.store.read(mmap=False)
+            versions = [str(version) for version in metadata["versions"]]
+
+        added = []
+        for path, catalog in zip(paths,catalogs):
+            version = catalog.version or os.path.basename(path)
+            catalog.version = version
+            added.append(version)
+
+            if(version not in versions):
+                versions.append(version)
+
+        versions.sort(key=self.versionKey)
+        codes = dict((version,code) for code, version in enumerate(versions))
+
+        parts = []
+
+        # Existing rows not being replaced, with their version codes remapped.
+        if(existing):
+            oldVersions = [str(version) for version in metadata["versions"]]
+            oldCodes = np.array([codes[version] for version in oldVersions],dtype=np.int32)
+            keep = ~np.isin(existing[VERSION_COLUMN],[oldVersions.index(v) for v in added if v in oldVersions])
+
+            part = {}
+            for name, column in existing.items():
+                if(name != BY_VERSION_COLUMN):
+                    part[name] = column[keep]
+            part[VERSION_COLUMN] = oldCodes[part[VERSION_COLUMN]]
+            parts.append(part)
+
+        for catalog in catalogs:
+            part = dict(catalog.columns)
+            part[VERSION_COLUMN] = np.full(len(catalog),codes[catalog.version],dtype=np.int32)
+            parts.append(part)
+
+        columns = self.merge(parts)
+
+        # Sort by name then version, and record the version ordering.
+        order = np.lexsort((columns[VERSION_COLUMN],columns["PSRJ"]))
+        for name in columns.keys():
+            columns[name] = columns[name][order]
+
+        columns[BY_VERSION_COLUMN] = np.argsort(columns[VERSION_COLUMN],kind="mergesort")
+
+        self.store.write(columns,{"versions": versions})
+
+        self.columns = None
+        self.open()
+
+        return added
+
+    # ****************************************************************************************************
+
+    def merge(self,parts):
+        """
+        Concatenates column dictionaries, filling columns missing from some
+        parts with missing values (NaN, or the empty string).
+
+        Parameters:
+        parts    -    a list of dictionaries mapping names to columns.
+
+        Returns:
+        a dictionary of concatenated columns.
+        """
+
+        names = set()
+        for part in parts:
+            names.update(part.keys())
+
+        columns = {}
+        for name in names:
+            pieces = []
+            for part in parts:
+                n = len(part[VERSION_COLUMN])
+
+                if(name in part):
+                    pieces.append(part[name])
+                else:
+                    template = [p[name] for p in parts if name in p][0]
+                    if(template.dtype.kind in "SU"):
+                        pieces.append(np.zeros(n,dtype=template.dtype))
+                    else:
+                        pieces.append(np.full(n,np.nan))
+
+            columns[name] = np.concatenate(pieces)
+
+        return columns
+
+    # ****************************************************************************************************
+
+    def rowsFor(self,name):
+        """
+        Returns the slice of store rows holding the given pulsar.
+        """
+
+        self.open()
+
+        if(not self.columns):
+            return slice(0,0)
+
+        names = self.columns["PSRJ"]
+        key = np.array([name]).astype(names.dtype)[0]
+
+        # A name longer than the column is truncated by astype, and would
+        # then match a different pulsar. No stored name is that long.
+        if(len(key) != len(name)):
+            return slice(0,0)
+
+        start = np.searchsorted(names,key,side="left")
+        end   = np.searchsorted(names,key,side="right")
+
+        return slice(start,end)
+
+    # ****************************************************************************************************
+
+    def history(self,name,parameter):
+        """
+        Returns the values of one parameter for one pulsar, across all the
+        catalog versions that list the pulsar.
+
+        Parameters:
+        name         -    the PSRJ name of the pulsar.
+        parameter    -    the parameter key, e.g. "DM".
+
+        Returns:
+        a tuple (versions, values), holding a list of version strings and
+        a numpy array of the parameter values, oldest version first.
+        """
+
+        rows = self.rowsFor(name)
+        codes = self.columns[VERSION_COLUMN][rows] if self.columns else []
+
+        versions = [self.versions[code] for code in codes]
+        values = self.columns[parameter][rows] if self.columns else np.array([])
+
+        return versions, np.array(values)
+
+    # ****************************************************************************************************
+
+    def changes(self,name,parameter):
+        """
+        Returns the catalog versions in which a pulsar's parameter changed.
+
+        Parameters:
+        name         -    the PSRJ name of the pulsar.
+        parameter    -    the parameter key, e.g. "DM".
+
+        Returns:
+        a list of tuples (version, previous value, new value).
+        """
+
+        versions, values = self.history(name,parameter)
+
+        if(len(values) < 2):
+            return []
+
+        if(values.dtype.kind in "SU"):
+            changed = values[1:] != values[:-1]
+        else:
+            bothMissing = np.isnan(values[1:]) & np.isnan(values[:-1])
+            changed = (values[1:] != values[:-1]) & ~bothMissing
+
+        return [(versions[i + 1],values[i],values[i + 1]) for i in np.nonzero(changed)[0]]
+
+    # ****************************************************************************************************
+
+    def snapshot(self,version):
+        """
+        Returns the catalog as it was at a given version.
+
+        Parameters:
+        version    -    the catalog version, e.g. "1.54".
+
+        Returns:
+        a PulsarCatalog holding the rows of that version, sorted by PSRJ.
+        """
+
+        self.open()
+
+        if(version not in self.versions):
+            raise KeyError("Catalog version not in history store: " + version)
+
+        code = self.versions.index(version)
+        byVersion = self.columns[BY_VERSION_COLUMN]
+        sortedCodes = self.columns[VERSION_COLUMN][byVersion]
+
+        start = np.searchsorted(sortedCodes,code,side="left")
+        end   = np.searchsorted(sortedCodes,code,side="right")
+        rows  = byVersion[start:end]
+
+        columns = {}
+        for name, column in self.columns.items():
+            if(name not in (VERSION_COLUMN, BY_VERSION_COLUMN)):
+                columns[name] = column[rows]
+
+        return PulsarCatalog(columns,version)
+
+    # ****************************************************************************************************
+
+    def main(self,argv=None):
+        """
+        Main entry point for the Application. Ingests catalog files, and
+        prints the history of a pulsar if requested.
+
+        """
+
+        # ****************************************
+        #         Execution information
+        # ****************************************
+
+        print(__doc__)
+
+        # ****************************************
+        #    Command line argument processing
+        # ****************************************
+
+        # Python 2.4 argument processing.
+        parser = OptionParser()
+
+        # REQUIRED ARGUMENTS
+        parser.add_option("-s", action="store", dest="storePath",help='Directory holding the history store.',default="")
+
+        # OPTIONAL ARGUMENTS
+        parser.add_option("-n", action="store", dest="name",help='Pulsar (PSRJ) to print the history of (optional).',default="")
+        parser.add_option("-q", action="store", dest="parameters",help='Parameters to print (optional).',default="P0,F1,DM,W50")
+        parser.add_option("-p", action="store", dest="processes",type="int",help='Number of parsing processes (optional).',default=1)
+        parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+
+        (args,paths) = parser.parse_args()
+
+        if(args.storePath == ""):
+            print("\n\tYou must supply a history store directory via the -s flag.")
+            sys.exit()
+
+        self.store     = ColumnStore(args.storePath)
+        self.processes = args.processes
+        self.verbose   = args.verbose
+
+        if(paths):
+            for path in paths:
+                if(os.path.isfile(path) == False):
+                    print("\n\tCatalog file not found: " + path)
+                    sys.exit()
+
+            added = self.ingest(paths)
+            print("\n\tIngested versions: " + ", ".join(added))
+
+        self.open()
+        print("\tVersions in store: " + ", ".join(self.versions))
+
+        if(args.name != ""):
+            for parameter in args.parameters.split(","):
+                versions, values = self.history(args.name,parameter)
+                print("\n\t" + args.name + " " + parameter + ":")
+
+                for version, value in zip(versions,values):
+                    print("\t\t" + version + "\t" + str(value))
+
+        print("\n\tDone.")
+        print("\t**************************************************************************") # Used only for formatting purposes.
+
+    # ****************************************************************************************************
+
+if __name__ == '__main__':
+    CatalogHistory().main()
@@ -0,0 +1,180 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                    Catalog Loader Version 1.0                          |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Parses one or more psrcat.db files in parallel. Each file is split     |
+    | into chunks on '@' entry boundaries, the chunks are parsed across a    |
+    | pool of processes, and the results are merged into one columnar        |
+    | PulsarCatalog per file, in catalog file order.                         |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+import multiprocessing
+
+import numpy as np
+
+from CatalogParser import CatalogParser
+from PulsarCatalog import PulsarCatalog
+from PulsarCatalog import DEFAULT_PARAMETERS
+
+# ****************************************************************************************************
+
+def parseChunk(task):
+    """
+    Parses one chunk of catalog text into columns. This is a module level
+    function, rather than a method, so that it can be sent to worker
+    processes.
+
+    Parameters:
+    task    -    a tuple (index, text, parameters), where index identifies
+                 the file the chunk came from.
+
+    Returns:
+    a tuple (index, columns), where columns maps parameter keys to arrays.
+    """
+
+    index, text, parameters = task
+
+    catalogParser = CatalogParser(parameters)
+    catalog = PulsarCatalog().loadRecords(catalogParser.recordsFromLines(text.splitlines(True)),parameters)
+
+    return index, catalog.columns
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class CatalogLoader:
+    """
+    Loads psrcat.db files using a pool of worker processes, for example:
+
+    loader = CatalogLoader(processes=8)
+    catalog  = loader.load("Data/psrcat.db")
+    catalogs = loader.loadAll(["psrcat_1.53.db","psrcat_1.54.db"])
+
+    Chunks from all files are queued together, so many small files keep
+    every worker busy just as well as one large file does.
+    """
+
+    def __init__(self,processes=None,parameters=None,chunkSize=1 << 20):
+        """
+        Creates a new loader.
+
+        Parameters:
+        processes     -    the number of worker processes, defaults to the
+                           number of CPUs. With 1, files are parsed in this process.
+        parameters    -    the parameters to load, defaults to DEFAULT_PARAMETERS.
+        chunkSize     -    the approximate size of each chunk of text, in characters.
+
+        Returns:
+        N/A
+        """
+
+        self.processes = processes or multiprocessing.cpu_count()
+        self.parameters = list(parameters or DEFAULT_PARAMETERS)
+        self.chunkSize = chunkSize
+
+    # ****************************************************************************************************
+
+    def load(self,path):
+        """
+        Loads a single psrcat.db file.
+
+        Parameters:
+        path    -    the path to the psrcat.db file to load.
+
+        Returns:
+        a PulsarCatalog.
+        """
+
+        return self.loadAll([path])[0]
+
+    # ****************************************************************************************************
+
+    def tasks(self,paths):
+        """
+        Yields the chunks of every file as parse tasks, in file order.
+        """
+
+        for index, path in enumerate(paths):
+            for text in CatalogParser().chunks(path,self.chunkSize):
+                yield (index, text, self.parameters)
+
+    # ****************************************************************************************************
+
+    def loadAll(self,paths):
+        """
+        Loads several psrcat.db files.
+
+        Parameters:
+        paths    -    the paths to the psrcat.db files to load.
+
+        Returns:
+        a list of PulsarCatalog objects, one per file, in the same order.
+        """
+
+        results = [[] for path in paths]
+
+        if(self.processes == 1):
+            for task in self.tasks(paths):
+                index, columns = parseChunk(task)
+                results[index].append(columns)
+        else:
+            pool = multiprocessing.Pool(self.processes)
+
+            try:
+                # Hand tasks to the pool in batches, so only a few chunks of
+                # text are held in memory at once. map() keeps task order.
+                batch = []
+                for task in self.tasks(paths):
+                    batch.append(task)
+
+                    if(len(batch) == self.processes * 2):
+                        for index, columns in pool.map(parseChunk,batch):
+                            results[index].append(columns)
+                        batch = []
+
+                if(batch):
+                    for index, columns in pool.map(parseChunk,batch):
+                        results[index].append(columns)
+            finally:
+                pool.close()
+                pool.join()
+
+        catalogs = []
+        for path, chunks in zip(paths,results):
+            version = CatalogParser().readVersion(path)
+
+            if(not chunks):
+                catalogs.append(PulsarCatalog().loadRecords([],self.parameters))
+                catalogs[-1].version = version
+                continue
+
+            columns = {}
+            for name in chunks[0].keys():
+                columns[name] = np.concatenate([chunk[name] for chunk in chunks])
+
+            catalogs.append(PulsarCatalog(columns,version))
+
+        return catalogs
+
+    # ****************************************************************************************************
@@ -0,0 +1,342 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                    Catalog Parser Version 1.0                          |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Streaming parser for ATNF pulsar catalog database files (psrcat.db).   |
+    | The file is read incrementally, and one typed record is produced for   |
+    | each '@-----' delimited block. Parameter keys are resolved through a   |
+    | dispatch table, rather than a chain of startswith() tests.             |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Catalog parameters whose values are text rather than numbers. Every other
+# parameter found in the catalog is converted to a float.
+STRING_PARAMETERS = frozenset(["PSRJ", "PSRB", "NAME", "RAJ", "DECJ", "DEC",
+                               "TYPE", "BINARY", "BINCOMP", "ASSOC", "SURVEY",
+                               "EPHEM", "CLK", "UNITS", "OSURVEY"])
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class CatalogParser:
+    """
+    Parses an ATNF pulsar catalog database file, yielding one record for
+    each pulsar entry. A record is a dictionary mapping a parameter key
+    (e.g. "P0") to its typed value (e.g. 0.69374767047). Parameters that
+    are absent from a catalog entry are absent from its record.
+
+    Example input (extract from catalog file, top entry):
+
+    #CATALOGUE 1.54
+    #
+    PSRJ     J0006+1834                    cnt96
+    RAJ      00:06:04.8               2    cn95
+    DECJ     +18:34:59                4    cn95
+    P0       0.69374767047            14   cn95
+    DM       12.0                     6    cn95
+    @-----------------------------------------------------------------
+
+    produces the record:
+
+    {"PSRJ": "J0006+1834", "RAJ": "00:06:04.8", "DECJ": "+18:34:59",
+     "P0": 0.69374767047, "DM": 12.0}
+    """
+
+    def __init__(self,parameters=None):
+        """
+        Creates a new parser.
+
+        Parameters:
+        parameters    -    the catalog parameters to extract (e.g. ["PSRJ","P0"]).
+                           If None, every parameter in the file is extracted.
+
+        Returns:
+        N/A
+        """
+
+        self.parameters = parameters
+
+        # The version of the catalog, read from the '#CATALOGUE' header line.
+        self.version = ""
+
+        # The dispatch table, mapping a parameter key to its converter.
+        self.converters = {}
+
+        if(parameters is not None):
+            for parameter in parameters:
+                self.converters[parameter] = self.converterFor(parameter)
+
+    # ****************************************************************************************************
+
+    def converterFor(self,parameter):
+        """
+        Returns the function used to convert values of the given parameter.
+
+        Parameters:
+        parameter    -    the catalog parameter key, e.g. "P0".
+
+        Returns:
+        a function which converts a value string to its typed value.
+        """
+
+        if(parameter in STRING_PARAMETERS):
+            return str
+        else:
+            return float
+
+    # ****************************************************************************************************
+
+    def records(self,path):
+        """
+        Reads the catalog file at the specified path incrementally, yielding
+        one record per catalog entry.
+
+        Parameters:
+        path    -    the path to the psrcat.db file to parse.
+
+        Returns:
+        a generator of records (dictionaries).
+        """
+
+        catalogFile = open(path,'r') # Read only access
+
+        try:
+            for record in self.recordsFromLines(catalogFile):
+                yield record
+        finally:
+            catalogFile.close()
+
+    # ****************************************************************************************************
+
+    def recordsFromLines(self,lines):
+        """
+        Yields one record per catalog entry found in an iterable of lines.
+        Entries are terminated by lines beginning with '@'. A final entry
+        without a terminating '@' line is also returned.
+
+        Parameters:
+        lines    -    an iterable of catalog file lines (e.g. an open file).
+
+        Returns:
+        a generator of records (dictionaries).
+        """
+
+        converters = self.converters
+        extractAll = self.parameters is None
+        record = {}
+
+        for line in lines:
+            first = line[0:1]
+
+            if(first == '@'):
+                # End of the current entry.
+                if(record):
+                    yield record
+                record = {}
+
+            elif(first == '#'):
+                if(line.startswith("#CATALOGUE")):
+                    components = line.split()
+                    if(len(components) > 1):
+                        self.version = components[1]
+
+            else:
+                components = line.split()
+
+                # Ignore empty lines, and keys without values.
+                if(len(components) < 2):
+                    continue
+
+                key = components[0]
+                converter = converters.get(key)
+
+                if(converter is None):
+                    if(not extractAll):
+                        continue
+                    converter = self.converterFor(key)
+                    converters[key] = converter
+
+                try:
+                    record[key] = converter(components[1])
+                except ValueError:
+                    # Malformed value, treat the parameter as missing.
+                    pass
+
+        if(record):
+            yield record
+
+    # ****************************************************************************************************
+
+    def blocks(self,path):
+        """
+        Reads the catalog file at the specified path incrementally, yielding
+        the raw text of each catalog entry. Blocks can be parsed later on
+        with parseBlock().
+
+        Parameters:
+        path    -    the path to the psrcat.db file to read.
+
+        Returns:
+        a generator of strings, one per catalog entry.
+        """
+
+        catalogFile = open(path,'r') # Read only access
+
+        try:
+            for block in self.blocksFromLines(catalogFile):
+                yield block
+        finally:
+            catalogFile.close()
+
+    # ****************************************************************************************************
+
+    def blocksFromLines(self,lines):
+        """
+        Yields the raw text of each catalog entry found in an iterable of
+        lines. Comment lines, blank lines and '@' separators are not
+        included in the text.
+
+        Parameters:
+        lines    -    an iterable of catalog file lines (e.g. an open file).
+
+        Returns:
+        a generator of strings, one per catalog entry.
+        """
+
+        block = []
+
+        for line in lines:
+            first = line[0:1]
+
+            if(first == '@'):
+                if(block):
+                    yield "".join(block)
+                block = []
+
+            elif(first == '#'):
+                if(line.startswith("#CATALOGUE")):
+                    components = line.split()
+                    if(len(components) > 1):
+                        self.version = components[1]
+
+            elif(line.strip()):
+                block.append(line)
+
+        if(block):
+            yield "".join(block)
+
+    # ****************************************************************************************************
+
+    def chunks(self,path,chunkSize=1 << 20):
+        """
+        Reads the catalog file at the specified path in chunks of roughly
+        chunkSize characters. Each chunk is extended to the end of the
+        catalog entry it stops in, so chunks always hold whole entries and
+        can be parsed independently (e.g. by recordsFromLines()).
+
+        Parameters:
+        path         -    the path to the psrcat.db file to read.
+        chunkSize    -    the approximate size of each chunk, in characters.
+
+        Returns:
+        a generator of strings, one per chunk.
+        """
+
+        catalogFile = open(path,'r') # Read only access
+
+        try:
+            while(True):
+                text = catalogFile.read(chunkSize)
+
+                if(not text):
+                    break
+
+                if(not text.endswith("\n")):
+                    text += catalogFile.readline()
+
+                # Find the start of the last line in the chunk.
+                lastLine = text.rfind("\n",0,len(text) - 1) + 1
+                tail = []
+
+                if(text[lastLine:lastLine + 1] != "@"):
+                    # Read on to the '@' line which closes the entry.
+                    line = catalogFile.readline()
+                    while(line):
+                        tail.append(line)
+                        if(line.startswith("@")):
+                            break
+                        line = catalogFile.readline()
+
+                yield text + "".join(tail)
+        finally:
+            catalogFile.close()
+
+    # ****************************************************************************************************
+
+    def readVersion(self,path):
+        """
+        Reads the catalog version from the header of a catalog file,
+        without parsing the rest of the file.
+
+        Parameters:
+        path    -    the path to the psrcat.db file to read.
+
+        Returns:
+        the catalog version string, e.g. "1.54", or "" if there is none.
+        """
+
+        catalogFile = open(path,'r') # Read only access
+
+        for line in catalogFile:
+            if(line.startswith("#CATALOGUE")):
+                components = line.split()
+                if(len(components) > 1):
+                    self.version = components[1]
+                break
+            elif(not line.startswith("#")):
+                break
+
+        catalogFile.close()
+
+        return self.version
+
+    # ****************************************************************************************************
+
+    def parseBlock(self,text):
+        """
+        Parses the text of a single catalog entry.
+
+        Parameters:
+        text    -    the text of one catalog entry, i.e. the lines between
+                     two '@' separator lines.
+
+        Returns:
+        the record (dictionary) for the entry, empty if it holds no parameters.
+        """
+
+        for record in self.recordsFromLines(text.splitlines()):
+            return record
+
+        return {}
+
+    # ****************************************************************************************************
@@ -0,0 +1,396 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                     Catalog Query Version 1.0                          |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | A small filter language for selecting pulsars from columnar catalog    |
+    | data, similar in spirit to the conditions accepted by psrcat's -l      |
+    | flag. A condition such as "P0 < 0.03 && P1 < 1e-16 && DM > 0" is       |
+    | compiled once, then evaluated as whole column numpy operations.        |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+import re
+import operator
+
+import numpy as np
+
+# Regular expression splitting a condition into tokens.
+TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?) |
+        (?P<string>'[^']*'|"[^"]*") |
+        (?P<name>[A-Za-z_][A-Za-z0-9_]*) |
+        (?P<operator>&&|\|\||<=|>=|==|!=|<|>|!|\+|-|\*|/|\(|\))
+    )""",re.VERBOSE)
+
+# Comparison operators, mapped to their numpy implementations.
+COMPARISONS = {"<" : operator.lt, "<=": operator.le,
+               ">" : operator.gt, ">=": operator.ge,
+               "==": operator.eq, "!=": operator.ne}
+
+# Arithmetic operators, mapped to their numpy implementations.
+ARITHMETIC = {"+": operator.add, "-": operator.sub,
+              "*": operator.mul, "/": operator.truediv}
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class CatalogQuery:
+    """
+    Compiles a condition into a function of catalog columns. Conditions may
+    use:
+
+    - parameter names (e.g. P0, DM), which are looked up in upper case.
+    - numbers (e.g. 0.03, 1e-16) and quoted strings (e.g. 'HE').
+    - arithmetic: + - * / and parentheses.
+    - comparisons: < <= > >= == !=
+    - logic: && || ! and parentheses.
+    - exist(NAME), which is true where the parameter has a value.
+
+    A comparison involving a missing value (NaN, or an empty string) is
+    false, so "P1 < 1e-16" never selects pulsars without a listed P1.
+
+    Example:
+
+    query = CatalogQuery("P0 < 0.03 && P1 < 1e-16 && DM > 0")
+    mask = query.evaluate(catalog)    # boolean numpy array, one per row.
+    msps = catalog.select(mask)
+    """
+
+    def __init__(self,condition):
+        """
+        Compiles a new query.
+
+        Parameters:
+        condition    -    the condition to compile.
+
+        Returns:
+        N/A
+        """
+
+        self.condition = condition
+        self.tokens = self.tokenize(condition)
+        self.position = 0
+
+        self.function = self.parseOr()
+
+        if(self.position != len(self.tokens)):
+            self.error("unexpected '" + self.tokens[self.position][1] + "'")
+
+    # ****************************************************************************************************
+
+    def error(self,message):
+        """
+        Raises a ValueError describing a problem with the condition.
+        """
+
+        raise ValueError("Invalid catalog query \"" + self.condition + "\": " + message)
+
+    # ****************************************************************************************************
+
+    def tokenize(self,condition):
+        """
+        Splits a condition into a list of (kind, text) tokens.
+        """
+
+        tokens = []
+        position = 0
+        condition = condition.rstrip()
+
+        while(position < len(condition)):
+            match = TOKEN_PATTERN.match(condition,position)
+
+            if(match is None):
+                self.error("unexpected character at '" + condition[position:].strip() + "'")
+
+            kind = match.lastgroup
+            tokens.append((kind,match.group(kind)))
+            position = match.end()
+
+        return tokens
+
+    # ****************************************************************************************************
+
+    def peek(self):
+        """
+        Returns the text of the next token, or None at the end of the condition.
+        """
+
+        if(self.position < len(self.tokens)):
+            return self.tokens[self.position][1]
+
+        return None
+
+    # ****************************************************************************************************
+
+    def next(self):
+        """
+        Consumes and returns the next (kind, text) token.
+        """
+
+        if(self.position >= len(self.tokens)):
+            self.error("unexpected end of condition")
+
+        token = self.tokens[self.position]
+        self.position += 1
+
+        return token
+
+    # ****************************************************************************************************
+
+    def expect(self,text):
+        """
+        Consumes the next token, which must have the given text.
+        """
+
+        kind, found = self.next()
+
+        if(found != text):
+            self.error("expected '" + text + "' but found '" + found + "'")
+
+    # ****************************************************************************************************
+
+    def parseOr(self):
+        """
+        or := and ( '||' and )*
+        """
+
+        left = self.parseAnd()
+
+        while(self.peek() == "||"):
+            self.next()
+            left = self.combine(np.logical_or,left,self.parseAnd())
+
+        return left
+
+    # ****************************************************************************************************
+
+    def parseAnd(self):
+        """
+        and := not ( '&&' not )*
+        """
+
+        left = self.parseNot()
+
+        while(self.peek() == "&&"):
+            self.next()
+            left = self.combine(np.logical_and,left,self.parseNot())
+
+        return left
+
+    # ****************************************************************************************************
+
+    def parseNot(self):
+        """
+        not := '!' not | comparison
+        """
+
+        if(self.peek() == "!"):
+            self.next()
+            operand = self.parseNot()
+            return lambda columns, n: ~self.asMask(operand(columns,n),n)
+
+        return self.parseComparison()
+
+    # ****************************************************************************************************
+
+    def parseComparison(self):
+        """
+        comparison := sum ( ('<'|'<='|'>'|'>='|'=='|'!=') sum )?
+        """
+
+        left = self.parseSum()
+
+        if(self.peek() in COMPARISONS):
+            comparison = COMPARISONS[self.next()[1]]
+            right = self.parseSum()
+
+            def compare(columns,n):
+                a = left(columns,n)
+                b = right(columns,n)
+
+                with np.errstate(invalid='ignore'):
+                    result = comparison(a,b)
+
+                # Missing values never satisfy a comparison.
+                return self.asMask(result,n) & self.present(a,n) & self.present(b,n)
+
+            return compare
+
+        return left
+
+    # ****************************************************************************************************
+
+    def parseSum(self):
+        """
+        sum := product ( ('+'|'-') product )*
+        """
+
+        left = self.parseProduct()
+
+        while(self.peek() in ("+","-")):
+            left = self.combine(ARITHMETIC[self.next()[1]],left,self.parseProduct())
+
+        return left
+
+    # ****************************************************************************************************
+
+    def parseProduct(self):
+        """
+        product := unary ( ('*'|'/') unary )*
+        """
+
+        left = self.parseUnary()
+
+        while(self.peek() in ("*","/")):
+            left = self.combine(ARITHMETIC[self.next()[1]],left,self.parseUnary())
+
+        return left
+
+    # ****************************************************************************************************
+
+    def parseUnary(self):
+        """
+        unary := '-' unary | atom
+        """
+
+        if(self.peek() == "-"):
+            self.next()
+            operand = self.parseUnary()
+            return lambda columns, n: -operand(columns,n)
+
+        return self.parseAtom()
+
+    # ****************************************************************************************************
+
+    def parseAtom(self):
+        """
+        atom := number | string | name | 'exist' '(' name ')' | '(' or ')'
+        """
+
+        kind, text = self.next()
+
+        if(kind == "number"):
+            value = float(text)
+            return lambda columns, n: value
+
+        if(kind == "string"):
+            value = text[1:-1]
+            return lambda columns, n: value
+
+        if(kind == "name"):
+            if(text.lower() == "exist" and self.peek() == "("):
+                self.next()
+                kind, name = self.next()
+                if(kind != "name"):
+                    self.error("exist() expects a parameter name")
+                self.expect(")")
+                column = self.parameter(name)
+                return lambda columns, n: self.present(column(columns,n),n)
+
+            return self.parameter(text)
+
+        if(text == "("):
+            inner = self.parseOr()
+            self.expect(")")
+            return inner
+
+        self.error("unexpected '" + text + "'")
+
+    # ****************************************************************************************************
+
+    def parameter(self,name):
+        """
+        Returns a function looking up a parameter column by name.
+        """
+
+        key = name.upper()
+
+        def lookup(columns,n):
+            try:
+                return columns[key]
+            except KeyError:
+                raise KeyError("Catalog query \"" + self.condition + "\" uses unknown parameter: " + key)
+
+        return lookup
+
+    # ****************************************************************************************************
+
+    def combine(self,function,left,right):
+        """
+        Returns a function applying a binary numpy function to two operands.
+        """
+
+        def apply(columns,n):
+            with np.errstate(divide='ignore',invalid='ignore'):
+                return function(left(columns,n),right(columns,n))
+
+        return apply
+
+    # ****************************************************************************************************
+
+    def present(self,values,n):
+        """
+        Returns a boolean mask which is True where values are not missing.
+        """
+
+        values = np.asarray(values)
+
+        if(values.dtype.kind in "SU"):
+            return np.broadcast_to(values != values.dtype.type(),(n,))
+        elif(values.dtype.kind == "f"):
+            return np.broadcast_to(~np.isnan(values),(n,))
+        else:
+            return np.ones(n,dtype=bool)
+
+    # ****************************************************************************************************
+
+    def asMask(self,values,n):
+        """
+        Broadcasts a result to a boolean mask of length n.
+        """
+
+        return np.broadcast_to(np.asarray(values,dtype=bool),(n,))
+
+    # ****************************************************************************************************
+
+    def evaluate(self,catalog):
+        """
+        Evaluates the query over a catalog.
+
+        Parameters:
+        catalog    -    a PulsarCatalog, or any mapping of parameter names to
+                        equal length numpy arrays.
+
+        Returns:
+        a boolean numpy array, True for each selected row.
+        """
+
+        if(isinstance(catalog,dict)):
+            n = len(next(iter(catalog.values())))
+        else:
+            n = len(catalog)
+
+        return np.array(self.asMask(self.function(catalog,n),n))
+
+    # ****************************************************************************************************
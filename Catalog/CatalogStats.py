@@ -0,0 +1,344 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                     Catalog Stats Version 1.0                          |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Summary statistics for every numeric column of a catalog, computed in  |
+    | a single streaming pass over the data (see ColumnStats). Catalogs      |
+    | held in a column store are read in chunks from memory mapped files, so |
+    | they need not fit in memory, and chunks can be summarised by several  |
+    | processes with the partial results merged.                             |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | Required Command Line Arguments:                                       |
+    |                                                                        |
+    | One of:                                                                |
+    |                                                                        |
+    | -a (string) full path to a ATNF pulsar catalog database file.          |
+    |                                                                        |
+    | -c (string) full path to a psrcat web interface CSV file.              |
+    |                                                                        |
+    | -s (string) full path to a column store directory, e.g. one written by |
+    |             CatalogUpdater.                                            |
+    |                                                                        |
+    **************************************************************************
+    | Optional Command Line Arguments:                                       |
+    |                                                                        |
+    | -p (int) number of processes used to summarise a column store          |
+    |          (default 1).                                                  |
+    |                                                                        |
+    | -r (int) number of rows summarised at a time. CSV files are read one   |
+    |          chunk of rows at a time, so need not fit in memory.           |
+    |                                                                        |
+    | -v (boolean) verbose debugging flag.                                   |
+    |                                                                        |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+
+import os, sys
+import multiprocessing
+
+import numpy as np
+
+from CatalogCache import CatalogCache
+from ColumnStats import ColumnStats
+from ColumnStore import ColumnStore
+from CSVCatalog import CSVCatalog
+from CSVCatalog import CHUNK_ROWS as CSV_CHUNK_ROWS
+
+# The number of rows summarised at a time.
+CHUNK_ROWS = 1 << 20
+
+# ****************************************************************************************************
+
+def summarizeChunk(task):
+    """
+    Summarises a range of rows of a column store. This is a module level
+    function, rather than a method, so that it can be sent to worker
+    processes.
+
+    Parameters:
+    task    -    a tuple (directory, names, start, stop).
+
+    Returns:
+    a CatalogStats holding the statistics of those rows.
+    """
+
+    directory, names, start, stop = task
+
+    columns, metadata = ColumnStore(directory).read(mmap=True)
+
+    return CatalogStats().update(dict((name,columns[name][start:stop]) for name in names),names)
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class CatalogStats:
+    """
+    Holds one ColumnStats per numeric column, for example:
+
+    stats = CatalogStats().update(catalog)      # every numeric column.
+    stats["P0"].mean, stats["P0"].quantile(0.5)
+    stats.printSummary([("Periods parsed", "P0"), ("DMs parsed", "DM")])
+
+    update() may be called once per chunk of rows, and merge() combines
+    the statistics of separate chunks.
+    """
+
+    def __init__(self):
+        """
+        Creates a new, empty set of statistics.
+
+        Parameters:
+        N/A
+
+        Returns:
+        N/A
+        """
+
+        self.columns = {}
+
+    # ****************************************************************************************************
+
+    def numericNames(self,columns):
+        """
+        Returns the sorted names of the numeric columns of a catalog.
+        """
+
+        return sorted(name for name in columns.keys() if np.asarray(columns[name]).dtype.kind in "fiub")
+
+    # ****************************************************************************************************
+
+    def update(self,columns,names=None):
+        """
+        Adds a chunk of rows.
+
+        Parameters:
+        columns    -    a PulsarCatalog, or a dictionary of column arrays.
+        names      -    the columns to summarise, all numeric columns if None.
+
+        Returns:
+        these statistics, to allow calls to be chained.
+        """
+
+        if(isinstance(columns,dict) == False):
+            columns = columns.columns
+
+        if(names is None):
+            names = self.numericNames(columns)
+
+        for name in names:
+            if(name not in self.columns):
+                self.columns[name] = ColumnStats()
+
+            self.columns[name].update(columns[name])
+
+        return self
+
+    # ****************************************************************************************************
+
+    def merge(self,other):
+        """
+        Adds the statistics of another set of rows.
+
+        Parameters:
+        other    -    the CatalogStats to merge in.
+
+        Returns:
+        these statistics, to allow calls to be chained.
+        """
+
+        for name, stats in other.columns.items():
+            if(name in self.columns):
+                self.columns[name].merge(stats)
+            else:
+                self.columns[name] = stats
+
+        return self
+
+    # ****************************************************************************************************
+
+    def updateStore(self,directory,names=None,processes=1,chunkRows=CHUNK_ROWS):
+        """
+        Summarises a column store chunk by chunk. Columns are memory mapped,
+        so only one chunk of each is in memory at a time.
+
+        Parameters:
+        directory    -    the column store directory.
+        names        -    the columns to summarise, all numeric columns if None.
+        processes    -    the number of processes summarising chunks.
+        chunkRows    -    the number of rows in each chunk.
+
+        Returns:
+        these statistics, to allow calls to be chained.
+        """
+
+        columns, metadata = ColumnStore(directory).read(mmap=True)
+
+        if(names is None):
+            names = self.numericNames(columns)
+
+        rows = max([len(columns[name]) for name in names] + [0])
+        tasks = [(directory, names, start, start + chunkRows) for start in range(0,rows,chunkRows)]
+
+        if(processes == 1 or len(tasks) < 2):
+            for task in tasks:
+                self.merge(summarizeChunk(task))
+        else:
+            pool = multiprocessing.Pool(processes)
+
+            try:
+                for stats in pool.imap(summarizeChunk,tasks):
+                    self.merge(stats)
+            finally:
+                pool.close()
+                pool.join()
+
+        return self
+
+    # ****************************************************************************************************
+
+    def __getitem__(self,name):
+        """
+        Returns the ColumnStats of the given column.
+        """
+
+        return self.columns[name]
+
+    # ****************************************************************************************************
+
+    def __contains__(self,name):
+        """
+        Returns True if statistics are held for the given column.
+        """
+
+        return name in self.columns
+
+    # ****************************************************************************************************
+
+    def names(self):
+        """
+        Returns the sorted names of the columns statistics are held for.
+        """
+
+        return sorted(self.columns.keys())
+
+    # ****************************************************************************************************
+
+    def summary(self,label,name):
+        """
+        Returns a line describing the statistics of a column.
+
+        Parameters:
+        label    -    the label to start the line with, e.g. "Periods parsed".
+        name     -    the name of the column.
+
+        Returns:
+        the line of text.
+        """
+
+        stats = self.columns[name]
+
+        return ("\t" + label.ljust(19) + ": " + str(stats.count) +
+                "  Mean: " + str(stats.mean) + "  Std: " + str(stats.std()) +
+                "  Min: " + str(stats.min) + ("  Median: " if stats.sketch.exact() else "  Median (approx.): ") +
+                str(stats.quantile(0.5)) + "  Max: " + str(stats.max) +
+                "  Zero elements: " + str(stats.zeroCount) + "  NaN elements: " + str(stats.nanCount))
+
+    # ****************************************************************************************************
+
+    def printSummary(self,labels=None):
+        """
+        Prints a line describing the statistics of each column.
+
+        Parameters:
+        labels    -    optional list of (label, column name) tuples, giving
+                       the columns to print, in order. Every column is
+                       printed, labelled by its name, if None.
+
+        Returns:
+        N/A
+        """
+
+        if(labels is None):
+            labels = [(name, name) for name in self.names()]
+
+        for label, name in labels:
+            print(self.summary(label,name))
+
+    # ****************************************************************************************************
+
+    def main(self,argv=None):
+        """
+        Main entry point for the Application. Processes command line
+        input and prints the statistics of every numeric column.
+
+        """
+
+        # ****************************************
+        #         Execution information
+        # ****************************************
+
+        print(__doc__)
+
+        # ****************************************
+        #    Command line argument processing
+        # ****************************************
+
+        # Python 2.4 argument processing.
+        parser = OptionParser()
+
+        # REQUIRED ARGUMENTS
+        parser.add_option("-a", action="store", dest="atnfPath",help='Path to a pulsar catalog file.',default="")
+        parser.add_option("-c", action="store", dest="csvPath",help='Path to a web interface CSV file.',default="")
+        parser.add_option("-s", action="store", dest="storePath",help='Path to a column store directory.',default="")
+
+        # OPTIONAL ARGUMENTS
+        parser.add_option("-p", action="store", dest="processes",type="int",help='Number of processes (optional).',default=1)
+        parser.add_option("-r", action="store", dest="chunkRows",type="int",help='Number of rows summarised at a time (optional).',default=0)
+        parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+
+        (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+        if(os.path.isfile(args.atnfPath)):
+            self.update(CatalogCache(verbose=args.verbose).loadDatabase(args.atnfPath))
+        elif(os.path.isfile(args.csvPath)):
+            for chunk in CSVCatalog().chunks(args.csvPath,args.chunkRows or CSV_CHUNK_ROWS):
+                self.update(chunk)
+        elif(ColumnStore(args.storePath).exists()):
+            self.updateStore(args.storePath,processes=args.processes,chunkRows=args.chunkRows or CHUNK_ROWS)
+        else:
+            print("\n\tYou must supply a valid ATNF file via the -a flag, a CSV file via the -c flag, or a column store via the -s flag.")
+            sys.exit()
+
+        print("\n\t+----- COLUMN STATISTICS -----+")
+        self.printSummary()
+
+        print("\n\tDone.")
+        print("\t**************************************************************************") # Used only for formatting purposes.
+
+    # ****************************************************************************************************
+
+if __name__ == '__main__':
+    CatalogStats().main()
@@ -0,0 +1,207 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                     Catalog Store Version 1.0                          |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | A compact binary form of a pulsar catalog, held in a column store      |
+    | directory. Numeric columns are stored as typed arrays with NaN marking |
+    | missing values. Text columns with few distinct values (e.g. BINARY and |
+    | BINCOMP) are dictionary encoded: each row holds a small integer code,  |
+    | and the distinct values are listed once in the manifest. Columns are   |
+    | memory mapped when read, so scripts need not parse text at all.        |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+from Categorical import Categorical
+from Categorical import encode
+from ColumnStore import ColumnStore
+from PulsarCatalog import PulsarCatalog
+
+# Version of the store layout. Stores of other versions are not read.
+CATALOG_STORE_FORMAT = 1
+
+# The text columns dictionary encoded by default.
+CATEGORICAL_COLUMNS = ["BINARY", "BINCOMP", "TYPE"]
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class CatalogStore:
+    """
+    Writes and reads catalogs in binary form, for example:
+
+    CatalogStore("detailed.store").write(CSVCatalog().load("detailed.txt"))
+    catalog = CatalogStore("detailed.store").read(["P0","BINARY"])
+
+    When read, dictionary encoded columns are decoded back to string arrays,
+    unless decode is False, in which case the codes themselves are returned
+    (see labels()). Code -1 marks a missing value.
+    """
+
+    def __init__(self,directory):
+        """
+        Creates a new store object for the given directory.
+
+        Parameters:
+        directory    -    the directory holding the store.
+
+        Returns:
+        N/A
+        """
+
+        self.store = ColumnStore(directory)
+
+    # ****************************************************************************************************
+
+    def exists(self):
+        """
+        Returns True if a complete catalog store exists in the directory.
+        """
+
+        if(self.store.exists() == False):
+            return False
+
+        names, metadata = self.store.readManifest()
+
+        return metadata.get("format") == CATALOG_STORE_FORMAT
+
+    # ****************************************************************************************************
+
+    def encode(self,values):
+        """
+        Dictionary encodes a text column, see Categorical.encode().
+
+        Parameters:
+        values    -    a string array, with "" marking missing values.
+
+        Returns:
+        a tuple (codes, labels), where codes is an integer array holding
+        each value's position in the sorted list of distinct labels.
+        """
+
+        column = encode(values)
+
+        return column.codes, column.labels
+
+    # ****************************************************************************************************
+
+    def write(self,catalog,categorical=None,metadata=None):
+        """
+        Writes a catalog to the store, replacing any existing contents.
+
+        Parameters:
+        catalog        -    the PulsarCatalog to write.
+        categorical    -    the text columns to dictionary encode, defaults
+                            to those of CATEGORICAL_COLUMNS in the catalog.
+        metadata       -    optional dictionary of JSON serialisable values.
+
+        Returns:
+        N/A
+        """
+
+        if(categorical is None):
+            categorical = [name for name in CATEGORICAL_COLUMNS if name in catalog]
+
+        columns = dict(catalog.columns)
+        dictionaries = {}
+
+        for name in categorical:
+            columns[name], dictionaries[name] = self.encode(catalog[name])
+
+        storeMetadata = dict(metadata or {})
+        storeMetadata["format"] = CATALOG_STORE_FORMAT
+        storeMetadata["version"] = catalog.version
+        storeMetadata["dictionaries"] = dictionaries
+
+        self.store.write(columns,storeMetadata)
+
+    # ****************************************************************************************************
+
+    def labels(self,name):
+        """
+        Returns the labels of a dictionary encoded column, so that code i
+        stands for labels[i].
+
+        Parameters:
+        name    -    the name of the column.
+
+        Returns:
+        a list of strings, or None if the column is not dictionary encoded.
+        """
+
+        names, metadata = self.store.readManifest()
+        labels = metadata.get("dictionaries",{}).get(name)
+
+        if(labels is None):
+            return None
+
+        return [str(label) for label in labels]
+
+    # ****************************************************************************************************
+
+    def categorical(self,name):
+        """
+        Reads a column as a Categorical, without decoding it. Text columns
+        which are not dictionary encoded in the store are encoded as read.
+
+        Parameters:
+        name    -    the name of the column.
+
+        Returns:
+        a Categorical.
+        """
+
+        columns, metadata = self.store.read(True,[name])
+        labels = self.labels(name)
+
+        if(labels is None):
+            return encode(columns[name])
+
+        return Categorical(columns[name],labels)
+
+    # ****************************************************************************************************
+
+    def read(self,names=None,mmap=True,decode=True):
+        """
+        Reads a catalog from the store.
+
+        Parameters:
+        names     -    optional list of the columns to read, all if None.
+        mmap      -    if True the columns are memory mapped.
+        decode    -    if True dictionary encoded columns are decoded to
+                       string arrays, otherwise their codes are returned.
+
+        Returns:
+        a PulsarCatalog.
+        """
+
+        columns, metadata = self.store.read(mmap,names)
+
+        if(decode):
+            for name, labels in metadata.get("dictionaries",{}).items():
+                name = str(name)
+                if(name in columns):
+                    columns[name] = Categorical(columns[name],[str(label) for label in labels]).decode()
+
+        return PulsarCatalog(columns,str(metadata.get("version","")))
+
+    # ****************************************************************************************************
@@ -0,0 +1,282 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                    Catalog Updater Version 1.0                         |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Incrementally refreshes a stored, fully derived pulsar catalog when a  |
+    | new psrcat.db release arrives. Each catalog entry is hashed, and the   |
+    | stored parse of an entry is reused when its hash is unchanged. Only    |
+    | new or modified entries are parsed, and have their coordinates, Edot   |
+    | and age derived again.                                                 |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | Required Command Line Arguments:                                       |
+    |                                                                        |
+    | -a (string) full path to a ATNF pulsar catalog database file.          |
+    |                                                                        |
+    | -s (string) full path to the directory holding the derived catalog.    |
+    |                                                                        |
+    **************************************************************************
+    | Optional Command Line Arguments:                                       |
+    |                                                                        |
+    | -c (string) full path to a directory holding a coordinate cache, so    |
+    |             positions converted by earlier runs are not converted      |
+    |             again.                                                     |
+    |                                                                        |
+    | -v (boolean) verbose debugging flag.                                   |
+    |                                                                        |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+
+import os, sys
+import hashlib
+
+import numpy as np
+
+from CatalogParser import CatalogParser
+from ColumnStore import ColumnStore
+from CoordinateCache import CoordinateCache
+from Coordinates import Coordinates
+from PulsarCatalog import PulsarCatalog
+from PulsarCatalog import DEFAULT_PARAMETERS
+
+# The name of the column holding the hash of each entry's text.
+HASH_COLUMN = "RECORD_HASH"
+
+# Version of the parsing and derivation behind the stored rows. Increase it
+# whenever CatalogParser, or a derived column, changes what an entry yields,
+# so stores written by older code are parsed again in full.
+UPDATER_FORMAT = 1
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class CatalogUpdater:
+    """
+    Maintains a derived catalog in a ColumnStore directory. The store holds
+    every catalog column (including the derived GL, GB, AGE and EDOT
+    columns), plus the SHA-1 hash of the text of each entry. When updated
+    from a new catalog file, the rows of unchanged entries are copied from
+    the store, and only the remaining entries are parsed and derived.
+    """
+
+    def __init__(self,storeDirectory=None,parameters=None,verbose=False,coordinateCache=None):
+        """
+        Creates a new updater.
+
+        Parameters:
+        storeDirectory    -    the directory holding the derived catalog.
+        parameters        -    the parameters to load, defaults to DEFAULT_PARAMETERS.
+        verbose           -    verbose debugging flag.
+        coordinateCache   -    optional CoordinateCache used when deriving coordinates.
+
+        Returns:
+        N/A
+        """
+
+        self.store = ColumnStore(storeDirectory)
+        self.parameters = list(parameters or DEFAULT_PARAMETERS)
+        self.verbose = verbose
+        self.coordinateCache = coordinateCache
+
+        # Counts describing the last update.
+        self.reused = 0
+        self.parsed = 0
+        self.removed = 0
+
+    # ****************************************************************************************************
+
+    def hashBlock(self,block):
+        """
+        Returns the SHA-1 hex digest of the text of a catalog entry.
+        """
+
+        return hashlib.sha1(block.encode("utf-8")).hexdigest()
+
+    # ****************************************************************************************************
+
+    def previous(self):
+        """
+        Reads the catalog held in the store, if it was built using the same
+        parameters, and the same UPDATER_FORMAT, as this updater.
+
+        Parameters:
+        N/A
+
+        Returns:
+        a tuple (columns, rowsByHash). rowsByHash maps an entry hash to its
+        row in the stored columns. Both are empty if there is no usable store.
+        """
+
+        if(self.store.exists() == False):
+            return {}, {}
+
+        names, metadata = self.store.readManifest()
+
+        if(metadata.get("format") != UPDATER_FORMAT or metadata.get("parameters") != self.parameters):
+            return {}, {}
+
+        columns, metadata = self.store.read(mmap=True)
+
+        rowsByHash = {}
+        for row, recordHash in enumerate(columns[HASH_COLUMN].tolist()):
+            if(not isinstance(recordHash,str)):
+                recordHash = recordHash.decode("ascii")
+            rowsByHash[recordHash] = row
+
+        return columns, rowsByHash
+
+    # ****************************************************************************************************
+
+    def update(self,path):
+        """
+        Brings the store up to date with a catalog file, and returns the
+        resulting catalog.
+
+        Parameters:
+        path    -    the path to the psrcat.db file.
+
+        Returns:
+        the up to date PulsarCatalog, including the derived columns.
+        """
+
+        previousColumns, rowsByHash = self.previous()
+
+        catalogParser = CatalogParser(self.parameters)
+
+        hashes = []
+        reusedPositions = []   # Position of each reused entry in the new catalog.
+        reusedRows = []        # Its row in the stored catalog.
+        parsedPositions = []   # Position of each new or modified entry.
+        parsedRecords = []     # Its parsed record.
+
+        for position, block in enumerate(catalogParser.blocks(path)):
+            recordHash = self.hashBlock(block)
+            hashes.append(recordHash)
+
+            row = rowsByHash.get(recordHash)
+
+            if(row is not None):
+                reusedPositions.append(position)
+                reusedRows.append(row)
+            else:
+                parsedPositions.append(position)
+                parsedRecords.append(catalogParser.parseBlock(block))
+
+        self.reused = len(reusedRows)
+        self.parsed = len(parsedRecords)
+        self.removed = len(rowsByHash) - len(set(reusedRows))
+
+        # Parse and derive only the new or modified entries.
+        fresh = PulsarCatalog().loadRecords(parsedRecords,self.parameters)
+        Coordinates().deriveColumns(fresh,self.coordinateCache)
+
+        if(self.coordinateCache is not None):
+            self.coordinateCache.save()
+
+        # Merge reused and fresh rows back into catalog file order.
+        positions = np.array(reusedPositions + parsedPositions,dtype=np.int64)
+        reusedRows = np.array(reusedRows,dtype=np.int64)
+
+        columns = {}
+        for name, column in fresh.columns.items():
+            if(len(reusedRows) > 0):
+                combined = np.concatenate([previousColumns[name][reusedRows],column])
+            else:
+                combined = column
+
+            merged = np.empty(len(positions),dtype=combined.dtype)
+            merged[positions] = combined
+            columns[name] = merged
+
+        catalog = PulsarCatalog(columns,catalogParser.version)
+
+        storedColumns = dict(catalog.columns)
+        storedColumns[HASH_COLUMN] = np.array(hashes,dtype="S40")
+
+        self.store.write(storedColumns,{"format"    : UPDATER_FORMAT,
+                                        "parameters": self.parameters,
+                                        "version"   : catalog.version,
+                                        "source"    : os.path.abspath(path)})
+
+        return catalog
+
+    # ****************************************************************************************************
+
+    def main(self,argv=None):
+        """
+        Main entry point for the Application. Processes command line
+        input and updates the derived catalog.
+
+        """
+
+        # ****************************************
+        #         Execution information
+        # ****************************************
+
+        print(__doc__)
+
+        # ****************************************
+        #    Command line argument processing
+        # ****************************************
+
+        # Python 2.4 argument processing.
+        parser = OptionParser()
+
+        # REQUIRED ARGUMENTS
+        parser.add_option("-a", action="store", dest="atnfPath",help='Path to a pulsar catalog file.',default="")
+        parser.add_option("-s", action="store", dest="storePath",help='Directory holding the derived catalog.',default="")
+
+        # OPTIONAL ARGUMENTS
+        parser.add_option("-c", action="store", dest="coordinateCachePath",help='Directory holding a coordinate cache (optional).',default="")
+        parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+
+        (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+        # Check arguments for validity...
+        if(os.path.isfile(args.atnfPath) == False or args.storePath == ""):
+            print("\n\tYou must supply a valid ATNF file via the -a flag, and a store directory via the -s flag.")
+            sys.exit()
+
+        self.store   = ColumnStore(args.storePath)
+        self.verbose = args.verbose
+
+        if(args.coordinateCachePath != ""):
+            self.coordinateCache = CoordinateCache(args.coordinateCachePath,verbose=self.verbose)
+
+        catalog = self.update(args.atnfPath)
+
+        print("\n\tCatalog version : " + catalog.version)
+        print("\tEntries         : " + str(len(catalog)))
+        print("\tReused          : " + str(self.reused))
+        print("\tParsed          : " + str(self.parsed))
+        print("\tRemoved         : " + str(self.removed))
+
+        print("\n\tDone.")
+        print("\t**************************************************************************") # Used only for formatting purposes.
+
+    # ****************************************************************************************************
+
+if __name__ == '__main__':
+    CatalogUpdater().main()
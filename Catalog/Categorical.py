@@ -0,0 +1,173 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                      Categorical Version 1.0                           |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | A dictionary encoded text column: each row holds a small integer code, |
+    | and each distinct value (label) is held once. Grouping and counting    |
+    | rows by value then work on the integer codes alone, e.g. the number of |
+    | pulsars with each type of binary companion is one call to bincount.   |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+import numpy as np
+
+# The code of a missing value.
+MISSING_CODE = -1
+
+# The character starting the reference appended to a catalog value, e.g. the
+# "[fck+03]" of the BINCOMP value "He[fck+03]".
+REFERENCE_START = "["
+
+# ****************************************************************************************************
+
+def stripReference(label):
+    """
+    Returns a catalog value without its reference, e.g. "He[fck+03]" becomes "He".
+    """
+
+    return label.split(REFERENCE_START)[0].strip()
+
+# ****************************************************************************************************
+
+def encode(values):
+    """
+    Dictionary encodes a text column.
+
+    Parameters:
+    values    -    a string array, with "" marking missing values.
+
+    Returns:
+    a Categorical, whose labels are the sorted distinct values.
+    """
+
+    values = np.asarray(values)
+
+    labels, codes = np.unique(values,return_inverse=True)
+    labels = [str(label) for label in labels.tolist()]
+
+    # The missing value is not a label.
+    if(labels and labels[0] == ""):
+        labels = labels[1:]
+        codes = codes - 1
+
+    dtype = np.int16 if len(labels) < np.iinfo(np.int16).max else np.int32
+
+    return Categorical(codes.astype(dtype),labels)
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class Categorical:
+    """
+    Holds a dictionary encoded column, for example:
+
+    companions = encode(catalog["BINCOMP"]).relabel(stripReference)
+    companions.labels                  # ["CO", "CO(?)", "He", ...]
+    companions.counts()                # the rows holding each label.
+
+    Code i stands for labels[i], and code -1 marks a missing value.
+    """
+
+    def __init__(self,codes,labels):
+        """
+        Creates a new column from its codes and labels.
+
+        Parameters:
+        codes     -    an integer array, one code per row.
+        labels    -    the list of labels the codes index.
+
+        Returns:
+        N/A
+        """
+
+        self.codes  = codes
+        self.labels = labels
+
+    # ****************************************************************************************************
+
+    def __len__(self):
+        """
+        Returns the number of rows in the column.
+        """
+
+        return len(self.codes)
+
+    # ****************************************************************************************************
+
+    def missing(self):
+        """
+        Returns a boolean mask which is True where the column is missing a value.
+        """
+
+        return self.codes == MISSING_CODE
+
+    # ****************************************************************************************************
+
+    def counts(self):
+        """
+        Returns the number of rows holding each label, in label order.
+
+        The codes are shifted by one, so missing values fall in the first bin
+        and are dropped, and every label is counted by a single bincount.
+        """
+
+        return np.bincount(np.asarray(self.codes,dtype=np.intp) + 1,minlength=len(self.labels) + 1)[1:]
+
+    # ****************************************************************************************************
+
+    def decode(self):
+        """
+        Returns the column as a string array, with "" marking missing values.
+        """
+
+        # The extra "" is picked by the missing value code, -1.
+        lookup = np.array(list(self.labels) + [""],dtype=str)
+
+        return lookup[self.codes]
+
+    # ****************************************************************************************************
+
+    def relabel(self,function):
+        """
+        Returns a new column with each label replaced by function(label).
+        Labels which become equal are merged. Only the labels are processed,
+        the codes are remapped with a single lookup.
+
+        Parameters:
+        function    -    the function applied to each label, e.g. stripReference.
+
+        Returns:
+        a new Categorical, whose labels are sorted.
+        """
+
+        renamed = [function(label) for label in self.labels]
+        labels = sorted(set(label for label in renamed if label != ""))
+
+        positions = dict((label, code) for code, label in enumerate(labels))
+
+        # Labels renamed to "" become missing values, as does code -1.
+        lookup = np.array([positions.get(label,MISSING_CODE) for label in renamed] + [MISSING_CODE],dtype=self.codes.dtype)
+
+        return Categorical(lookup[self.codes],labels)
+
+    # ****************************************************************************************************
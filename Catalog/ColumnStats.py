@@ -0,0 +1,185 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                      Column Stats Version 1.0                          |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Summary statistics of one numeric column (count, mean, variance, min,  |
+    | max, zero count, NaN count and approximate quantiles), computed as the |
+    | column streams past in chunks. Partial results, e.g. from chunks       |
+    | summarised in parallel, can be merged.                                 |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+import numpy as np
+
+from QuantileSketch import QuantileSketch
+from QuantileSketch import K
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class ColumnStats:
+    """
+    Accumulates the statistics of a column, for example:
+
+    stats = ColumnStats()
+    for chunk in chunks:
+        stats.update(chunk)
+    print(stats.mean, stats.std(), stats.quantile(0.5))
+
+    NaN values are counted, but otherwise ignored. The mean and variance
+    are kept as Welford's running mean and sum of squared deviations (M2).
+    A chunk is first summarised on its own, and then combined with the
+    running values using Chan et al.'s pairwise update, which is also how
+    two partial results are merged.
+    """
+
+    def __init__(self,k=K):
+        """
+        Creates a new, empty accumulator.
+
+        Parameters:
+        k    -    the size of the levels of the quantile sketch, see QuantileSketch.
+
+        Returns:
+        N/A
+        """
+
+        self.count     = 0       # Values seen, excluding NaN.
+        self.nanCount  = 0
+        self.zeroCount = 0
+        self.mean      = np.nan
+        self.M2        = 0.0     # Sum of squared deviations from the mean.
+        self.min       = np.nan
+        self.max       = np.nan
+
+        self.sketch = QuantileSketch(k)
+
+    # ****************************************************************************************************
+
+    def combine(self,count,mean,M2,minimum,maximum):
+        """
+        Combines the moments and extremes of another set of values with
+        those of this accumulator.
+        """
+
+        if(count == 0):
+            return
+
+        if(self.count == 0):
+            self.count, self.mean, self.M2 = count, mean, M2
+            self.min, self.max = minimum, maximum
+            return
+
+        total = self.count + count
+        delta = mean - self.mean
+
+        self.mean  = self.mean + delta * count / total
+        self.M2    = self.M2 + M2 + delta * delta * self.count * count / total
+        self.count = total
+
+        self.min = min(self.min,minimum)
+        self.max = max(self.max,maximum)
+
+    # ****************************************************************************************************
+
+    def update(self,values):
+        """
+        Adds a chunk of values.
+
+        Parameters:
+        values    -    an array of values, NaN where missing.
+
+        Returns:
+        this accumulator, to allow calls to be chained.
+        """
+
+        values = np.asarray(values,dtype=np.float64).ravel()
+
+        missing = np.isnan(values)
+        nanCount = int(np.count_nonzero(missing))
+
+        if(nanCount):
+            values = values[~missing]
+
+        self.nanCount  += nanCount
+        self.zeroCount += len(values) - int(np.count_nonzero(values))
+
+        if(len(values)):
+            mean = values.mean()
+            self.combine(len(values),mean,float(((values - mean) ** 2).sum()),values.min(),values.max())
+            self.sketch.update(values)
+
+        return self
+
+    # ****************************************************************************************************
+
+    def merge(self,other):
+        """
+        Adds the statistics of another accumulator to this one.
+
+        Parameters:
+        other    -    the ColumnStats to merge in.
+
+        Returns:
+        this accumulator, to allow calls to be chained.
+        """
+
+        self.nanCount  += other.nanCount
+        self.zeroCount += other.zeroCount
+        self.combine(other.count,other.mean,other.M2,other.min,other.max)
+        self.sketch.merge(other.sketch)
+
+        return self
+
+    # ****************************************************************************************************
+
+    def variance(self):
+        """
+        Returns the (population) variance of the values seen, NaN if none.
+        """
+
+        if(self.count == 0):
+            return np.nan
+
+        return self.M2 / self.count
+
+    # ****************************************************************************************************
+
+    def std(self):
+        """
+        Returns the (population) standard deviation of the values seen.
+        """
+
+        return np.sqrt(self.variance())
+
+    # ****************************************************************************************************
+
+    def quantile(self,q):
+        """
+        Returns quantiles of the values seen, see QuantileSketch. They are
+        exact while no more than EXACT_COUNT values have been seen.
+        """
+
+        return self.sketch.quantile(q)
+
+    # ****************************************************************************************************
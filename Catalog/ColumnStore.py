@@ -0,0 +1,252 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                     Column Store Version 1.0                           |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Reads and writes columnar data as a directory of raw numpy .npy files, |
+    | one file per column, plus a small JSON manifest. Columns are read back |
+    | memory mapped, so opening a store costs almost nothing regardless of   |
+    | how many rows it holds.                                                |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+import os
+import json
+import uuid
+
+import numpy as np
+
+# The name of the manifest file written into every store directory.
+MANIFEST_FILE = "manifest.json"
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class ColumnStore:
+    """
+    A directory holding one .npy file per column. The layout is:
+
+    <directory>/manifest.json    -    column names plus caller metadata.
+    <directory>/<column>.npy     -    one numpy array per column.
+
+    The manifest is removed before columns are written, and written again
+    last, so a store that was only partly written is never read back.
+    """
+
+    def __init__(self,directory):
+        """
+        Creates a new store object for the given directory.
+
+        Parameters:
+        directory    -    the directory holding the store.
+
+        Returns:
+        N/A
+        """
+
+        self.directory = directory
+
+    # ****************************************************************************************************
+
+    def manifestPath(self):
+        """
+        Returns the path to the manifest file of this store.
+        """
+
+        return os.path.join(self.directory,MANIFEST_FILE)
+
+    # ****************************************************************************************************
+
+    def exists(self):
+        """
+        Returns True if a complete store exists in the directory.
+        """
+
+        return os.path.isfile(self.manifestPath())
+
+    # ****************************************************************************************************
+
+    def write(self,columns,metadata=None):
+        """
+        Writes columns to the store, replacing any existing contents.
+
+        Parameters:
+        columns     -    dictionary mapping column names to numpy arrays.
+        metadata    -    optional dictionary of JSON serialisable values,
+                         stored in the manifest.
+
+        Returns:
+        N/A
+        """
+
+        if(os.path.isdir(self.directory) == False):
+            os.makedirs(self.directory)
+
+        if(self.exists()):
+            try:
+                os.remove(self.manifestPath())
+            except OSError:
+                # Already removed by another process writing this store.
+                pass
+
+        for name, column in columns.items():
+            self.replace(os.path.join(self.directory,name + ".npy"),np.asarray(column))
+
+        self.writeMetadata(sorted(columns.keys()),metadata)
+
+    # ****************************************************************************************************
+
+    def replace(self,path,column):
+        """
+        Writes a column to a new file, then moves it over the old one. Any
+        memory mapped views of the old file remain valid. The new file has a
+        name unique to this write, so processes writing the same store at
+        once never write to the same file.
+
+        Parameters:
+        path      -    the path to the .npy file to write.
+        column    -    the numpy array to write.
+
+        Returns:
+        N/A
+        """
+
+        columnFile, temporaryPath = self.temporaryFile(path,'wb')
+        np.save(columnFile,column)
+        columnFile.close()
+
+        self.rename(temporaryPath,path)
+
+    # ****************************************************************************************************
+
+    def temporaryFile(self,path,mode):
+        """
+        Creates a new, uniquely named file alongside a path.
+
+        Parameters:
+        path    -    the path the file will later be renamed to.
+        mode    -    the mode to open the file with, 'w' or 'wb'.
+
+        Returns:
+        a tuple (file, temporaryPath) holding the open file and its path.
+        """
+
+        temporaryPath = path + "." + uuid.uuid4().hex + ".tmp"
+
+        return open(temporaryPath,mode), temporaryPath
+
+    # ****************************************************************************************************
+
+    def rename(self,source,destination):
+        """
+        Moves a file over another, replacing it.
+
+        Parameters:
+        source         -    the path of the file to move.
+        destination    -    the path to move it to.
+
+        Returns:
+        N/A
+        """
+
+        try:
+            os.rename(source,destination)
+        except OSError:
+            # Renaming over an existing file fails on some platforms.
+            os.remove(destination)
+            os.rename(source,destination)
+
+    # ****************************************************************************************************
+
+    def writeMetadata(self,names,metadata):
+        """
+        Writes the manifest of this store.
+
+        Parameters:
+        names       -    the names of the columns in the store.
+        metadata    -    dictionary of JSON serialisable values.
+
+        Returns:
+        N/A
+        """
+
+        manifest = {"columns": names, "metadata": metadata or {}}
+
+        manifestFile, temporaryPath = self.temporaryFile(self.manifestPath(),'w')
+        json.dump(manifest,manifestFile)
+        manifestFile.close()
+
+        self.rename(temporaryPath,self.manifestPath())
+
+    # ****************************************************************************************************
+
+    def readManifest(self):
+        """
+        Reads the manifest of this store.
+
+        Parameters:
+        N/A
+
+        Returns:
+        a tuple (names, metadata) holding the column names and metadata dictionary.
+        """
+
+        manifestFile = open(self.manifestPath(),'r')
+        manifest = json.load(manifestFile)
+        manifestFile.close()
+
+        return [str(name) for name in manifest["columns"]], manifest["metadata"]
+
+    # ****************************************************************************************************
+
+    def read(self,mmap=True,names=None):
+        """
+        Reads columns from the store.
+
+        Parameters:
+        mmap     -    if True the columns are memory mapped (read only),
+                      otherwise they are read fully into memory.
+        names    -    optional list of the columns to read, all if None.
+
+        Returns:
+        a tuple (columns, metadata) holding a dictionary of numpy arrays
+        and the metadata dictionary.
+        """
+
+        stored, metadata = self.readManifest()
+        mode = 'r' if mmap else None
+
+        if(names is None):
+            names = stored
+
+        columns = {}
+        for name in names:
+            path = os.path.join(self.directory,name + ".npy")
+            try:
+                columns[name] = np.load(path,mmap_mode=mode)
+            except ValueError:
+                # Empty columns cannot be memory mapped.
+                columns[name] = np.load(path)
+
+        return columns, metadata
+
+    # ****************************************************************************************************
@@ -0,0 +1,287 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                   Coordinate Cache Version 1.0                         |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | A persistent memo table of coordinate conversions. The equatorial and  |
+    | galactic coordinates computed for a catalog position never change, so  |
+    | they are stored on disk keyed by the position as listed in the         |
+    | catalog, and reused by later runs. Entries that go unused for several  |
+    | runs are evicted, and the table is compacted when it is saved.         |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+import numpy as np
+
+from ColumnStore import ColumnStore
+
+# Version of the stored table layout. Tables of other versions are discarded.
+COORDINATE_CACHE_FORMAT = 1
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class CoordinateCache:
+    """
+    Maps a catalog position, i.e. the RAJ, DECJ, ELONG and ELAT values of an
+    entry, to the RAJ, DECJ, GL and GB values derived from it. For example:
+
+    cache = CoordinateCache("coordinates.cache")
+    Coordinates().deriveColumns(catalog,cache)   # reuses earlier results.
+    cache.save()
+
+    Each save() starts a new generation. An entry is stamped with the
+    generation in which it was last used, and entries not used in the last
+    maxAge generations are evicted. Should more than maxEntries remain, the
+    least recently used are evicted too.
+    """
+
+    def __init__(self,directory,maxAge=10,maxEntries=1000000,verbose=False):
+        """
+        Opens a cache, reading any table already saved in the directory.
+
+        Parameters:
+        directory     -    the directory holding the cache.
+        maxAge        -    the number of generations an unused entry is kept for.
+        maxEntries    -    the maximum number of entries kept.
+        verbose       -    verbose debugging flag.
+
+        Returns:
+        N/A
+        """
+
+        self.store = ColumnStore(directory)
+        self.maxAge = maxAge
+        self.maxEntries = maxEntries
+        self.verbose = verbose
+
+        self.generation = 0
+
+        # The entries, held as parallel lists, and a dict from key to entry.
+        self.keys = []
+        self.RAJ  = []
+        self.DECJ = []
+        self.GL   = []
+        self.GB   = []
+        self.used = []   # Generation each entry was last used in.
+        self.rows = {}
+
+        self.changed = False
+
+        # Counts describing lookups since the cache was opened.
+        self.hits = 0
+        self.misses = 0
+
+        self.load()
+
+    # ****************************************************************************************************
+
+    def load(self):
+        """
+        Reads the table saved in the cache directory, if there is one.
+        """
+
+        if(self.store.exists() == False):
+            return
+
+        names, metadata = self.store.readManifest()
+
+        if(metadata.get("format") != COORDINATE_CACHE_FORMAT):
+            return
+
+        columns, metadata = self.store.read(mmap=False)
+
+        self.generation = metadata["generation"]
+        self.keys = [key if isinstance(key,str) else key.decode("utf-8") for key in columns["KEY"].tolist()]
+        self.RAJ  = columns["RAJ"].tolist()
+        self.DECJ = columns["DECJ"].tolist()
+        self.GL   = columns["GL"].tolist()
+        self.GB   = columns["GB"].tolist()
+        self.used = columns["USED"].tolist()
+        self.rows = dict((key,row) for row, key in enumerate(self.keys))
+
+    # ****************************************************************************************************
+
+    def key(self,RAJ,DECJ,ELONG,ELAT):
+        """
+        Returns the key of a catalog position.
+
+        Parameters:
+        RAJ      -    the RAJ string, "" if not listed.
+        DECJ     -    the DECJ string, "" if not listed.
+        ELONG    -    the ecliptic longitude in degrees, NaN if not listed.
+        ELAT     -    the ecliptic latitude in degrees, NaN if not listed.
+
+        Returns:
+        the key string.
+        """
+
+        EL = "" if ELONG != ELONG else repr(float(ELONG)) # NaN != NaN
+        EB = "" if ELAT  != ELAT  else repr(float(ELAT))
+
+        return RAJ.strip() + "|" + DECJ.strip() + "|" + EL + "|" + EB
+
+    # ****************************************************************************************************
+
+    def lookup(self,keys):
+        """
+        Looks up many keys, marking the entries found as used.
+
+        Parameters:
+        keys    -    a list of key strings, see key().
+
+        Returns:
+        a list holding, for each key, the tuple (RAJ, DECJ, GL, GB), or None
+        if the key is not in the cache.
+        """
+
+        results = []
+        nextGeneration = self.generation + 1
+
+        for key in keys:
+            row = self.rows.get(key)
+
+            if(row is None):
+                results.append(None)
+                self.misses += 1
+            else:
+                results.append((self.RAJ[row],self.DECJ[row],self.GL[row],self.GB[row]))
+                self.used[row] = nextGeneration
+                self.hits += 1
+
+        return results
+
+    # ****************************************************************************************************
+
+    def add(self,keys,RAJ,DECJ,GL,GB):
+        """
+        Adds the results of newly computed conversions to the cache.
+
+        Parameters:
+        keys    -    a list of key strings, see key().
+        RAJ     -    the RAJ string of each key.
+        DECJ    -    the DECJ string of each key.
+        GL      -    the galactic longitude of each key, in degrees.
+        GB      -    the galactic latitude of each key, in degrees.
+
+        Returns:
+        N/A
+        """
+
+        nextGeneration = self.generation + 1
+
+        for key, ra, dec, gl, gb in zip(keys,RAJ,DECJ,GL,GB):
+            row = self.rows.get(key)
+
+            if(row is None):
+                self.rows[key] = len(self.keys)
+                self.keys.append(key)
+                self.RAJ.append(ra)
+                self.DECJ.append(dec)
+                self.GL.append(float(gl))
+                self.GB.append(float(gb))
+                self.used.append(nextGeneration)
+            else:
+                self.used[row] = nextGeneration
+
+            self.changed = True
+
+    # ****************************************************************************************************
+
+    def save(self):
+        """
+        Ends the current generation: evicts entries that have gone unused
+        for too long, and writes the remaining entries to disk. The table
+        is only written if it changed.
+
+        Parameters:
+        N/A
+
+        Returns:
+        the number of entries evicted.
+        """
+
+        self.generation += 1
+
+        used = np.array(self.used,dtype=np.int64)
+        keep = used > self.generation - self.maxAge
+
+        # Over the size limit, keep only the most recently used entries.
+        if(keep.sum() > self.maxEntries):
+            order = np.argsort(-used,kind="mergesort")
+            keep = np.zeros(len(used),dtype=bool)
+            keep[order[:self.maxEntries]] = True
+
+        evicted = len(used) - int(keep.sum())
+
+        if(self.hits > 0 or evicted > 0):
+            self.changed = True
+
+        if(self.changed == False):
+            self.generation -= 1
+            return 0
+
+        # Compact the table, dropping evicted entries.
+        rows = np.nonzero(keep)[0].tolist()
+        self.keys = [self.keys[row] for row in rows]
+        self.RAJ  = [self.RAJ[row]  for row in rows]
+        self.DECJ = [self.DECJ[row] for row in rows]
+        self.GL   = [self.GL[row]   for row in rows]
+        self.GB   = [self.GB[row]   for row in rows]
+        self.used = [self.used[row] for row in rows]
+        self.rows = dict((key,row) for row, key in enumerate(self.keys))
+
+        columns = {"KEY" : np.array([key.encode("utf-8") for key in self.keys],dtype="S"),
+                   "RAJ" : np.array(self.RAJ,dtype=str),
+                   "DECJ": np.array(self.DECJ,dtype=str),
+                   "GL"  : np.array(self.GL,dtype=np.float64),
+                   "GB"  : np.array(self.GB,dtype=np.float64),
+                   "USED": np.array(self.used,dtype=np.int64)}
+
+        try:
+            self.store.write(columns,{"format": COORDINATE_CACHE_FORMAT, "generation": self.generation})
+        except (IOError, OSError):
+            # The cache is an optimisation only, so an unwritable cache
+            # location must not stop the catalog being used.
+            if(self.verbose):
+                print("\tUnable to write coordinate cache.")
+
+        if(self.verbose):
+            print("\tCoordinate cache: " + str(self.hits) + " hits, " + str(self.misses) + " misses, " +
+                  str(evicted) + " evicted, " + str(len(self.keys)) + " entries.")
+
+        self.changed = False
+        self.hits = 0
+        self.misses = 0
+
+        return evicted
+
+    # ****************************************************************************************************
+
+    def __len__(self):
+        """
+        Returns the number of entries in the cache.
+        """
+
+        return len(self.keys)
+
+    # ****************************************************************************************************
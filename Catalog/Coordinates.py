@@ -0,0 +1,551 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                       Coordinates Version 1.0                          |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Coordinate checks and conversions for ATNF pulsar catalog entries.     |
+    | Computes equatorial coordinates for entries that only list ecliptic    |
+    | coordinates, and galactic coordinates for every entry with a position. |
+    | Positions can also be moved by their proper motion to other epochs.    |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+import numpy as np
+
+# Obliquity of the ecliptic at J2000 (degrees), used to rotate ecliptic
+# coordinates into J2000 equatorial coordinates.
+OBLIQUITY_J2000 = 23.4392911
+
+# Days in a Julian year, used to convert differences between MJDs to years.
+DAYS_PER_YEAR = 365.25
+
+# Milliarcseconds in a radian, proper motions are listed in mas/yr.
+MAS_PER_RADIAN = 180.0 / np.pi * 3600.0 * 1000.0
+
+# Text appended to a sexagesimal value with one, two or three fields, so that
+# every value holds three numbers (see parseSexagesimal).
+PADDING = np.array([[32, 48, 32, 48, 32],  # " 0 0 "
+                    [32, 48, 32, 32, 32],  # " 0   "
+                    [32, 32, 32, 32, 32]], # "     "
+                   dtype=np.uint8)
+
+# Rotation matrix taking ICRS (J2000 equatorial) unit vectors to galactic
+# unit vectors. These are the values astropy uses for the same transform.
+GALACTIC_MATRIX = np.array([[-0.05487565771259163, -0.8734370519556159 , -0.48383507361671546],
+                            [ 0.4941094371927268 , -0.4448297212232952 ,  0.7469821839866676 ],
+                            [-0.8676661375596576 , -0.19807633727300053,  0.4559838136873016 ]])
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class Coordinates:
+    """
+    Checks and converts the coordinates of ATNF catalog entries. Some ATNF
+    entries have no RAJ or DECJ listed, only ecliptic longitude and
+    latitude. No entries list galactic coordinates.
+    """
+
+    # ****************************************************************************************************
+
+    def checkFormatEquatorialCoordinate(self,coord):
+        """
+        Checks an equatorial coordinate component (RA or DEC) is
+        correctly formed as a string, i.e. has the format:
+
+        HH:MM:SS or DD:MM:SS
+        :param coord:
+            the coordinate the check.
+        :return:
+            the correctly formatted string.
+        """
+        components=coord.split(":")
+        length = len(components)
+        formatedCoord = ""
+        if(length<3):
+            if(length==1):
+                formatedCoord=coord+":00:00"
+            elif(length==2):
+                formatedCoord=coord+":00"
+        else:
+            formatedCoord = coord
+
+        return formatedCoord
+
+    # ****************************************************************************************************
+
+    def parseSexagesimal(self,values,hours=False):
+        """
+        Parses an array of sexagesimal strings in any of the forms used by
+        the catalog, e.g. "00:06:04.8", "+04:32:11.4580", "18:34" or "-72".
+        The sign is taken from the text, so "-00:30" is negative.
+
+        The strings are rewritten as one block of text holding exactly three
+        numbers per value (missing minutes and seconds become zero), which
+        numpy then converts in a single call. Should any value be malformed
+        the values are instead parsed one at a time.
+
+        Parameters:
+        values    -    a list or array of strings.
+        hours     -    True if the values are in hours (RA), False if in
+                       degrees (DEC).
+
+        Returns:
+        a tuple (radians, degrees) of numpy arrays, NaN where a value is
+        empty or malformed.
+        """
+
+        degrees = None
+
+        try:
+            text = np.asarray(values).astype("S")
+        except UnicodeError:
+            text = None
+
+        if(text is not None and text.size > 0):
+            n = len(text)
+            width = text.dtype.itemsize
+            characters = text.view(np.uint8).reshape(n,width)
+
+            negative = (characters == ord("-")).any(axis=1)
+            colons = (characters == ord(":")).sum(axis=1)
+            empty = ~((characters >= ord("0")) & (characters <= ord("9"))).any(axis=1)
+
+            # Each value becomes a line of space separated numbers: signs,
+            # colons and padding are replaced by spaces, then "0 0", "0"
+            # or nothing is appended, depending on the fields present.
+            lines = np.empty((n,width + 5),dtype=np.uint8)
+            lines[:,:width] = characters
+            lines[:,:width][(characters == ord("+")) | (characters == ord("-")) |
+                            (characters == ord(":")) | (characters == 0)] = ord(" ")
+            lines[empty,:width] = ord(" ")
+            lines[empty,0] = ord("0")
+            lines[:,width:] = PADDING[np.minimum(colons,2)]
+
+            try:
+                numbers = np.fromstring(lines.tobytes(),dtype=np.float64,sep=" ")
+            except ValueError:
+                numbers = None
+
+            if(numbers is not None and len(numbers) == 3 * n and (colons <= 2).all()):
+                numbers = numbers.reshape(n,3)
+                degrees = numbers[:,0] + numbers[:,1] / 60.0 + numbers[:,2] / 3600.0
+                degrees = np.where(negative,-degrees,degrees)
+                degrees[empty] = np.nan
+
+        if(degrees is None):
+            degrees = np.array([self.parseSexagesimalValue(value) for value in values],dtype=np.float64)
+
+        if(hours):
+            degrees = degrees * 15.0
+
+        return np.radians(degrees), degrees
+
+    # ****************************************************************************************************
+
+    def parseSexagesimalValue(self,value):
+        """
+        Parses a single sexagesimal string, e.g. "-00:30", to a number of
+        degrees (or hours). Used when a batch of values can't be parsed at once.
+
+        Parameters:
+        value    -    the string to parse.
+
+        Returns:
+        the value as a float, or NaN if the value is empty or malformed.
+        """
+
+        value = value.strip()
+        components = value.lstrip("+-").split(":")
+
+        if(not value.lstrip("+-") or len(components) > 3):
+            return np.nan
+
+        try:
+            magnitude = 0.0
+            for component, scale in zip(components,(1.0,60.0,3600.0)):
+                magnitude += float(component or "0") / scale
+        except ValueError:
+            return np.nan
+
+        return -magnitude if value.startswith("-") else magnitude
+
+    # ****************************************************************************************************
+
+    def degreesToSexagesimal(self,values,hours=False):
+        """
+        Formats angles in degrees as sexagesimal strings, in the style of the
+        catalog, e.g. "00:06:04.80" for RA and "+18:34:59.0" for DEC.
+
+        Parameters:
+        values    -    array of angles in degrees.
+        hours     -    True to format as hours (RA), with seconds to 0.01,
+                       False to format as signed degrees (DEC), to 0.1.
+
+        Returns:
+        a list of strings, empty where a value is NaN.
+        """
+
+        values = np.asarray(values,dtype=np.float64)
+
+        if(hours):
+            scale = 100 # Hundredths of a second of time.
+            units = np.round(np.nan_to_num(values) / 15.0 * 3600.0 * scale)
+            units = units % (24 * 3600 * scale)
+        else:
+            scale = 10  # Tenths of an arcsecond.
+            units = np.round(np.nan_to_num(values) * 3600.0 * scale)
+
+        # Work with whole numbers of units, so rounding never produces a
+        # field such as 60 seconds.
+        magnitude = np.abs(units).astype(np.int64)
+        whole, fraction = np.divmod(magnitude,scale)
+        minutes, seconds = np.divmod(whole,60)
+        first, minutes = np.divmod(minutes,60)
+
+        strings = []
+        for i in range(len(values)):
+            if(np.isnan(values[i])):
+                strings.append("")
+            elif(hours):
+                strings.append("%02d:%02d:%02d.%02d" % (first[i],minutes[i],seconds[i],fraction[i]))
+            else:
+                sign = "-" if units[i] < 0 else "+"
+                strings.append("%s%02d:%02d:%02d.%01d" % (sign,first[i],minutes[i],seconds[i],fraction[i]))
+
+        return strings
+
+    # ****************************************************************************************************
+
+    def eclipticToEquatorial(self,EL,EB):
+        """
+        Converts arrays of J2000 ecliptic coordinates to J2000 equatorial
+        coordinates, using one rotation (about the equinox direction, by the
+        obliquity of the ecliptic) for the whole array.
+
+        Parameters:
+        EL    -    array of ecliptic longitudes in degrees.
+        EB    -    array of ecliptic latitudes in degrees.
+
+        Returns:
+        a tuple (RA, DEC) of numpy arrays in degrees, with RA from 0 to 360.
+        """
+
+        EL = np.radians(np.asarray(EL,dtype=np.float64))
+        EB = np.radians(np.asarray(EB,dtype=np.float64))
+
+        obliquity = np.radians(OBLIQUITY_J2000)
+        cosObliquity = np.cos(obliquity)
+        sinObliquity = np.sin(obliquity)
+
+        x = np.cos(EB) * np.cos(EL)
+        y = np.cos(EB) * np.sin(EL)
+        z = np.sin(EB)
+
+        RA  = np.degrees(np.arctan2(y * cosObliquity - z * sinObliquity,x)) % 360.0
+        DEC = np.degrees(np.arcsin(np.clip(y * sinObliquity + z * cosObliquity,-1.0,1.0)))
+
+        return RA, DEC
+
+    # ****************************************************************************************************
+
+    def equatorialToGalactic(self,RA,DEC):
+        """
+        Converts arrays of J2000 equatorial coordinates to galactic
+        coordinates, using one matrix rotation for the whole array.
+
+        Parameters:
+        RA     -    array of right ascensions in degrees.
+        DEC    -    array of declinations in degrees.
+
+        Returns:
+        a tuple (GL, GB) of numpy arrays in degrees, with GL from 0 to 360.
+        """
+
+        RA  = np.radians(np.asarray(RA,dtype=np.float64))
+        DEC = np.radians(np.asarray(DEC,dtype=np.float64))
+
+        cosDec = np.cos(DEC)
+        equatorial = np.vstack((cosDec * np.cos(RA), cosDec * np.sin(RA), np.sin(DEC)))
+
+        x, y, z = np.dot(GALACTIC_MATRIX,equatorial)
+
+        GL = np.degrees(np.arctan2(y,x)) % 360.0
+        GB = np.degrees(np.arcsin(np.clip(z,-1.0,1.0)))
+
+        return GL, GB
+
+    # ****************************************************************************************************
+
+    def convert(self,RAJ,DECJ,ELONG,ELAT):
+        """
+        Computes the equatorial and galactic coordinates of many catalog
+        positions at once.
+
+        Parameters:
+        RAJ      -    list of RAJ strings, "" where not listed.
+        DECJ     -    list of DECJ strings, "" where not listed.
+        ELONG    -    array of ecliptic longitudes in degrees, NaN where not listed.
+        ELAT     -    array of ecliptic latitudes in degrees, NaN where not listed.
+
+        Returns:
+        a tuple (RAJ, DECJ, GL, GB). RAJ and DECJ are lists of strings,
+        filled in where only ecliptic coordinates are listed. GL and GB are
+        numpy arrays in degrees, NaN where there is no full position.
+        """
+
+        RAJ  = list(RAJ)
+        DECJ = list(DECJ)
+
+        RA  = self.parseSexagesimal(RAJ,True)[1]
+        DEC = self.parseSexagesimal(DECJ)[1]
+
+        # Entries with only ecliptic coordinates are converted all at once.
+        noEquatorial = np.array([not ra and not dec for ra, dec in zip(RAJ,DECJ)],dtype=bool)
+        ecliptic = noEquatorial & ~np.isnan(ELONG) & ~np.isnan(ELAT)
+
+        if(ecliptic.any()):
+            RA[ecliptic], DEC[ecliptic] = self.eclipticToEquatorial(ELONG[ecliptic],ELAT[ecliptic])
+
+            rows = np.nonzero(ecliptic)[0]
+            for i, ra, dec in zip(rows,self.degreesToSexagesimal(RA[ecliptic],True),self.degreesToSexagesimal(DEC[ecliptic])):
+                RAJ[i]  = ra
+                DECJ[i] = dec
+
+        # Then every position is converted to galactic coordinates at once.
+        GL, GB = self.equatorialToGalactic(RA,DEC)
+
+        return RAJ, DECJ, GL, GB
+
+    # ****************************************************************************************************
+
+    def deriveColumns(self,catalog,cache=None):
+        """
+        Adds GL and GB columns (degrees) to a catalog, and fills in the RAJ
+        and DECJ columns of entries that only list ecliptic coordinates.
+
+        Parameters:
+        catalog    -    the PulsarCatalog to update, which should hold
+                        RAJ, DECJ, ELONG and ELAT columns.
+        cache      -    optional CoordinateCache. Positions found in it are
+                        not converted again, and new results are added to it.
+
+        Returns:
+        N/A
+        """
+
+        n = len(catalog)
+
+        RAJ   = catalog["RAJ"].tolist()  if "RAJ"   in catalog else [""] * n
+        DECJ  = catalog["DECJ"].tolist() if "DECJ"  in catalog else [""] * n
+        ELONG = catalog["ELONG"]         if "ELONG" in catalog else np.full(n,np.nan)
+        ELAT  = catalog["ELAT"]          if "ELAT"  in catalog else np.full(n,np.nan)
+
+        if(cache is None):
+            RAJ, DECJ, GL, GB = self.convert(RAJ,DECJ,ELONG,ELAT)
+        else:
+            keys = [cache.key(RAJ[i],DECJ[i],ELONG[i],ELAT[i]) for i in range(n)]
+            results = cache.lookup(keys)
+
+            GL = np.full(n,np.nan)
+            GB = np.full(n,np.nan)
+
+            misses = []
+            for i, result in enumerate(results):
+                if(result is None):
+                    misses.append(i)
+                else:
+                    RAJ[i], DECJ[i], GL[i], GB[i] = result
+
+            # Convert only the positions missing from the cache.
+            if(misses):
+                misses = np.array(misses,dtype=np.int64)
+                missRAJ, missDECJ, GL[misses], GB[misses] = self.convert([RAJ[i] for i in misses],[DECJ[i] for i in misses],
+                                                                         ELONG[misses],ELAT[misses])
+                for i, ra, dec in zip(misses,missRAJ,missDECJ):
+                    RAJ[i]  = ra
+                    DECJ[i] = dec
+
+                cache.add([keys[i] for i in misses],missRAJ,missDECJ,GL[misses],GB[misses])
+
+        catalog.columns["RAJ"]  = np.array(RAJ,dtype=str)
+        catalog.columns["DECJ"] = np.array(DECJ,dtype=str)
+        catalog.columns["GL"]   = GL
+        catalog.columns["GB"]   = GB
+
+    # ****************************************************************************************************
+
+    def tangentVelocities(self,longitudes,latitudes,pmLongitudes,pmLatitudes):
+        """
+        Converts proper motions to velocities tangent to the unit sphere.
+
+        Parameters:
+        longitudes      -    array of longitudes in degrees.
+        latitudes       -    array of latitudes in degrees.
+        pmLongitudes    -    array of proper motions in longitude, multiplied
+                             by the cosine of the latitude (as listed in the
+                             catalog), in mas/yr.
+        pmLatitudes     -    array of proper motions in latitude, in mas/yr.
+
+        Returns:
+        a (3, n) numpy array of velocities, in radians per year.
+        """
+
+        lon = np.radians(np.asarray(longitudes,dtype=np.float64))
+        lat = np.radians(np.asarray(latitudes,dtype=np.float64))
+
+        pmLon = np.asarray(pmLongitudes,dtype=np.float64) / MAS_PER_RADIAN
+        pmLat = np.asarray(pmLatitudes,dtype=np.float64) / MAS_PER_RADIAN
+
+        # Unit vectors pointing east, and north, at each position.
+        east  = np.vstack((-np.sin(lon), np.cos(lon), np.zeros(len(lon))))
+        north = np.vstack((-np.sin(lat) * np.cos(lon), -np.sin(lat) * np.sin(lon), np.cos(lat)))
+
+        return pmLon * east + pmLat * north
+
+    # ****************************************************************************************************
+
+    def propagate(self,RA,DEC,PMRA,PMDEC,POSEPOCH,epochs,ELONG=None,ELAT=None,PMELONG=None,PMELAT=None):
+        """
+        Moves positions by their proper motion, from the epoch at which they
+        were measured to one or more other epochs. The motion is applied as
+        a straight line tangent to the sphere, which is accurate for the
+        small angles pulsars move over decades. Every position and epoch is
+        handled at once with array operations.
+
+        Parameters:
+        RA          -    array of right ascensions in degrees.
+        DEC         -    array of declinations in degrees.
+        PMRA        -    array of proper motions in RA (times cos DEC), mas/yr.
+        PMDEC       -    array of proper motions in DEC, mas/yr.
+        POSEPOCH    -    array of the epochs (MJD) of the positions.
+        epochs      -    the epoch to move to (MJD), or an array of epochs.
+        ELONG       -    optional array of ecliptic longitudes in degrees.
+        ELAT        -    optional array of ecliptic latitudes in degrees.
+        PMELONG     -    optional array of proper motions in ecliptic
+                         longitude (times cos ELAT), mas/yr.
+        PMELAT      -    optional array of proper motions in ecliptic
+                         latitude, mas/yr.
+
+        The ecliptic proper motions are used for entries listing no PMRA
+        and PMDEC. Entries without a proper motion, or without an epoch,
+        are not moved.
+
+        Returns:
+        a tuple (RA, DEC) of numpy arrays in degrees. For a single epoch they
+        hold one value per position, and for an array of epochs they have
+        shape (number of epochs, number of positions).
+        """
+
+        RA    = np.asarray(RA,dtype=np.float64)
+        DEC   = np.asarray(DEC,dtype=np.float64)
+        PMRA  = np.asarray(PMRA,dtype=np.float64)
+        PMDEC = np.asarray(PMDEC,dtype=np.float64)
+
+        # Positions as unit vectors, one column per position.
+        ra  = np.radians(RA)
+        dec = np.radians(DEC)
+        positions = np.vstack((np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)))
+
+        equatorial = ~(np.isnan(PMRA) & np.isnan(PMDEC))
+        velocities = self.tangentVelocities(RA,DEC,np.nan_to_num(PMRA),np.nan_to_num(PMDEC))
+        velocities[:,~equatorial] = 0.0
+
+        # Ecliptic proper motions are found in the ecliptic frame, then
+        # rotated into the equatorial frame as in eclipticToEquatorial().
+        if(ELONG is not None and PMELONG is not None):
+            PMELONG = np.asarray(PMELONG,dtype=np.float64)
+            PMELAT  = np.asarray(PMELAT,dtype=np.float64)
+
+            ecliptic = ~equatorial & ~(np.isnan(PMELONG) & np.isnan(PMELAT))
+
+            if(ecliptic.any()):
+                x, y, z = self.tangentVelocities(np.asarray(ELONG,dtype=np.float64)[ecliptic],
+                                                 np.asarray(ELAT,dtype=np.float64)[ecliptic],
+                                                 np.nan_to_num(PMELONG[ecliptic]),np.nan_to_num(PMELAT[ecliptic]))
+
+                obliquity = np.radians(OBLIQUITY_J2000)
+                velocities[0,ecliptic] = x
+                velocities[1,ecliptic] = y * np.cos(obliquity) - z * np.sin(obliquity)
+                velocities[2,ecliptic] = y * np.sin(obliquity) + z * np.cos(obliquity)
+
+        # Positions with unknown proper motion or epoch don't move.
+        velocities[:,np.isnan(velocities).any(axis=0)] = 0.0
+
+        single = np.ndim(epochs) == 0
+        epochs = np.atleast_1d(np.asarray(epochs,dtype=np.float64))
+
+        years = (epochs[:,np.newaxis] - np.asarray(POSEPOCH,dtype=np.float64)[np.newaxis,:]) / DAYS_PER_YEAR
+        years = np.where(np.isnan(years),0.0,years)
+
+        # Shape (3, epochs, positions).
+        moved = positions[:,np.newaxis,:] + velocities[:,np.newaxis,:] * years[np.newaxis,:,:]
+        x, y, z = moved / np.sqrt((moved ** 2).sum(axis=0))
+
+        newRA  = np.degrees(np.arctan2(y,x)) % 360.0
+        newDEC = np.degrees(np.arcsin(np.clip(z,-1.0,1.0)))
+
+        if(single):
+            return newRA[0], newDEC[0]
+
+        return newRA, newDEC
+
+    # ****************************************************************************************************
+
+    def positionsAt(self,catalog,epochs):
+        """
+        Returns the positions of every catalog entry at one or more epochs.
+
+        Parameters:
+        catalog    -    a PulsarCatalog, after deriveColumns(), holding the
+                        RAJ, DECJ, PMRA, PMDEC and POSEPOCH columns, and
+                        optionally ELONG, ELAT, PMELONG, PMELAT and PEPOCH.
+        epochs     -    the epoch (MJD), or an array of epochs.
+
+        Entries without a POSEPOCH are taken to be measured at their PEPOCH,
+        as psrcat does.
+
+        Returns:
+        a tuple (RA, DEC, GL, GB) of numpy arrays in degrees, shaped as
+        described in propagate().
+        """
+
+        n = len(catalog)
+
+        def column(name):
+            if(name in catalog):
+                return catalog[name]
+            return np.full(n,np.nan)
+
+        RA  = self.parseSexagesimal(catalog["RAJ"].tolist(),True)[1]
+        DEC = self.parseSexagesimal(catalog["DECJ"].tolist())[1]
+
+        POSEPOCH = column("POSEPOCH")
+        POSEPOCH = np.where(np.isnan(POSEPOCH),column("PEPOCH"),POSEPOCH)
+
+        RA, DEC = self.propagate(RA,DEC,column("PMRA"),column("PMDEC"),POSEPOCH,epochs,
+                                 column("ELONG"),column("ELAT"),column("PMELONG"),column("PMELAT"))
+
+        GL, GB = self.equatorialToGalactic(RA.ravel(),DEC.ravel())
+
+        return RA, DEC, GL.reshape(RA.shape), GB.reshape(DEC.shape)
+
+    # ****************************************************************************************************
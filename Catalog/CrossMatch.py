@@ -0,0 +1,355 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                      Cross Match Version 1.0                           |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Cross matches an external list of sources (e.g. survey detections, or  |
+    | FRBs) against the pulsar catalog, finding every pulsar within an       |
+    | angular tolerance of each source, and optionally within a DM           |
+    | tolerance too. Sources are read from a CSV file, or from a column      |
+    | store directory, and matched all at once using KD-trees.               |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | Required Command Line Arguments:                                       |
+    |                                                                        |
+    | -a (string) full path to a ATNF pulsar catalog database file.          |
+    |                                                                        |
+    | -s (string) full path to the source list, either a CSV file with a     |
+    |             header line, or a column store directory. It must hold GL  |
+    |             and GB (deg), or RAJ and DECJ (sexagesimal) columns, and   |
+    |             may hold NAME and DM columns.                              |
+    |                                                                        |
+    **************************************************************************
+    | Optional Command Line Arguments:                                       |
+    |                                                                        |
+    | -r (float) match radius in degrees (default 0.1).                      |
+    |                                                                        |
+    | -d (float) DM tolerance in cm^-3 pc. When given, a source with a DM    |
+    |            only matches pulsars whose DM is within this tolerance.     |
+    |                                                                        |
+    | -e (float) epoch (MJD) of the source list. When given, pulsar          |
+    |            positions are moved by their proper motion to this epoch    |
+    |            before matching.                                            |
+    |                                                                        |
+    | -o (string) full path to a CSV file the matches are written to. When   |
+    |             not given, the matches are printed.                        |
+    |                                                                        |
+    | -v (boolean) verbose debugging flag.                                   |
+    |                                                                        |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+
+import os, sys
+import time
+
+import numpy as np
+
+from CatalogCache import CatalogCache
+from ColumnStore import ColumnStore
+from CSVCatalog import CSVCatalog
+from Coordinates import Coordinates
+from SkyIndex import SkyIndex
+
+# The catalog parameters needed to cross match.
+MATCH_PARAMETERS = ["PSRJ", "PSRB", "RAJ", "DECJ", "ELONG", "ELAT", "DM",
+                    "PMRA", "PMDEC", "PMELONG", "PMELAT", "POSEPOCH", "PEPOCH"]
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class CrossMatch:
+    """
+    Matches sources against a catalog, for example:
+
+    crossMatch = CrossMatch(catalog)   # catalog holding GL, GB and DM columns.
+    sources = crossMatch.readSources("detections.csv")
+    found, rows, separations = crossMatch.match(sources["GL"],sources["GB"],0.5,
+                                                sources["DM"],dmTolerance=10.0)
+
+    Each element of the returned arrays describes one match: the row of the
+    source, the row of the pulsar in the catalog, and their separation in
+    degrees. A DM tolerance only applies where both the source and the
+    pulsar have a DM, otherwise position alone decides the match.
+    """
+
+    def __init__(self,catalog=None):
+        """
+        Creates a new cross matcher.
+
+        Parameters:
+        catalog    -    optional catalog to index, see index().
+
+        Returns:
+        N/A
+        """
+
+        self.catalog = None
+        self.skyIndex = None
+        self.DM = None
+
+        if(catalog is not None):
+            self.index(catalog)
+
+    # ****************************************************************************************************
+
+    def index(self,catalog):
+        """
+        Indexes the positions of a catalog.
+
+        Parameters:
+        catalog    -    a PulsarCatalog, or a dictionary of columns, holding
+                        GL and GB columns in degrees, and optionally DM.
+
+        Returns:
+        N/A
+        """
+
+        self.catalog = catalog
+        self.skyIndex = SkyIndex(catalog["GL"],catalog["GB"])
+
+        if("DM" in catalog):
+            self.DM = np.asarray(catalog["DM"],dtype=np.float64)
+        else:
+            self.DM = np.full(len(catalog["GL"]),np.nan)
+
+    # ****************************************************************************************************
+
+    def match(self,longitudes,latitudes,radius,DMs=None,dmTolerance=None):
+        """
+        Finds the catalog pulsars near each of many sources.
+
+        Parameters:
+        longitudes     -    array of source galactic longitudes, in degrees.
+        latitudes      -    array of source galactic latitudes, in degrees.
+        radius         -    the match radius, in degrees.
+        DMs            -    optional array of source DMs, NaN where unknown.
+        dmTolerance    -    optional DM tolerance, in cm^-3 pc.
+
+        Returns:
+        a tuple (sources, rows, separations) of numpy arrays, one element per
+        match, ordered by source and then nearest first.
+        """
+
+        sources, rows, separations = self.skyIndex.pairs(longitudes,latitudes,radius)
+
+        if(DMs is not None and dmTolerance is not None):
+            DMs = np.atleast_1d(np.asarray(DMs,dtype=np.float64))
+
+            sourceDMs = DMs[sources]
+            pulsarDMs = self.DM[rows]
+
+            # Comparisons with NaN are False, so pairs missing either DM are
+            # kept by the first two terms.
+            with np.errstate(invalid='ignore'):
+                keep = np.isnan(sourceDMs) | np.isnan(pulsarDMs) | (np.abs(sourceDMs - pulsarDMs) <= dmTolerance)
+
+            sources, rows, separations = sources[keep], rows[keep], separations[keep]
+
+        return sources, rows, separations
+
+    # ****************************************************************************************************
+
+    def readColumns(self,path):
+        """
+        Reads the raw columns of a source list.
+
+        Parameters:
+        path    -    the path to a CSV file with a header line, or to a
+                     column store directory.
+
+        Returns:
+        a dictionary mapping column keys (see CSVCatalog.columnKey) to numpy arrays.
+        """
+
+        if(os.path.isdir(path)):
+            columns, metadata = ColumnStore(path).read(mmap=False)
+            return dict((CSVCatalog().columnKey(name),column) for name, column in columns.items())
+
+        return CSVCatalog().load(path).columns
+
+    # ****************************************************************************************************
+
+    def toFloat(self,column):
+        """
+        Converts a column to float64, mapping the missing value markers
+        "*" and "" to NaN.
+        """
+
+        column = np.asarray(column)
+
+        if(column.dtype.kind in "SU"):
+            column = np.char.strip(column.astype(str))
+            column = np.where((column == "*") | (column == ""),"nan",column)
+
+        return column.astype(np.float64)
+
+    # ****************************************************************************************************
+
+    def toText(self,column):
+        """
+        Converts a column to a list of strings, mapping "*" to "".
+        """
+
+        values = []
+        for value in np.asarray(column).tolist():
+            if(not isinstance(value,str)):
+                value = value.decode("ascii") if isinstance(value,bytes) else str(value)
+            value = value.strip()
+            values.append("" if value == "*" else value)
+
+        return values
+
+    # ****************************************************************************************************
+
+    def readSources(self,path):
+        """
+        Reads a source list, converting positions to galactic coordinates.
+
+        Parameters:
+        path    -    the path to a CSV file with a header line, or to a
+                     column store directory. The list must hold GL and GB
+                     columns in degrees, or RAJ and DECJ columns in
+                     sexagesimal form. NAME and DM columns are optional.
+
+        Returns:
+        a dictionary holding NAME, GL, GB and DM columns. Sources without
+        a name are named after their row, and missing DMs are NaN.
+        """
+
+        columns = self.readColumns(path)
+
+        if("GL" in columns and "GB" in columns):
+            GL = self.toFloat(columns["GL"])
+            GB = self.toFloat(columns["GB"])
+        elif("RAJ" in columns and "DECJ" in columns):
+            coordinates = Coordinates()
+            RA  = coordinates.parseSexagesimal(self.toText(columns["RAJ"]),True)[1]
+            DEC = coordinates.parseSexagesimal(self.toText(columns["DECJ"]))[1]
+            GL, GB = coordinates.equatorialToGalactic(RA,DEC)
+        else:
+            raise ValueError("Source list " + path + " must hold GL and GB, or RAJ and DECJ columns.")
+
+        n = len(GL)
+
+        if("NAME" in columns):
+            names = self.toText(columns["NAME"])
+        else:
+            names = [""] * n
+
+        names = [name or str(row + 1) for row, name in enumerate(names)]
+
+        if("DM" in columns):
+            DM = self.toFloat(columns["DM"])
+        else:
+            DM = np.full(n,np.nan)
+
+        return {"NAME": np.array(names,dtype=str), "GL": GL, "GB": GB, "DM": DM}
+
+    # ****************************************************************************************************
+
+    def main(self,argv=None):
+        """
+        Main entry point for the Application. Processes command line
+        input and cross matches the source list against the catalog.
+
+        """
+
+        # ****************************************
+        #         Execution information
+        # ****************************************
+
+        print(__doc__)
+
+        # ****************************************
+        #    Command line argument processing
+        # ****************************************
+
+        # Python 2.4 argument processing.
+        parser = OptionParser()
+
+        # REQUIRED ARGUMENTS
+        parser.add_option("-a", action="store", dest="atnfPath",help='Path to a pulsar catalog file.',default="")
+        parser.add_option("-s", action="store", dest="sourcePath",help='Path to the source list.',default="")
+
+        # OPTIONAL ARGUMENTS
+        parser.add_option("-r", action="store", dest="radius",type="float",help='Match radius in degrees (optional).',default=0.1)
+        parser.add_option("-d", action="store", dest="dmTolerance",type="float",help='DM tolerance in cm^-3 pc (optional).',default=None)
+        parser.add_option("-e", action="store", dest="epoch",type="float",help='Epoch (MJD) of the source list (optional).',default=None)
+        parser.add_option("-o", action="store", dest="outputPath",help='Path to the CSV file matches are written to (optional).',default="")
+        parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+
+        (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+        # Check arguments for validity...
+        if(os.path.isfile(args.atnfPath) == False or os.path.exists(args.sourcePath) == False):
+            print("\n\tYou must supply a valid ATNF file via the -a flag, and a valid source list via the -s flag.")
+            sys.exit()
+
+        start = time.time()
+
+        catalog = CatalogCache(verbose=args.verbose).loadDatabase(args.atnfPath,MATCH_PARAMETERS)
+        coordinates = Coordinates()
+        coordinates.deriveColumns(catalog)
+
+        # Match against the positions of the pulsars at the epoch of the sources.
+        if(args.epoch is not None):
+            RA, DEC, catalog.columns["GL"], catalog.columns["GB"] = coordinates.positionsAt(catalog,args.epoch)
+
+        self.index(catalog)
+        sources = self.readSources(args.sourcePath)
+
+        found, rows, separations = self.match(sources["GL"],sources["GB"],args.radius,sources["DM"],args.dmTolerance)
+
+        # One line per match, using the same missing value marker as the catalog CSV files.
+        lines = ["SOURCE,PSRJ,PSRB,SEPARATION(deg),SOURCE_DM,DM"]
+        for source, row, separation in zip(found.tolist(),rows.tolist(),separations.tolist()):
+            sourceDM = sources["DM"][source]
+            pulsarDM = self.DM[row]
+
+            lines.append(",".join([sources["NAME"][source], catalog["PSRJ"][row] or "*", catalog["PSRB"][row] or "*",
+                                   "%.4f" % separation,
+                                   "*" if np.isnan(sourceDM) else str(sourceDM),
+                                   "*" if np.isnan(pulsarDM) else str(pulsarDM)]))
+
+        if(args.outputPath != ""):
+            outputFile = open(args.outputPath,'w')
+            outputFile.write("\n".join(lines) + "\n")
+            outputFile.close()
+        else:
+            print("\n\t" + "\n\t".join(lines))
+
+        print("\n\tCatalog version  : " + catalog.version)
+        print("\tPulsars indexed  : " + str(len(self.skyIndex)))
+        print("\tSources          : " + str(len(sources["NAME"])))
+        print("\tSources matched  : " + str(len(np.unique(found))))
+        print("\tMatches          : " + str(len(found)))
+        print("\tTime (s)         : " + ("%.3f" % (time.time() - start)))
+
+        print("\n\tDone.")
+        print("\t**************************************************************************") # Used only for formatting purposes.
+
+    # ****************************************************************************************************
+
+if __name__ == '__main__':
+    CrossMatch().main()
@@ -0,0 +1,134 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                     Histogram 2D Version 1.0                           |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | A two dimensional histogram accumulated chunk by chunk, so that the    |
+    | distribution of two parameters (e.g. P0 against P1) can be plotted for |
+    | catalogs far too large to scatter plot, or to hold in memory. The bin  |
+    | edges are fixed in advance, so the memory used depends only on the     |
+    | number of bins.                                                        |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+import numpy as np
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class Histogram2D:
+    """
+    Counts pairs of values in a fixed grid of bins, for example:
+
+    histogram = Histogram2D((1e-3,1e2),(1e-22,1e-8),log=True)
+    for chunk in CSVCatalog(["P0","P1"]).chunks(path):
+        histogram.update(chunk["P0"],chunk["P1"])
+    plt.pcolormesh(histogram.xEdges,histogram.yEdges,histogram.counts.T)
+
+    Pairs where either value is missing (NaN), outside the range of the
+    bins, or (for log bins) not positive, are not counted but are tallied
+    in skipped.
+    """
+
+    def __init__(self,xRange,yRange,bins=100,log=False):
+        """
+        Creates a new, empty histogram.
+
+        Parameters:
+        xRange    -    a tuple (low, high) of the range of the x bins.
+        yRange    -    a tuple (low, high) of the range of the y bins.
+        bins      -    the number of bins along each axis.
+        log       -    if True the bins are evenly spaced in log10 of the
+                       values, as suits P0, P1, AGE or EDOT.
+
+        Returns:
+        N/A
+        """
+
+        self.log = log
+
+        if(log):
+            self.xEdges = np.logspace(np.log10(xRange[0]),np.log10(xRange[1]),bins + 1)
+            self.yEdges = np.logspace(np.log10(yRange[0]),np.log10(yRange[1]),bins + 1)
+        else:
+            self.xEdges = np.linspace(xRange[0],xRange[1],bins + 1)
+            self.yEdges = np.linspace(yRange[0],yRange[1],bins + 1)
+
+        self.counts  = np.zeros((bins,bins),dtype=np.int64)
+        self.skipped = 0
+
+    # ****************************************************************************************************
+
+    def update(self,x,y):
+        """
+        Adds a chunk of pairs of values.
+
+        Parameters:
+        x    -    an array of x values, NaN where missing.
+        y    -    an array of y values, NaN where missing.
+
+        Returns:
+        this histogram, to allow calls to be chained.
+        """
+
+        x = np.asarray(x,dtype=np.float64)
+        y = np.asarray(y,dtype=np.float64)
+
+        with np.errstate(invalid='ignore'):
+            keep = ((x >= self.xEdges[0]) & (x <= self.xEdges[-1]) &
+                    (y >= self.yEdges[0]) & (y <= self.yEdges[-1]))
+
+        counts, xEdges, yEdges = np.histogram2d(x[keep],y[keep],bins=(self.xEdges,self.yEdges))
+
+        self.counts  += counts.astype(np.int64)
+        self.skipped += len(x) - int(np.count_nonzero(keep))
+
+        return self
+
+    # ****************************************************************************************************
+
+    def merge(self,other):
+        """
+        Adds the counts of another histogram with the same bins.
+
+        Parameters:
+        other    -    the Histogram2D to merge in.
+
+        Returns:
+        this histogram, to allow calls to be chained.
+        """
+
+        self.counts  += other.counts
+        self.skipped += other.skipped
+
+        return self
+
+    # ****************************************************************************************************
+
+    def total(self):
+        """
+        Returns the number of pairs counted.
+        """
+
+        return int(self.counts.sum())
+
+    # ****************************************************************************************************
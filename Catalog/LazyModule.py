@@ -0,0 +1,125 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                      Lazy Module Version 1.0                           |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Defers the import of heavy modules (matplotlib, scipy, ...) until they |
+    | are first used, so scripts only pay for the modules their code path    |
+    | needs. The time taken by each deferred import is recorded, and can be  |
+    | reported to find where start up time goes.                             |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+import time
+import importlib
+
+# The (module name, seconds) taken by each deferred import, in load order.
+IMPORT_TIMES = []
+
+# ****************************************************************************************************
+
+def printImportTimes():
+    """
+    Prints the time taken by each deferred import made so far.
+
+    Parameters:
+    N/A
+
+    Returns:
+    N/A
+    """
+
+    print("\n\t+----- IMPORT TIMES -----+")
+
+    if(not IMPORT_TIMES):
+        print("\tNo deferred modules were imported.")
+
+    for name, seconds in IMPORT_TIMES:
+        print("\t" + name.ljust(24) + " : " + ("%.3f" % seconds) + " s")
+
+    print("\t" + "Total".ljust(24) + " : " + ("%.3f" % sum(seconds for name, seconds in IMPORT_TIMES)) + " s")
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class LazyModule:
+    """
+    Stands in for a module until one of its attributes is used, at which
+    point the module is imported. For example:
+
+    plt = LazyModule("matplotlib.pyplot")   # Nothing is imported yet.
+    ...
+    plt.show()                              # matplotlib.pyplot is imported here.
+    """
+
+    def __init__(self,name):
+        """
+        Creates a new stand in for a module.
+
+        Parameters:
+        name    -    the full name of the module, e.g. "scipy.stats".
+
+        Returns:
+        N/A
+        """
+
+        # Set through __dict__, so __getattr__ is never involved.
+        self.__dict__["lazyName"] = name
+        self.__dict__["lazyModule"] = None
+
+    # ****************************************************************************************************
+
+    def importModule(self):
+        """
+        Imports the module, if not already imported, and returns it.
+        """
+
+        module = self.__dict__["lazyModule"]
+
+        if(module is None):
+            start = time.time()
+            module = importlib.import_module(self.__dict__["lazyName"])
+            IMPORT_TIMES.append((self.__dict__["lazyName"],time.time() - start))
+
+            self.__dict__["lazyModule"] = module
+
+        return module
+
+    # ****************************************************************************************************
+
+    def __getattr__(self,attribute):
+        """
+        Returns an attribute of the module, importing the module first.
+        """
+
+        return getattr(self.importModule(),attribute)
+
+    # ****************************************************************************************************
+
+    def __setattr__(self,attribute,value):
+        """
+        Sets an attribute of the module, importing the module first.
+        """
+
+        setattr(self.importModule(),attribute,value)
+
+    # ****************************************************************************************************
@@ -0,0 +1,248 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                      Name Index Version 1.0                            |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Maps every name a pulsar is known by (J name, B name, and aliases such |
+    | as the name without its J/B prefix) to its row in a catalog, using a   |
+    | hash table. Lets the EPN, CSV and catalog tools join on pulsar names   |
+    | in constant time, whichever form of the name they hold.                |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Catalog columns holding pulsar names, in order of preference.
+NAME_COLUMNS = ["PSRJ", "PSRB", "NAME"]
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class NameIndex:
+    """
+    A hash index from pulsar names to catalog rows, for example:
+
+    index = NameIndex(catalog)
+    index.lookup("B0011+47")       # row of J0014+4746.
+    index.lookup("PSR J0014+4746") # the same row.
+    index.lookup("0011+47")        # the same row, the prefix is optional.
+    index.resolve("B0011+47")      # "J0014+4746"
+
+    Names are normalised before they are stored or looked up: surrounding
+    whitespace and a leading "PSR" are removed, and letters are upper case.
+    An alias shared by two different pulsars (which can happen for names
+    without a J/B prefix) is ambiguous, and is not resolved.
+    """
+
+    def __init__(self,catalog=None):
+        """
+        Creates a new index.
+
+        Parameters:
+        catalog    -    optional PulsarCatalog (or dictionary of columns) to index.
+
+        Returns:
+        N/A
+        """
+
+        # Maps a normalised name to its row.
+        self.rows = {}
+
+        # Normalised aliases which refer to more than one row.
+        self.ambiguous = set()
+
+        # The names (J name first) of each row, by row.
+        self.namesByRow = {}
+
+        if(catalog is not None):
+            self.build(catalog)
+
+    # ****************************************************************************************************
+
+    def normalize(self,name):
+        """
+        Returns the normalised form of a pulsar name, e.g. " psr b0011+47 "
+        becomes "B0011+47".
+        """
+
+        key = name.strip().upper()
+
+        if(key.startswith("PSR")):
+            key = key[3:].strip()
+
+        return key
+
+    # ****************************************************************************************************
+
+    def aliases(self,name):
+        """
+        Returns the normalised names under which a pulsar name is indexed:
+        the name itself, plus the name without its J/B prefix.
+        """
+
+        key = self.normalize(name)
+
+        if(not key):
+            return []
+
+        aliases = [key]
+
+        if(key[0] in "JB" and key[1:2].isdigit()):
+            aliases.append(key[1:])
+
+        return aliases
+
+    # ****************************************************************************************************
+
+    def add(self,name,row):
+        """
+        Adds a name for the pulsar at the given row.
+
+        Parameters:
+        name    -    the pulsar name, e.g. "J0014+4746" or "B0011+47".
+        row     -    the row of the pulsar in the catalog.
+
+        Returns:
+        N/A
+        """
+
+        aliases = self.aliases(name)
+
+        if(not aliases):
+            return
+
+        names = self.namesByRow.setdefault(row,[])
+        if(aliases[0] not in names):
+            names.append(aliases[0])
+
+        for alias in aliases:
+            if(alias in self.ambiguous):
+                continue
+
+            existing = self.rows.get(alias)
+
+            if(existing is None):
+                self.rows[alias] = row
+            elif(existing != row):
+                # Full names are never ambiguous in the catalog, so only a
+                # prefix-less alias can get here. Stop resolving it.
+                del self.rows[alias]
+                self.ambiguous.add(alias)
+
+    # ****************************************************************************************************
+
+    def build(self,catalog):
+        """
+        Indexes every name held in a catalog.
+
+        Parameters:
+        catalog    -    a PulsarCatalog, or a dictionary of columns, holding
+                        one or more of the PSRJ, PSRB and NAME columns.
+
+        Returns:
+        this index, to allow calls to be chained.
+        """
+
+        for column in NAME_COLUMNS:
+            if(column not in catalog):
+                continue
+
+            for row, name in enumerate(catalog[column].tolist()):
+                if(not isinstance(name,str)):
+                    name = name.decode("ascii")
+                if(name):
+                    self.add(name,row)
+
+        return self
+
+    # ****************************************************************************************************
+
+    def lookup(self,name):
+        """
+        Returns the row of the pulsar with the given name.
+
+        Parameters:
+        name    -    any name of the pulsar.
+
+        Returns:
+        the row of the pulsar, or None if the name is unknown or ambiguous.
+        """
+
+        return self.rows.get(self.normalize(name))
+
+    # ****************************************************************************************************
+
+    def resolve(self,name):
+        """
+        Returns the preferred name (the J name where known) of a pulsar.
+
+        Parameters:
+        name    -    any name of the pulsar.
+
+        Returns:
+        the preferred name, or None if the name is unknown or ambiguous.
+        """
+
+        row = self.lookup(name)
+
+        if(row is None):
+            return None
+
+        return self.namesByRow[row][0]
+
+    # ****************************************************************************************************
+
+    def names(self,name):
+        """
+        Returns every full name (J name first) of the pulsar with the given name.
+
+        Parameters:
+        name    -    any name of the pulsar.
+
+        Returns:
+        a list of names, empty if the name is unknown or ambiguous.
+        """
+
+        row = self.lookup(name)
+
+        if(row is None):
+            return []
+
+        return list(self.namesByRow[row])
+
+    # ****************************************************************************************************
+
+    def __contains__(self,name):
+        """
+        Returns True if the name resolves to a pulsar.
+        """
+
+        return self.lookup(name) is not None
+
+    # ****************************************************************************************************
+
+    def __len__(self):
+        """
+        Returns the number of pulsars indexed.
+        """
+
+        return len(self.namesByRow)
+
+    # ****************************************************************************************************
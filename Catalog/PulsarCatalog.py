@@ -0,0 +1,524 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                    Pulsar Catalog Version 1.0                          |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Columnar, in-memory store of ATNF pulsar catalog data. Each numerical  |
+    | parameter is held in a single float64 numpy array, with NaN marking    |
+    | missing values. Text parameters (names, binary types etc.) are held in |
+    | numpy string arrays, with the empty string marking missing values.     |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+import numpy as np
+
+from CatalogParser import CatalogParser
+from CatalogParser import STRING_PARAMETERS
+
+# The catalog parameters loaded when none are specified.
+DEFAULT_PARAMETERS = ["PSRJ", "PSRB", "RAJ", "DECJ", "ELONG", "ELAT",
+                      "PMRA", "PMDEC", "PMELONG", "PMELAT", "POSEPOCH",
+                      "P0", "P1", "F0", "F1", "PEPOCH", "DM", "W50", "W10",
+                      "S400", "S1400", "DIST_DM", "DIST_DM1", "DIST_A",
+                      "BINARY", "PB", "A1", "BINCOMP", "TYPE", "NGLT"]
+
+# Assumed neutron star moment of inertia (g cm^2), used when computing Edot.
+MOMENT_OF_INERTIA = 1.0e45
+
+# Seconds in a year, used when computing characteristic ages.
+SECONDS_PER_YEAR = 365.25 * 86400.0
+
+# The integer types a column may be narrowed to, smallest first.
+INTEGER_TYPES = [np.int8, np.int16, np.int32, np.int64]
+
+# A float column is narrowed to float32 only if every value has at most this
+# many significant digits, which float32 holds exactly enough to reproduce.
+FLOAT32_DIGITS = np.finfo(np.float32).precision
+
+# The spin parameters, which compact() always keeps as float64. They are used
+# in further calculations (e.g. of Edot and age), and even a value listed to
+# few digits, such as a P1 of -3.81e-17, is -3.809999857e-17 in float32.
+FLOAT64_PARAMETERS = ["P0", "P1", "P2", "F0", "F1", "F2"]
+
+# ****************************************************************************************************
+
+def compactType(column):
+    """
+    Returns the narrowest type able to hold every value of a column:
+
+    - a float column with no missing values, holding only whole numbers
+      (e.g. row numbers or counts), becomes the smallest integer type that
+      holds its range.
+    - a float column whose values all have at most FLOAT32_DIGITS
+      significant digits, and lie within the range of float32 (e.g. GL,
+      GB and DM), becomes float32.
+    - other columns, holding values listed to more digits, keep their type.
+
+    The spin parameters are not narrowed whatever their values, see
+    FLOAT64_PARAMETERS and compact().
+
+    Parameters:
+    column    -    a numpy array.
+
+    Returns:
+    a numpy type.
+    """
+
+    column = np.asarray(column)
+
+    if(column.dtype.kind in "iu"):
+        known = column
+    elif(column.dtype.kind == "f"):
+        known = column[~np.isnan(column)]
+    else:
+        return column.dtype.type
+
+    if(len(known) == 0):
+        return np.float32 if column.dtype.kind == "f" else column.dtype.type
+
+    low, high = known.min(), known.max()
+
+    if(len(known) == len(column) and np.all(np.isfinite(known)) and np.all(known == np.round(known))):
+        for integerType in INTEGER_TYPES:
+            if(np.iinfo(integerType).min <= low and high <= np.iinfo(integerType).max):
+                return integerType
+
+    if(column.dtype.kind != "f" or column.dtype.itemsize <= 4):
+        return column.dtype.type
+
+    # Zeros are exact in float32, other values must lie in its normal range.
+    magnitudes = np.abs(known[known != 0])
+    if(len(magnitudes) == 0):
+        return np.float32
+
+    if(np.all(np.isfinite(magnitudes)) == False or
+       magnitudes.min() < np.finfo(np.float32).tiny or magnitudes.max() > np.finfo(np.float32).max):
+        return column.dtype.type
+
+    # Each value scaled so that its significant digits lie before the
+    # decimal point. Values with more digits leave a fraction behind.
+    scaled = magnitudes * 10.0 ** (FLOAT32_DIGITS - 1 - np.floor(np.log10(magnitudes)))
+
+    if(np.all(np.abs(scaled - np.round(scaled)) < 1e-6)):
+        return np.float32
+
+    return column.dtype.type
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class PulsarCatalog:
+    """
+    Holds pulsar catalog data column by column. Columns are accessed by
+    their catalog parameter key, for example:
+
+    catalog = PulsarCatalog()
+    catalog.loadDatabase("Data/psrcat.db")
+    periods = catalog["P0"]            # float64 array, NaN where missing.
+    names   = catalog["PSRJ"]          # string array.
+
+    Some columns are derived after loading: P0 and F0 (and P1 and F1) are
+    completed from one another where only one of them is listed, while AGE
+    (characteristic age, yr) and EDOT (spin down energy loss rate, ergs/s)
+    are computed from P0 and P1.
+
+    Rows can be ordered by any column without sorting the catalog itself:
+
+    rows = catalog.order("EDOT")       # row indexes, smallest EDOT first.
+    rows = catalog.top("AGE",10)       # the 10 oldest pulsars, oldest first.
+    byEdot = catalog.select(rows)
+
+    The sort order of each column is computed once and cached. It is
+    dropped when the column is replaced, and may be dropped by calling
+    invalidate() after a column is changed in place.
+    """
+
+    def __init__(self,columns=None,version=""):
+        """
+        Creates a new catalog.
+
+        Parameters:
+        columns    -    optional dictionary mapping parameter keys to arrays.
+        version    -    the version of the catalog, e.g. "1.54".
+
+        Returns:
+        N/A
+        """
+
+        self.columns = {}
+        self.version = version
+
+        # The cached sort order of each column, by parameter key, as a tuple
+        # (column, order) of the array sorted and its sorted row indexes.
+        self.orders = {}
+
+        if(columns is not None):
+            for name, column in columns.items():
+                self.columns[name] = np.asarray(column)
+
+    # ****************************************************************************************************
+
+    def loadDatabase(self,path,parameters=None):
+        """
+        Loads the columns of this catalog from a psrcat.db file.
+
+        Parameters:
+        path          -    the path to the psrcat.db file to load.
+        parameters    -    the parameters to load, defaults to DEFAULT_PARAMETERS.
+
+        Returns:
+        this catalog, to allow calls to be chained.
+        """
+
+        if(parameters is None):
+            parameters = DEFAULT_PARAMETERS
+
+        catalogParser = CatalogParser(parameters)
+        self.loadRecords(catalogParser.records(path),parameters)
+        self.version = catalogParser.version
+
+        return self
+
+    # ****************************************************************************************************
+
+    def loadRecords(self,records,parameters):
+        """
+        Loads the columns of this catalog from an iterable of records, as
+        produced by CatalogParser.
+
+        Parameters:
+        records       -    an iterable of records (dictionaries).
+        parameters    -    the parameters to load.
+
+        Returns:
+        this catalog, to allow calls to be chained.
+        """
+
+        # One list per column, filled with a missing value where an entry
+        # does not list the parameter.
+        missing = {}
+        for parameter in parameters:
+            missing[parameter] = "" if parameter in STRING_PARAMETERS else np.nan
+
+        values = dict((parameter,[]) for parameter in parameters)
+
+        for record in records:
+            for parameter in parameters:
+                values[parameter].append(record.get(parameter,missing[parameter]))
+
+        self.columns = {}
+        self.invalidate()
+
+        for parameter in parameters:
+            if(parameter in STRING_PARAMETERS):
+                self.columns[parameter] = np.array(values[parameter],dtype=str)
+            else:
+                self.columns[parameter] = np.array(values[parameter],dtype=np.float64)
+
+        self.derive()
+
+        return self
+
+    # ****************************************************************************************************
+
+    def derive(self):
+        """
+        Completes P0/F0 and P1/F1 from one another, and computes the AGE and
+        EDOT columns where both P0 and P1 are known. All operations are
+        performed on whole columns at once.
+
+        Parameters:
+        N/A
+
+        Returns:
+        N/A
+        """
+
+        n = len(self)
+
+        def column(name):
+            if(name in self.columns):
+                return self.columns[name]
+            return np.full(n,np.nan)
+
+        P0 = column("P0").copy()
+        F0 = column("F0").copy()
+        P1 = column("P1").copy()
+        F1 = column("F1").copy()
+
+        with np.errstate(divide='ignore',invalid='ignore'):
+            # Compute period and frequency if not listed in catalog file.
+            fillP0 = np.isnan(P0) & ~np.isnan(F0)
+            P0[fillP0] = 1.0 / F0[fillP0]
+
+            fillF0 = np.isnan(F0) & ~np.isnan(P0)
+            F0[fillF0] = 1.0 / P0[fillF0]
+
+            # Likewise for the derivatives, using P1 = -F1 / F0^2.
+            fillP1 = np.isnan(P1) & ~np.isnan(F1) & ~np.isnan(F0)
+            P1[fillP1] = -F1[fillP1] / (F0[fillP1] ** 2)
+
+            fillF1 = np.isnan(F1) & ~np.isnan(P1) & ~np.isnan(P0)
+            F1[fillF1] = -P1[fillF1] / (P0[fillF1] ** 2)
+
+            # Characteristic age and spin down luminosity, only meaningful
+            # for spinning down pulsars.
+            spinningDown = (P1 > 0) & (P0 > 0)
+            AGE  = np.full(n,np.nan)
+            EDOT = np.full(n,np.nan)
+            AGE[spinningDown]  = P0[spinningDown] / (2.0 * P1[spinningDown]) / SECONDS_PER_YEAR
+            EDOT[spinningDown] = 4.0 * np.pi ** 2 * MOMENT_OF_INERTIA * P1[spinningDown] / P0[spinningDown] ** 3
+
+        self.columns["P0"]   = P0
+        self.columns["F0"]   = F0
+        self.columns["P1"]   = P1
+        self.columns["F1"]   = F1
+        self.columns["AGE"]  = AGE
+        self.columns["EDOT"] = EDOT
+
+    # ****************************************************************************************************
+
+    def __len__(self):
+        """
+        Returns the number of pulsars (rows) in the catalog.
+        """
+
+        for column in self.columns.values():
+            return len(column)
+
+        return 0
+
+    # ****************************************************************************************************
+
+    def __getitem__(self,name):
+        """
+        Returns the column stored for the given parameter key.
+        """
+
+        return self.columns[name]
+
+    # ****************************************************************************************************
+
+    def __setitem__(self,name,column):
+        """
+        Stores a column for the given parameter key, replacing any existing column.
+        """
+
+        self.columns[name] = np.asarray(column)
+        self.invalidate(name)
+
+    # ****************************************************************************************************
+
+    def __contains__(self,name):
+        """
+        Returns True if a column is stored for the given parameter key.
+        """
+
+        return name in self.columns
+
+    # ****************************************************************************************************
+
+    def names(self):
+        """
+        Returns the sorted parameter keys of the columns in this catalog.
+        """
+
+        return sorted(self.columns.keys())
+
+    # ****************************************************************************************************
+
+    def missing(self,name):
+        """
+        Returns a boolean mask which is True where the given column is missing a value.
+
+        Parameters:
+        name    -    the parameter key of the column.
+
+        Returns:
+        a boolean numpy array, one element per pulsar.
+        """
+
+        column = self.columns[name]
+
+        if(column.dtype.kind in "SU"):
+            return column == column.dtype.type()
+        else:
+            return np.isnan(column)
+
+    # ****************************************************************************************************
+
+    def values(self,name):
+        """
+        Returns the values of a column, with missing values removed.
+
+        Parameters:
+        name    -    the parameter key of the column.
+
+        Returns:
+        a numpy array of the known values.
+        """
+
+        return self.columns[name][~self.missing(name)]
+
+    # ****************************************************************************************************
+
+    def select(self,mask):
+        """
+        Returns a new catalog holding only the rows selected.
+
+        Parameters:
+        mask    -    a boolean mask, or an array of row indexes.
+
+        Returns:
+        a new PulsarCatalog.
+        """
+
+        columns = {}
+        for name, column in self.columns.items():
+            columns[name] = column[mask]
+
+        return PulsarCatalog(columns,self.version)
+
+    # ****************************************************************************************************
+
+    def nbytes(self):
+        """
+        Returns the number of bytes used to store the columns of this catalog.
+        """
+
+        return sum(column.nbytes for column in self.columns.values())
+
+    # ****************************************************************************************************
+
+    def invalidate(self,name=None):
+        """
+        Drops the cached sort order of a column, e.g. after its values have
+        been changed in place.
+
+        Parameters:
+        name    -    the parameter key of the column, all columns if None.
+
+        Returns:
+        N/A
+        """
+
+        if(name is None):
+            self.orders = {}
+        else:
+            self.orders.pop(name,None)
+
+    # ****************************************************************************************************
+
+    def order(self,name,descending=False):
+        """
+        Returns the row indexes of the known values of a column, in sorted
+        order. Rows missing a value are left out. The order is computed
+        once, by a stable sort, and cached until the column changes.
+
+        Parameters:
+        name          -    the parameter key of the column.
+        descending    -    if True the largest value comes first.
+
+        Returns:
+        an integer numpy array of row indexes.
+        """
+
+        column = self.columns[name]
+        cached = self.orders.get(name)
+
+        if(cached is None or cached[0] is not column):
+            rows = np.flatnonzero(~self.missing(name))
+            cached = (column, rows[np.argsort(column[rows],kind="mergesort")])
+            self.orders[name] = cached
+
+        if(descending):
+            return cached[1][::-1]
+
+        return cached[1]
+
+    # ****************************************************************************************************
+
+    def top(self,name,n,largest=True):
+        """
+        Returns the row indexes of the n largest (or smallest) known values
+        of a column, in order. When the sort order of the column is cached
+        it is sliced, otherwise the n rows are found by a partial sort
+        (argpartition), and only those n are sorted.
+
+        Parameters:
+        name       -    the parameter key of the column.
+        n          -    the number of rows wanted.
+        largest    -    if True the largest values are wanted, largest first,
+                        otherwise the smallest, smallest first.
+
+        Returns:
+        an integer numpy array of at most n row indexes.
+        """
+
+        column = self.columns[name]
+        cached = self.orders.get(name)
+
+        if(cached is not None and cached[0] is column):
+            return self.order(name,largest)[:n]
+
+        rows = np.flatnonzero(~self.missing(name))
+        n = max(0,min(n,len(rows)))
+
+        if(n == 0):
+            return rows[:0]
+
+        values = column[rows]
+
+        if(largest):
+            candidates = np.argpartition(values,len(values) - n)[len(values) - n:]
+            candidates = candidates[np.argsort(values[candidates],kind="mergesort")[::-1]]
+        else:
+            candidates = np.argpartition(values,n - 1)[:n]
+            candidates = candidates[np.argsort(values[candidates],kind="mergesort")]
+
+        return rows[candidates]
+
+    # ****************************************************************************************************
+
+    def compact(self):
+        """
+        Returns a new catalog holding each numeric column as the narrowest
+        type able to hold its values, see compactType(). Text columns, and
+        the spin parameters in FLOAT64_PARAMETERS, are kept as they are.
+
+        Parameters:
+        N/A
+
+        Returns:
+        a new PulsarCatalog.
+        """
+
+        columns = {}
+        for name, column in self.columns.items():
+            if(name in FLOAT64_PARAMETERS):
+                columns[name] = column
+            else:
+                columns[name] = column.astype(compactType(column),copy=False)
+
+        return PulsarCatalog(columns,self.version)
+
+    # ****************************************************************************************************
@@ -0,0 +1,224 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                    Quantile Sketch Version 1.0                         |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | A small, mergeable summary of a stream of numbers, from which          |
+    | approximate quantiles (e.g. the median) can be read. The memory used   |
+    | grows only with the logarithm of the number of values seen, so columns |
+    | larger than memory can be summarised chunk by chunk, and sketches of   |
+    | separate chunks can be merged.                                         |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+import numpy as np
+
+# The level size used by default. The rank error of a quantile is within
+# about 0.1% of the number of values seen, for millions of values.
+K = 1024
+
+# The number of values held exactly, before the sketch is first compacted.
+# Quantiles of up to this many values are exact.
+EXACT_COUNT = 1 << 16
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class QuantileSketch:
+    """
+    A compactor based quantile sketch (in the style of KLL), for example:
+
+    sketch = QuantileSketch()
+    sketch.update(chunk1)
+    sketch.update(chunk2)
+    sketch.merge(otherSketch)
+    median = sketch.quantile(0.5)
+
+    Values are held in levels. A value at level i stands for 2^i of the
+    values seen. When a level holds more than k values it is sorted, and
+    every other value is promoted to the next level, halving its size. The
+    rank error of a quantile is roughly (number of levels) / k of the number
+    of values seen.
+
+    Until more than exactCount values are seen they are all held, uncompacted,
+    and quantiles are exact, interpolated as numpy.percentile() does.
+    """
+
+    def __init__(self,k=K,exactCount=EXACT_COUNT):
+        """
+        Creates a new, empty sketch.
+
+        Parameters:
+        k             -    the number of values a level may hold before it is compacted.
+        exactCount    -    the number of values held before the first compaction.
+
+        Returns:
+        N/A
+        """
+
+        self.k = k
+        self.exactCount = max(k,exactCount)
+        self.levels = []
+
+        # Which half (odd or even positions) each level promotes next. The
+        # halves alternate, over time and from level to level, so that the
+        # errors of successive compactions cancel.
+        self.offsets = []
+
+    # ****************************************************************************************************
+
+    def grow(self,level):
+        """
+        Adds empty levels, so that the given level exists.
+        """
+
+        while(len(self.levels) <= level):
+            self.levels.append(np.array([],dtype=np.float64))
+            self.offsets.append(len(self.offsets) % 2)
+
+    # ****************************************************************************************************
+
+    def compress(self):
+        """
+        Compacts every level holding more than k values, once the sketch
+        holds more than exactCount values.
+        """
+
+        if(self.exact() and self.count() <= self.exactCount):
+            return
+
+        level = 0
+
+        while(level < len(self.levels)):
+            values = self.levels[level]
+
+            if(len(values) > self.k):
+                values = np.sort(values)
+
+                # An odd value out stays at this level.
+                keep = values[:len(values) % 2]
+                values = values[len(values) % 2:]
+
+                self.grow(level + 1)
+                self.levels[level + 1] = np.concatenate((self.levels[level + 1],values[self.offsets[level]::2]))
+                self.levels[level] = keep
+                self.offsets[level] = 1 - self.offsets[level]
+
+            level += 1
+
+    # ****************************************************************************************************
+
+    def update(self,values):
+        """
+        Adds values to the sketch. NaN values are ignored.
+
+        Parameters:
+        values    -    an array of values.
+
+        Returns:
+        N/A
+        """
+
+        values = np.asarray(values,dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+
+        if(len(values) == 0):
+            return
+
+        self.grow(0)
+        self.levels[0] = np.concatenate((self.levels[0],values))
+        self.compress()
+
+    # ****************************************************************************************************
+
+    def merge(self,other):
+        """
+        Adds the values summarised by another sketch to this sketch.
+
+        Parameters:
+        other    -    the QuantileSketch to merge in.
+
+        Returns:
+        this sketch, to allow calls to be chained.
+        """
+
+        self.grow(len(other.levels) - 1)
+
+        for level, values in enumerate(other.levels):
+            self.levels[level] = np.concatenate((self.levels[level],values))
+
+        self.compress()
+
+        return self
+
+    # ****************************************************************************************************
+
+    def count(self):
+        """
+        Returns the number of values summarised by the sketch.
+        """
+
+        return sum(len(values) << level for level, values in enumerate(self.levels))
+
+    # ****************************************************************************************************
+
+    def exact(self):
+        """
+        Returns True if every value seen is held, so quantiles are exact.
+        """
+
+        return len(self.levels) <= 1
+
+    # ****************************************************************************************************
+
+    def quantile(self,q):
+        """
+        Returns quantiles of the values seen, exact if exact() is True.
+
+        Parameters:
+        q    -    a quantile between 0 and 1, or an array of quantiles.
+
+        Returns:
+        the value at each quantile, NaN if no values have been seen.
+        """
+
+        values  = np.concatenate([np.array([],dtype=np.float64)] + self.levels)
+        weights = np.concatenate([np.array([],dtype=np.int64)] +
+                                 [np.full(len(level),1 << i,dtype=np.int64) for i, level in enumerate(self.levels)])
+
+        if(len(values) == 0):
+            return np.full(np.shape(q),np.nan) if np.ndim(q) else np.nan
+
+        if(self.exact()):
+            return np.percentile(values,np.clip(np.asarray(q,dtype=np.float64),0.0,1.0) * 100.0)
+
+        order = np.argsort(values,kind="mergesort")
+        values = values[order]
+        ranks = np.cumsum(weights[order])
+
+        # The first value whose cumulative weight reaches the wanted rank.
+        wanted = np.clip(np.asarray(q,dtype=np.float64),0.0,1.0) * ranks[-1]
+        positions = np.minimum(np.searchsorted(ranks,wanted,side="left"),len(values) - 1)
+
+        return values[positions]
+
+    # ****************************************************************************************************
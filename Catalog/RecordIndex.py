@@ -0,0 +1,343 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                     Record Index Version 1.0                           |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | A sidecar index giving the byte offset and length of every entry in a  |
+    | psrcat.db file, keyed on pulsar name. The catalog file is memory       |
+    | mapped, and only the entries asked for are parsed, so tools needing a  |
+    | handful of pulsars don't have to read the whole catalog.               |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+import os
+import json
+import mmap
+
+import numpy as np
+
+from CatalogParser import CatalogParser
+from NameIndex import NameIndex
+from PulsarCatalog import PulsarCatalog
+from PulsarCatalog import DEFAULT_PARAMETERS
+
+# Version of the sidecar file layout. Sidecars of other versions are rebuilt.
+INDEX_FORMAT = 1
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class RecordIndex:
+    """
+    Random access to the entries of a psrcat.db file, for example:
+
+    index = RecordIndex("Data/psrcat.db")
+    record = index.record("J2302+4442")           # parsed on demand.
+    record = index.record("B0011+47",["P0","DM"]) # any name may be used.
+    index.close()
+
+    The offsets are kept in a sidecar file next to the catalog (by default
+    <catalog>.idx), which records the size and modification time of the
+    catalog it describes. A stale or missing sidecar is rebuilt, which
+    costs a single scan of the catalog file.
+    """
+
+    def __init__(self,path,indexPath=None,verbose=False):
+        """
+        Opens an index over a catalog file, building the sidecar if needed.
+
+        Parameters:
+        path         -    the path to the psrcat.db file.
+        indexPath    -    optional path of the sidecar index file.
+        verbose      -    verbose debugging flag.
+
+        Returns:
+        N/A
+        """
+
+        self.path = path
+        self.indexPath = indexPath or path + ".idx"
+        self.verbose = verbose
+
+        self.version = ""
+        self.offsets = None
+        self.lengths = None
+        self.nameIndex = None
+
+        self.catalogFile = None
+        self.map = None
+
+        self.load()
+
+    # ****************************************************************************************************
+
+    def load(self):
+        """
+        Reads the sidecar index, rebuilding it if it does not describe the
+        current catalog file.
+
+        Parameters:
+        N/A
+
+        Returns:
+        N/A
+        """
+
+        status = os.stat(self.path)
+        index = None
+
+        if(os.path.isfile(self.indexPath)):
+            try:
+                indexFile = open(self.indexPath,'r')
+                index = json.load(indexFile)
+                indexFile.close()
+            except (IOError, OSError, ValueError):
+                index = None
+
+        if(index is None or index.get("format") != INDEX_FORMAT or
+           index.get("size") != status.st_size or index.get("mtime") != status.st_mtime):
+
+            if(self.verbose):
+                print("\tBuilding record index for: " + self.path)
+
+            index = self.build()
+            index["size"]  = status.st_size
+            index["mtime"] = status.st_mtime
+
+            try:
+                self.write(index)
+            except (IOError, OSError):
+                # The sidecar is an optimisation only, so an unwritable
+                # location must not stop the catalog being used.
+                if(self.verbose):
+                    print("\tUnable to write record index for: " + self.path)
+
+        self.version = str(index["version"])
+        self.offsets = np.array(index["offsets"],dtype=np.int64)
+        self.lengths = np.array(index["lengths"],dtype=np.int64)
+        self.nameIndex = NameIndex({"PSRJ": np.array(index["PSRJ"],dtype=str),
+                                    "PSRB": np.array(index["PSRB"],dtype=str)})
+
+    # ****************************************************************************************************
+
+    def build(self):
+        """
+        Scans the catalog file, recording the byte offset, length and names
+        of each entry.
+
+        Parameters:
+        N/A
+
+        Returns:
+        a dictionary describing the index, as stored in the sidecar file.
+        """
+
+        index = {"format": INDEX_FORMAT, "version": "",
+                 "offsets": [], "lengths": [], "PSRJ": [], "PSRB": []}
+
+        # Read in binary mode, so that offsets are byte offsets.
+        catalogFile = open(self.path,'rb')
+
+        offset = 0
+        start = None
+        names = {}
+
+        for line in catalogFile:
+            first = line[0:1]
+
+            if(first == b'@'):
+                if(start is not None):
+                    self.addEntry(index,start,offset - start,names)
+                start = None
+                names = {}
+
+            elif(first == b'#'):
+                if(line.startswith(b"#CATALOGUE")):
+                    components = line.split()
+                    if(len(components) > 1):
+                        index["version"] = components[1].decode("ascii")
+
+            elif(line.strip()):
+                if(start is None):
+                    start = offset
+
+                components = line.split()
+                if(len(components) > 1 and components[0] in (b"PSRJ", b"PSRB")):
+                    names[components[0].decode("ascii")] = components[1].decode("ascii")
+
+            offset += len(line)
+
+        if(start is not None):
+            self.addEntry(index,start,offset - start,names)
+
+        catalogFile.close()
+
+        return index
+
+    # ****************************************************************************************************
+
+    def addEntry(self,index,offset,length,names):
+        """
+        Adds one catalog entry to an index under construction.
+        """
+
+        index["offsets"].append(offset)
+        index["lengths"].append(length)
+        index["PSRJ"].append(names.get("PSRJ",""))
+        index["PSRB"].append(names.get("PSRB",""))
+
+    # ****************************************************************************************************
+
+    def write(self,index):
+        """
+        Writes the sidecar index file. The file is written under a temporary
+        name and then renamed, so readers never see a partial index.
+        """
+
+        temporaryPath = self.indexPath + ".tmp"
+
+        indexFile = open(temporaryPath,'w')
+        json.dump(index,indexFile)
+        indexFile.close()
+
+        os.rename(temporaryPath,self.indexPath)
+
+    # ****************************************************************************************************
+
+    def open(self):
+        """
+        Memory maps the catalog file. Called automatically by block().
+        """
+
+        if(self.map is None):
+            self.catalogFile = open(self.path,'rb')
+            self.map = mmap.mmap(self.catalogFile.fileno(),0,access=mmap.ACCESS_READ)
+
+    # ****************************************************************************************************
+
+    def close(self):
+        """
+        Unmaps and closes the catalog file.
+        """
+
+        if(self.map is not None):
+            self.map.close()
+            self.catalogFile.close()
+            self.map = None
+            self.catalogFile = None
+
+    # ****************************************************************************************************
+
+    def block(self,name):
+        """
+        Returns the raw text of a pulsar's catalog entry.
+
+        Parameters:
+        name    -    any name of the pulsar (J name, B name, or alias).
+
+        Returns:
+        the text of the entry, or None if the pulsar is not in the catalog.
+        """
+
+        row = self.nameIndex.lookup(name)
+
+        if(row is None):
+            return None
+
+        self.open()
+
+        start = int(self.offsets[row])
+        text = self.map[start:start + int(self.lengths[row])]
+
+        if(not isinstance(text,str)):
+            text = text.decode("ascii","replace")
+
+        return text
+
+    # ****************************************************************************************************
+
+    def record(self,name,parameters=None):
+        """
+        Parses a pulsar's catalog entry.
+
+        Parameters:
+        name          -    any name of the pulsar (J name, B name, or alias).
+        parameters    -    the parameters to extract, all of them if None.
+
+        Returns:
+        the record (dictionary) for the pulsar, or None if it is not in the catalog.
+        """
+
+        text = self.block(name)
+
+        if(text is None):
+            return None
+
+        return CatalogParser(parameters).parseBlock(text)
+
+    # ****************************************************************************************************
+
+    def catalog(self,names,parameters=None):
+        """
+        Parses the entries of several pulsars into a columnar catalog.
+
+        Parameters:
+        names         -    the names of the pulsars, in any form.
+        parameters    -    the parameters to load, defaults to DEFAULT_PARAMETERS.
+
+        Returns:
+        a PulsarCatalog holding one row per pulsar found, in the order given.
+        """
+
+        if(parameters is None):
+            parameters = DEFAULT_PARAMETERS
+
+        records = []
+        for name in names:
+            record = self.record(name,parameters)
+            if(record is not None):
+                records.append(record)
+
+        catalog = PulsarCatalog().loadRecords(records,parameters)
+        catalog.version = self.version
+
+        return catalog
+
+    # ****************************************************************************************************
+
+    def __contains__(self,name):
+        """
+        Returns True if the named pulsar is in the catalog.
+        """
+
+        return name in self.nameIndex
+
+    # ****************************************************************************************************
+
+    def __len__(self):
+        """
+        Returns the number of entries in the catalog.
+        """
+
+        return len(self.offsets)
+
+    # ****************************************************************************************************
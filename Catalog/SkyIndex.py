@@ -0,0 +1,221 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                       Sky Index Version 1.0                            |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | A spatial index over pulsar sky positions. Positions are stored as     |
+    | unit vectors in a KD-tree, so cone searches (which pulsars lie within  |
+    | some angle of a position) and nearest neighbour queries take           |
+    | logarithmic rather than linear time.                                   |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Added to the chord of every search radius, so that positions lying exactly
+# on the radius are kept despite rounding in the unit vectors.
+CHORD_MARGIN = 1e-12
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class SkyIndex:
+    """
+    Indexes positions given as longitude and latitude in degrees, in any
+    one frame (e.g. GL and GB, or RA and DEC). Queries must use the same
+    frame. Rows without a position (NaN) are left out of the index. For
+    example:
+
+    index = SkyIndex(catalog["GL"],catalog["GB"])
+    rows, separations = index.cone(-3.4,-20.02,2.0)   # within 2 degrees.
+    rows, separations = index.nearest(-3.4,-20.02,k=5)
+
+    Returned rows are rows of the arrays the index was built from, nearest
+    first, and separations are great circle angles in degrees.
+
+    On the unit sphere two positions separated by an angle theta are a
+    straight line (chord) distance 2 sin(theta/2) apart. The tree works
+    with chords, which are converted to and from angles at the boundary.
+    """
+
+    def __init__(self,longitudes,latitudes):
+        """
+        Builds a new index.
+
+        Parameters:
+        longitudes    -    array of longitudes (e.g. GL, or RA) in degrees.
+        latitudes     -    array of latitudes (e.g. GB, or DEC) in degrees.
+
+        Returns:
+        N/A
+        """
+
+        longitudes = np.asarray(longitudes,dtype=np.float64)
+        latitudes  = np.asarray(latitudes,dtype=np.float64)
+
+        # The rows of the input arrays held in the tree, by tree position.
+        self.rows = np.nonzero(~(np.isnan(longitudes) | np.isnan(latitudes)))[0]
+
+        self.tree = cKDTree(self.unitVectors(longitudes[self.rows],latitudes[self.rows]))
+
+    # ****************************************************************************************************
+
+    def unitVectors(self,longitudes,latitudes):
+        """
+        Converts positions in degrees to an (n, 3) array of unit vectors.
+        """
+
+        lon = np.radians(np.atleast_1d(np.asarray(longitudes,dtype=np.float64)))
+        lat = np.radians(np.atleast_1d(np.asarray(latitudes,dtype=np.float64)))
+
+        cosLat = np.cos(lat)
+
+        return np.column_stack((cosLat * np.cos(lon), cosLat * np.sin(lon), np.sin(lat)))
+
+    # ****************************************************************************************************
+
+    def toAngle(self,chords):
+        """
+        Converts chord lengths on the unit sphere to angles in degrees.
+        """
+
+        return np.degrees(2.0 * np.arcsin(np.clip(np.asarray(chords) / 2.0,0.0,1.0)))
+
+    # ****************************************************************************************************
+
+    def toChord(self,angle):
+        """
+        Converts an angle in degrees to a chord length on the unit sphere.
+        """
+
+        return 2.0 * np.sin(np.radians(min(angle,180.0)) / 2.0)
+
+    # ****************************************************************************************************
+
+    def cone(self,longitude,latitude,radius):
+        """
+        Finds the indexed positions within an angle of a position.
+
+        Parameters:
+        longitude    -    longitude of the cone centre, in degrees.
+        latitude     -    latitude of the cone centre, in degrees.
+        radius       -    the radius of the cone, in degrees.
+
+        Returns:
+        a tuple (rows, separations) of numpy arrays, nearest first.
+        """
+
+        centre = self.unitVectors(longitude,latitude)[0]
+        positions = np.array(self.tree.query_ball_point(centre,self.toChord(radius) + CHORD_MARGIN),dtype=np.int64)
+
+        if(len(positions) == 0):
+            return positions, np.array([])
+
+        chords = np.sqrt(((self.tree.data[positions] - centre) ** 2).sum(axis=1))
+        order = np.argsort(chords,kind="mergesort")
+
+        return self.rows[positions[order]], self.toAngle(chords[order])
+
+    # ****************************************************************************************************
+
+    def nearest(self,longitude,latitude,k=1,radius=180.0):
+        """
+        Finds the k indexed positions nearest to a position.
+
+        Parameters:
+        longitude    -    longitude of the position, in degrees.
+        latitude     -    latitude of the position, in degrees.
+        k            -    the number of neighbours to find.
+        radius       -    optional limit on the separation, in degrees.
+
+        Returns:
+        a tuple (rows, separations) of numpy arrays, nearest first. Fewer
+        than k rows are returned if fewer positions lie within the radius.
+        """
+
+        k = min(k,len(self.rows))
+
+        if(k < 1):
+            return np.array([],dtype=np.int64), np.array([])
+
+        centre = self.unitVectors(longitude,latitude)[0]
+
+        chords, positions = self.tree.query(centre,k=k,distance_upper_bound=self.toChord(radius) + CHORD_MARGIN)
+        chords = np.atleast_1d(chords)
+        positions = np.atleast_1d(positions)
+
+        found = np.isfinite(chords)
+
+        return self.rows[positions[found]], self.toAngle(chords[found])
+
+    # ****************************************************************************************************
+
+    def pairs(self,longitudes,latitudes,radius):
+        """
+        Finds, for many positions at once, the indexed positions within an
+        angle of each. The query positions are put in a tree of their own,
+        and the two trees are walked together, so the cost grows as
+        O((N + M) log N) plus the number of pairs found, rather than N x M.
+
+        Parameters:
+        longitudes    -    array of query longitudes, in degrees.
+        latitudes     -    array of query latitudes, in degrees.
+        radius        -    the match radius, in degrees.
+
+        Returns:
+        a tuple (queries, rows, separations) of numpy arrays, one element
+        per pair found. queries are rows of the query arrays, and rows are
+        rows of the indexed arrays. Pairs are ordered by query, then nearest
+        first. Queries without a position (NaN) match nothing.
+        """
+
+        longitudes = np.atleast_1d(np.asarray(longitudes,dtype=np.float64))
+        latitudes  = np.atleast_1d(np.asarray(latitudes,dtype=np.float64))
+
+        queryRows = np.nonzero(~(np.isnan(longitudes) | np.isnan(latitudes)))[0]
+
+        if(len(queryRows) == 0 or len(self.rows) == 0):
+            return np.array([],dtype=np.int64), np.array([],dtype=np.int64), np.array([])
+
+        queryTree = cKDTree(self.unitVectors(longitudes[queryRows],latitudes[queryRows]))
+
+        found = queryTree.sparse_distance_matrix(self.tree,self.toChord(radius) + CHORD_MARGIN,output_type="ndarray")
+
+        queries = queryRows[found["i"]]
+        rows = self.rows[found["j"]]
+        chords = found["v"]
+
+        order = np.lexsort((chords,queries))
+
+        return queries[order], rows[order], self.toAngle(chords[order])
+
+    # ****************************************************************************************************
+
+    def __len__(self):
+        """
+        Returns the number of positions indexed.
+        """
+
+        return len(self.rows)
+
+    # ****************************************************************************************************
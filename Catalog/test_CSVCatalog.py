@@ -0,0 +1,126 @@
+"""
+Tests of CSVCatalog, in particular that reading a file in chunks gives the
+same column types, and the same statistics, as loading it whole.
+
+Run with:  python -m pytest Catalog/test_CSVCatalog.py
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from CatalogCache import CatalogCache
+from CatalogStats import CatalogStats
+from CSVCatalog import CSVCatalog
+
+# The detailed web interface export shipped with the repository.
+DETAILED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","Data","psrcat_web_output_detailed.txt")
+
+# A small export where the PB column of the second chunk (of two rows) is
+# entirely missing, and BINARY is missing in the first.
+CSV_TEXT = ("#,NAME,P0(s),Binary Period (days),BINARY (type)\n"
+            "1,J0001+0001,0.5,*,*\n"
+            "2,J0002+0002,1.25,*,*\n"
+            "3,J0003+0003,*,*,BT\n"
+            "4,J0004+0004,0.003,*,ELL1\n"
+            "5,J0005+0005,2,12.5,DD\n")
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class TestCSVCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory,"small.csv")
+
+        csvFile = open(self.path,'w')
+        csvFile.write(CSV_TEXT)
+        csvFile.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # ****************************************************************************************************
+
+    def testShortFieldsConvertToFloat(self):
+        csvCatalog = CSVCatalog()
+
+        np.testing.assert_array_equal(csvCatalog.toFloat(["1","*","2"]),[1.0,np.nan,2.0])
+        np.testing.assert_array_equal(csvCatalog.toFloat(["*","*"]),[np.nan,np.nan])
+        np.testing.assert_array_equal(csvCatalog.toFloat(["1","bad",""]),[1.0,np.nan,np.nan])
+
+    def testAllMissingChunkIsNumeric(self):
+        chunks = list(CSVCatalog().chunks(self.path,2))
+
+        self.assertEqual([len(chunk) for chunk in chunks],[2,2,1])
+
+        # The second chunk holds only "*" for PB.
+        self.assertEqual(chunks[1]["PB"].dtype,np.float64)
+        self.assertTrue(np.all(np.isnan(chunks[1]["PB"])))
+
+        for chunk in chunks:
+            self.assertEqual(chunk["P0"].dtype.kind,"f")
+            self.assertEqual(chunk["PB"].dtype.kind,"f")
+            self.assertEqual(chunk["#"].dtype.kind,"f")
+            self.assertTrue(chunk["BINARY"].dtype.kind in "SU")
+            self.assertTrue(chunk["NAME"].dtype.kind in "SU")
+
+    def testCompactChunksShareTypes(self):
+        chunks = list(CSVCatalog(compact=True).chunks(self.path,2))
+
+        for chunk in chunks:
+            for name in ["#","P0","PB"]:
+                self.assertEqual(chunk[name].dtype,np.float64,name)
+            for name in ["NAME","BINARY"]:
+                self.assertTrue(chunk[name].dtype.kind in "SU",name)
+
+    def testChunksMatchWholeFile(self):
+        whole = CSVCatalog().load(self.path)
+        chunks = list(CSVCatalog().chunks(self.path,2))
+
+        for name in whole.names():
+            joined = np.concatenate([chunk[name] for chunk in chunks])
+            self.assertTrue(np.array_equal(joined.astype(str),whole[name].astype(str)),name)
+
+    def testChunkedStatisticsMatchWholeFile(self):
+        names = ["P0","P1","PB","AGE","EDOT"]
+
+        whole = CatalogStats().update(CSVCatalog(names).load(DETAILED_PATH),names)
+
+        chunked = CatalogStats()
+        for chunk in CSVCatalog(names).chunks(DETAILED_PATH,2):
+            chunked.update(chunk)
+
+        for name in names:
+            self.assertEqual(chunked[name].count,whole[name].count)
+            self.assertEqual(chunked[name].nanCount,whole[name].nanCount)
+            self.assertAlmostEqual(chunked[name].mean / whole[name].mean,1.0,places=12)
+            self.assertEqual(chunked[name].quantile(0.5),whole[name].quantile(0.5))
+
+    def testCachedLoadSkipsText(self):
+        cache = CatalogCache(os.path.join(self.directory,"cache"))
+        built = cache.loadCSV(self.path,["NAME","P0","PB"])
+
+        # A warm load reads the stored columns, and never converts text.
+        toCatalog = CSVCatalog.toCatalog
+        CSVCatalog.toCatalog = None
+        try:
+            cached = cache.loadCSV(self.path,["NAME","P0","PB"])
+        finally:
+            CSVCatalog.toCatalog = toCatalog
+
+        for name in ["NAME","P0","PB"]:
+            self.assertEqual(cached[name].dtype,built[name].dtype)
+            self.assertTrue(np.array_equal(cached[name].astype(str),built[name].astype(str)),name)
+
+    # ****************************************************************************************************
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,14 @@
     **************************************************************************
     | Description:                                                           |
     |                                                                        |
+    | Converts a CSV file exported by the ATNF pulsar catalog web interface  |
+    | into a compact binary catalog store (see Catalog/CatalogStore.py).     |
+    | Numeric columns are written as typed arrays with NaN in place of "*",  |
+    | each narrowed to the smallest type able to hold its values (e.g. GL,   |
+    | GB and DM as float32), and the BINARY and BINCOMP columns are          |
+    | dictionary encoded. The memory used before and after is reported. The  |
+    | store can be given to the plotting scripts in place of the CSV file,   |
+    | and is memory mapped rather than parsed.                               |
     |                                                                        |
     **************************************************************************
     | Author: Rob Lyon                                                       |
@@ -14,11 +22,20 @@
     **************************************************************************
     | Required Command Line Arguments:                                       |
     |                                                                        |
-    | -a (string) full path to a parsed ATNF pulsar catalog database file.   |
+    | -a (string) full path to a psrcat web interface CSV file.              |
     |                                                                        |
     **************************************************************************
     | Optional Command Line Arguments:                                       |
     |                                                                        |
+    | -o (string) full path to the store directory to write. By default the  |
+    |             CSV path with its extension replaced by ".store".          |
+    |                                                                        |
+    | -f (boolean) keep every numeric column as float64, rather than         |
+    |             narrowing it.                                              |
+    |                                                                        |
+    | -c (boolean) also write the store back out as a CSV file, named as the |
+    |             input with "_parsed.csv" in place of its extension.        |
+    |                                                                        |
     | -v (boolean) verbose debugging flag.                                   |
     |                                                                        |
     **************************************************************************
@@ -36,6 +53,14 @@
 from optparse import OptionParser
 
 import os, sys
+import time
+
+import numpy as np
+
+# Shared catalog tools, found in the Catalog directory of this repository.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","Catalog"))
+from CatalogStore import CatalogStore
+from CSVCatalog import CSVCatalog
 
 # ******************************
 #
@@ -45,9 +70,135 @@ import os, sys
 
 class ParseCSVFile:
     """
-
+    Converts web interface CSV files to catalog stores, and back.
     """
 
+    # ****************************************************************************************************
+
+    def readLabels(self,path):
+        """
+        Returns the labels of the header row of a CSV file, as written.
+        """
+
+        csvFile = open(path,'r')
+
+        header = ""
+        for line in csvFile:
+            if(line.strip()):
+                header = line
+                break
+
+        csvFile.close()
+
+        return header.rstrip('\r\n').split(",")
+
+    # ****************************************************************************************************
+
+    def convert(self,csvPath,storePath,compact=True):
+        """
+        Converts a CSV file to a catalog store.
+
+        Parameters:
+        csvPath      -    the path to the CSV file.
+        storePath    -    the store directory to write.
+        compact      -    if True numeric columns are narrowed before writing.
+
+        Returns:
+        a tuple (loaded, written) of the PulsarCatalog read from the CSV
+        file, and the PulsarCatalog written to the store.
+        """
+
+        csvCatalog = CSVCatalog()
+        loaded = csvCatalog.load(csvPath)
+        catalog = loaded.compact() if compact else loaded
+
+        # The header is kept, so the CSV file can be written out again.
+        labels = self.readLabels(csvPath)
+
+        CatalogStore(storePath).write(catalog,metadata={"source": os.path.abspath(csvPath),
+                                                        "labels": labels,
+                                                        "keys"  : [csvCatalog.columnKey(label) for label in labels]})
+
+        return loaded, catalog
+
+    # ****************************************************************************************************
+
+    def printFootprint(self,loaded,written,stored):
+        """
+        Prints the type and size of each column, as loaded, after narrowing,
+        and as stored (where text columns are held as integer codes).
+        """
+
+        print("\n\t" + "Column".ljust(10) + "Loaded".rjust(20) + "Compacted".rjust(20) + "Stored".rjust(20))
+
+        for name in loaded.names():
+            print("\t" + name.ljust(10) +
+                  (str(loaded[name].dtype) + " " + str(loaded[name].nbytes)).rjust(20) +
+                  (str(written[name].dtype) + " " + str(written[name].nbytes)).rjust(20) +
+                  (str(stored[name].dtype) + " " + str(stored[name].nbytes)).rjust(20))
+
+    # ****************************************************************************************************
+
+    def formatColumn(self,column):
+        """
+        Formats every value of a column as CSV text, with "*" for missing values.
+
+        Parameters:
+        column    -    a numeric or string array.
+
+        Returns:
+        a list of strings.
+        """
+
+        if(column.dtype.kind in "SU"):
+            text = np.asarray(column).astype(str)
+            return np.where(text == "","*",text).tolist()
+
+        # Values are written to the precision of their type (15 significant
+        # figures for float64, 6 for float32), so every value read back is
+        # equal to the one exported, without the noise of longer forms. The
+        # text itself may differ, e.g. "12.00" is written as "12", and
+        # "1.39e+04" as "13900".
+        if(column.dtype.kind == "f"):
+            precision = np.finfo(column.dtype).precision
+        else:
+            precision = 15
+
+        text = np.char.mod("%." + str(precision) + "g",np.asarray(column,dtype=np.float64))
+
+        return np.where(np.isnan(column),"*",text).tolist()
+
+    # ****************************************************************************************************
+
+    def writeCSV(self,storePath,csvPath):
+        """
+        Writes a catalog store out as a CSV file, in the layout of the file
+        it was converted from. The text is written in a single write.
+
+        Parameters:
+        storePath    -    the store directory to read.
+        csvPath      -    the path to the CSV file to write.
+
+        Returns:
+        the number of rows written.
+        """
+
+        store = CatalogStore(storePath)
+        catalog = store.read()
+
+        names, metadata = store.store.readManifest()
+        keys = [str(key) for key in metadata.get("keys",catalog.names())]
+        labels = [str(label) for label in metadata.get("labels",keys)]
+
+        columns = [self.formatColumn(catalog[key]) for key in keys]
+        lines = [",".join(labels)] + [",".join(row) for row in zip(*columns)]
+
+        csvFile = open(csvPath,'w')
+        csvFile.write("\n".join(lines) + "\n")
+        csvFile.close()
+
+        return len(lines) - 1
+
     # ******************************
     #
     # MAIN METHOD AND ENTRY POINT.
@@ -75,9 +226,12 @@ class ParseCSVFile:
         parser = OptionParser()
 
         # REQUIRED ARGUMENTS
-        parser.add_option("-a", action="store", dest="atnfPath",help='Path to a pulsar catalog parsed file.',default="")
+        parser.add_option("-a", action="store", dest="atnfPath",help='Path to a web interface CSV file.',default="")
 
         # OPTIONAL ARGUMENTS
+        parser.add_option("-o", action="store", dest="storePath",help='Path to the store directory to write (optional).',default="")
+        parser.add_option("-f", action="store_true", dest="fullWidth",help='Keep numeric columns as float64 (optional).',default=False)
+        parser.add_option("-c", action="store_true", dest="writeCSV",help='Also write the store out as a CSV file (optional).',default=False)
         parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
 
         (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
@@ -85,6 +239,9 @@ class ParseCSVFile:
         # Update variables with command line parameters.
         self.verbose        = args.verbose
         self.atnfParsedPath = args.atnfPath
+        self.storePath      = args.storePath or os.path.splitext(args.atnfPath)[0] + ".store"
+        self.writeCSVFile   = args.writeCSV
+        self.fullWidth      = args.fullWidth
 
         # ****************************************
         #   Print command line arguments & Run
@@ -95,6 +252,9 @@ class ParseCSVFile:
         print "\t**************************"
         print "\tDebug:",self.verbose
         print "\tParsed Pulsar catalog file path:",self.atnfParsedPath
+        print "\tStore directory:",self.storePath
+        print "\tWrite CSV file:",self.writeCSVFile
+        print "\tKeep float64 columns:",self.fullWidth
 
         # Check arguments for validity...
         if(os.path.isfile(self.atnfParsedPath) == False):
@@ -103,32 +263,29 @@ class ParseCSVFile:
 
         # Now we know the input files exist...
 
-        # Read parsed pulsar catalog file, extract useful variables:
-        # Period, Frequency, DM, pulse width
-        self.atnfFile = open(self.atnfParsedPath,'r') # Read only access
-        self.outputFile = self.atnfParsedPath.replace(".csv","_parsed.csv")
-
-        self.clearFile(self.outputFile)
-
         # ****************************************
-        #        File parsing section
+        #        File conversion section
         # ****************************************
 
-
-        for line in self.atnfFile.readlines():
-
-            components = line.rstrip('\n').split(",")
-
-            if ( line.startswith("#,NAME")):
-                # Ingore header
-                pass
-
-            else:
-                pass
-
-
-
-        self.csvFile.close()
+        start = time.time()
+        loaded, catalog = self.convert(self.atnfParsedPath,self.storePath,self.fullWidth == False)
+        stored = CatalogStore(self.storePath).read(decode=False)
+        elapsed = time.time() - start
+
+        print "\n\tRows                     : ", len(catalog)
+        print "\tColumns                  : ", len(catalog.names())
+        print "\tCSV size (bytes)         : ", os.path.getsize(self.atnfParsedPath)
+        print "\tMemory as loaded (bytes) : ", loaded.nbytes()
+        print "\tMemory compacted (bytes) : ", catalog.nbytes()
+        print "\tStore size (bytes)       : ", stored.nbytes()
+        print "\tTime (s)                 : ", round(elapsed,3)
+
+        if(self.verbose):
+            self.printFootprint(loaded,catalog,stored)
+
+        if(self.writeCSVFile):
+            self.outputFile = os.path.splitext(self.atnfParsedPath)[0] + "_parsed.csv"
+            print "\tCSV rows written         : ", self.writeCSV(self.storePath,self.outputFile), " to ", self.outputFile
 
         print "\n\tDone."
         print "\t**************************************************************************" # Used only for formatting purposes.
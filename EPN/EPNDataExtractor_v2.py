@@ -40,6 +40,15 @@
     |                                                                        |
     | -v (boolean) verbose debugging flag.                                   |
     |                                                                        |
+    | -c (string) full path to a ATNF pulsar catalog database file. When     |
+    |             given, pulsar names are resolved against the catalog, so   |
+    |             output files are always named after the pulsar's J name.   |
+    |                                                                        |
+    | -n (int) the number of profiles downloaded at once (default 8).        |
+    |                                                                        |
+    | -u (string) the URL of the EPN database profiles are downloaded from   |
+    |             (default http://www.epta.eu.org/epndb/).                   |
+    |                                                                        |
     **************************************************************************
     | License:                                                               |
     |                                                                        |
@@ -56,10 +65,19 @@ from optparse import OptionParser
 
 import os, sys, re
 
-import urllib2
+import time
 
 import BeautifulSoup
 
+from EPNDownloader import EPNDownloader
+from EPNDownloader import EPN_URL
+from EPNDownloader import WORKERS
+
+# Shared catalog tools, found in the Catalog directory of this repository.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","Catalog"))
+from CatalogCache import CatalogCache
+from NameIndex import NameIndex
+
 # ******************************
 #
 # CLASS DEFINITION
@@ -106,6 +124,9 @@ class EPNDataExtractor_v2:
 
         # OPTIONAL ARGUMENTS
         parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+        parser.add_option("-c", action="store", dest="atnfPath",help='Path to a pulsar catalog file, used to resolve names (optional).',default="")
+        parser.add_option("-n", action="store", dest="workers",type="int",help='Number of profiles downloaded at once (optional).',default=WORKERS)
+        parser.add_option("-u", action="store", dest="baseUrl",help='URL of the EPN database (optional).',default=EPN_URL)
 
         (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
 
@@ -114,6 +135,9 @@ class EPNDataExtractor_v2:
         self.htmlPath   = args.htmlPath
         self.outputPath = args.outputPath
         self.outputDir  = args.outputDir
+        self.atnfPath   = args.atnfPath
+        self.workers    = args.workers
+        self.baseUrl    = args.baseUrl if args.baseUrl.endswith("/") else args.baseUrl + "/"
 
         # ****************************************
         #   Print command line arguments & Run
@@ -126,6 +150,9 @@ class EPNDataExtractor_v2:
         print "\tEPN database file:",self.htmlPath
         print "\tOutput file path:",self.outputPath
         print "\tOutput directory path:",self.outputDir
+        print "\tPulsar catalog file path:",self.atnfPath
+        print "\tProfiles downloaded at once:",self.workers
+        print "\tEPN database URL:",self.baseUrl
 
         # Now we know the input files exist...
 
@@ -190,6 +217,20 @@ class EPNDataExtractor_v2:
         #
         #
 
+        # Index the names of catalog pulsars, so EPN names (J or B) can be
+        # resolved to the same pulsar.
+        nameIndex = None
+        unresolved = 0
+
+        if(self.atnfPath != ""):
+            if(os.path.isfile(self.atnfPath) == False):
+                print "\n\tPulsar catalog file not found - Exiting!"
+                sys.exit()
+
+            catalog = CatalogCache(verbose=self.verbose).loadDatabase(self.atnfPath,["PSRJ","PSRB"])
+            nameIndex = NameIndex(catalog)
+            print "\n\tIndexed names of",len(nameIndex),"catalog pulsars."
+
         links = []
         altLinks = []
         fileNames = []
@@ -232,6 +273,20 @@ class EPNDataExtractor_v2:
                     pulsarName_1 = pulsarName_1.replace(m.group(1),"")
                     pulsarName_2 = m.group(1).replace(")","").replace("(","")
 
+                # Resolve the names against the catalog, so the J name is used
+                # for output files, and the B name (if any) as the alternative.
+                if(nameIndex is not None):
+                    names = nameIndex.names(pulsarName_1) or nameIndex.names(pulsarName_2)
+
+                    if(names):
+                        if(pulsarName_1 != names[0]):
+                            pulsarName_2 = pulsarName_1
+                            pulsarName_1 = names[0]
+                        elif(len(names) > 1 and pulsarName_2 == pulsarName_1):
+                            pulsarName_2 = names[1]
+                    else:
+                        unresolved += 1
+
                 print "\tPulsar name 1: ", pulsarName_1, "\tPulsar name 2: ", pulsarName_2
 
                 for linkComponent in linkComponents[2:len(linkComponents)]:
@@ -252,7 +307,10 @@ class EPNDataExtractor_v2:
                     indexOfFileStart = linkComponent_clean.find("href=")
                     indexOfFileEnd   = linkComponent_clean.find(">")
                     FirstFile = linkComponent_clean[indexOfFileStart+6:indexOfFileEnd-1]
-                    SecondFile = FirstFile.replace(pulsarName_1,pulsarName_2)
+                    if(pulsarName_1 in FirstFile):
+                        SecondFile = FirstFile.replace(pulsarName_1,pulsarName_2)
+                    else:
+                        SecondFile = FirstFile.replace(pulsarName_2,pulsarName_1)
 
                     print "\tFile 1: " , FirstFile
                     print "\tFile 2: " , SecondFile
@@ -273,8 +331,8 @@ class EPNDataExtractor_v2:
                     # Whilst the actual ascii file is stored at...
                     # http://www.epta.eu.org/epndb/ascii/cn95/J0006+1834/cn95.txt
 
-                    urlLink = "http://www.epta.eu.org/epndb/" + FirstFile.replace("#","ascii/").replace(".epn",".txt").replace(".STF",".txt").replace(".TF",".txt").replace(".STFC",".txt").replace(".SFTC",".txt")
-                    alternativeLink = "http://www.epta.eu.org/epndb/" + SecondFile.replace("#","ascii/").replace(".epn",".txt").replace(".STF",".txt").replace(".TF",".txt").replace(".STFC",".txt").replace(".SFTC",".txt")
+                    urlLink = self.baseUrl + FirstFile.replace("#","ascii/").replace(".epn",".txt").replace(".STF",".txt").replace(".TF",".txt").replace(".STFC",".txt").replace(".SFTC",".txt")
+                    alternativeLink = self.baseUrl + SecondFile.replace("#","ascii/").replace(".epn",".txt").replace(".STF",".txt").replace(".TF",".txt").replace(".STFC",".txt").replace(".SFTC",".txt")
 
                     urlLink = urlLink[0:urlLink.rfind(".")] + ".txt"
                     alternativeLink = alternativeLink[0:alternativeLink.rfind(".")] + ".txt"
@@ -285,37 +343,27 @@ class EPNDataExtractor_v2:
                     altLinks.append(alternativeLink)
 
         print "Links found: " , len(links)
-        downloaded = 0
-        for l, al,fn in zip(links,altLinks,fileNames):
-
-            print "\t", downloaded,":", "\t",l,"\t",al
-
-            if("/J1012+5307" in l):
-                l = "http://www.epta.eu.org/epndb/ascii/nsk+15/1012+5307/J1012+5307_L81268.txt"
-                al = "http://www.epta.eu.org/epndb/ascii/nsk+15/1012+5307/J1012+5307_L81268.txt"
-            try:
-                response = urllib2.urlopen(l)
-            except Exception:
-                response = urllib2.urlopen(al)
-
 
-            html = response.read()
-            fpath = self.outputDir + "/" + fn
+        if(nameIndex is not None):
+            print "Pulsars not found in catalog: " , unresolved
 
-            if(os.path.exists(fpath) == True):
+        # The profiles are downloaded concurrently. Repeated output file
+        # names are numbered in link order, so names never depend on which
+        # download finishes first.
+        tasks = []
+        for l, al,fn in zip(links,altLinks,fileNames):
 
-                for x in range(1, 100):
-                    fpath = fpath.replace(".acn","_" + str(x) + ".acn")
+            if("/J1012+5307" in l):
+                l = self.baseUrl + "ascii/nsk+15/1012+5307/J1012+5307_L81268.txt"
+                al = self.baseUrl + "ascii/nsk+15/1012+5307/J1012+5307_L81268.txt"
 
-                    if(os.path.exists(fpath) == True):
-                        continue
-                    else:
-                        break
+            tasks.append(([l, al], fn))
 
-            self.appendToFile(fpath,html)
-            downloaded +=1
+        downloader = EPNDownloader(self.outputDir,workers=self.workers,verbose=self.verbose)
 
-        print "Downloaded: ", downloaded
+        start = time.time()
+        results = downloader.download(tasks)
+        downloader.printSummary(results,time.time() - start)
         #page = open("EPN_Links.html").read()
 
         #soup = BeautifulSoup.BeautifulSoup(page)
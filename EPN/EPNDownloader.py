@@ -0,0 +1,526 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                   EPN Profile Downloader Version 1.0                   |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Downloads the ASCII pulse profiles of the EPN database concurrently,   |
+    | with a fixed number of requests in flight at once. The time taken and  |
+    | the throughput of each request are reported, along with the totals.    |
+    | Output file names depend only on the list of files to download, never  |
+    | on the order in which downloads finish, so repeated runs (or runs with |
+    | different numbers of workers) produce the same files.                  |
+    |                                                                        |
+    | Run on its own, it mirrors a list of profile URLs such as that held in |
+    | EPN_Paths.txt, keeping the directory layout of the database. The       |
+    | database URL may be replaced, e.g. to mirror from a local copy.        |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | Required Command Line Arguments:                                       |
+    |                                                                        |
+    | -p (string) full path to a file listing the URL of one profile per     |
+    |             line, e.g. EPN_Paths.txt.                                  |
+    |                                                                        |
+    | --dir (string) full path to a directory used to store downloaded       |
+    |                profile data.                                           |
+    |                                                                        |
+    **************************************************************************
+    | Optional Command Line Arguments:                                       |
+    |                                                                        |
+    | -n (int) the number of downloads in flight at once (default 8).        |
+    |                                                                        |
+    | -u (string) the URL of the EPN database, replacing the URL the paths   |
+    |             start with (default http://www.epta.eu.org/epndb/).        |
+    |                                                                        |
+    | -t (float) the time out of each request, in seconds (default 60).      |
+    |                                                                        |
+    | -s (boolean) skip files already downloaded, so an interrupted mirror   |
+    |              can be resumed.                                           |
+    |                                                                        |
+    | -v (boolean) verbose debugging flag.                                   |
+    |                                                                        |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+
+import os, sys
+import threading
+import time
+
+try:
+    from urllib2 import urlopen
+except ImportError:
+    from urllib.request import urlopen
+
+try:
+    from Queue import Queue, Empty
+except ImportError:
+    from queue import Queue, Empty
+
+# The URL of the EPN database.
+EPN_URL = "http://www.epta.eu.org/epndb/"
+
+# The number of downloads in flight at once, by default.
+WORKERS = 8
+
+# The time out of each request (s), by default.
+TIMEOUT = 60.0
+
+# The number of bytes read from a response at a time.
+BLOCK_SIZE = 1 << 16
+
+# ****************************************************************************************************
+
+def uniqueNames(fileNames):
+    """
+    Makes a list of output file names unique. The first use of a name is
+    kept, and later uses are numbered in list order, so "J0006+1834_430.acn"
+    used three times becomes "J0006+1834_430.acn", "J0006+1834_430_1.acn"
+    and "J0006+1834_430_2.acn".
+
+    Parameters:
+    fileNames    -    the list of file names.
+
+    Returns:
+    a list of unique file names, in the same order.
+    """
+
+    used = set(fileNames)
+    seen = set()
+    names = []
+
+    for fileName in fileNames:
+        name = fileName
+
+        if(name in seen):
+            root, extension = os.path.splitext(fileName)
+            count = 1
+
+            while(root + "_" + str(count) + extension in used):
+                count += 1
+
+            name = root + "_" + str(count) + extension
+            used.add(name)
+
+        seen.add(name)
+        names.append(name)
+
+    return names
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class EPNDownloader:
+    """
+    Downloads files using a bounded pool of threads, for example:
+
+    downloader = EPNDownloader("profiles",workers=16)
+    start = time.time()
+    results = downloader.download([(["http://.../a.txt"], "a.acn"), ...])
+    downloader.printSummary(results,time.time() - start)
+
+    Each task is a tuple (urls, fileName). The URLs are tried in turn until
+    one succeeds, so alternatives may follow the preferred URL. Each result
+    is a dictionary with the keys url, path, bytes, seconds, skipped and
+    error (None if the download succeeded), in task order.
+
+    Files are first written with a ".part" extension and renamed once
+    complete, so a file with its final name is never partly written.
+    """
+
+    def __init__(self,outputDir,workers=WORKERS,timeout=TIMEOUT,skipExisting=False,verbose=False):
+        """
+        Creates a new downloader.
+
+        Parameters:
+        outputDir       -    the directory the files are written to.
+        workers         -    the number of downloads in flight at once.
+        timeout         -    the time out of each request, in seconds.
+        skipExisting    -    if True files already present are not downloaded again.
+        verbose         -    the verbose logging flag.
+
+        Returns:
+        N/A
+        """
+
+        self.outputDir    = outputDir
+        self.workers      = max(1,workers)
+        self.timeout      = timeout
+        self.skipExisting = skipExisting
+        self.verbose      = verbose
+
+        # Serialises the progress lines printed by the worker threads.
+        self.printLock = threading.Lock()
+
+    # ****************************************************************************************************
+
+    def newResult(self,url,path):
+        """
+        Returns the result dictionary of a download not yet made, see the
+        class description.
+        """
+
+        return {"url": url, "path": path, "bytes": 0, "seconds": 0.0, "error": None, "skipped": False}
+
+    # ****************************************************************************************************
+
+    def fetch(self,urls,path):
+        """
+        Downloads a single file, trying each URL in turn.
+
+        Parameters:
+        urls    -    the list of URLs to try.
+        path    -    the path of the file to write.
+
+        Returns:
+        a result dictionary, see the class description.
+        """
+
+        result = self.newResult("",path)
+
+        # Reported as a failed download, rather than raising in a worker thread.
+        if(len(urls) == 0):
+            result["error"] = "no URL to download from"
+            return result
+
+        result["url"] = urls[0]
+
+        if(self.skipExisting and os.path.isfile(path)):
+            result["bytes"] = os.path.getsize(path)
+            result["skipped"] = True
+            return result
+
+        start = time.time()
+
+        for url in urls:
+            result["url"] = url
+            partPath = path + ".part"
+
+            try:
+                response = urlopen(url,timeout=self.timeout)
+
+                try:
+                    destinationFile = open(partPath,'wb')
+                    size = 0
+
+                    try:
+                        block = response.read(BLOCK_SIZE)
+                        while(block):
+                            destinationFile.write(block)
+                            size += len(block)
+                            block = response.read(BLOCK_SIZE)
+                    finally:
+                        destinationFile.close()
+                finally:
+                    response.close()
+
+                # Any earlier copy is removed first, as os.rename does not
+                # replace an existing file on Windows.
+                if(os.path.exists(path)):
+                    os.remove(path)
+                os.rename(partPath,path)
+
+                result["bytes"] = size
+                result["error"] = None
+                break
+            except Exception as exception:
+                result["error"] = str(exception)
+
+                if(os.path.exists(partPath)):
+                    os.remove(partPath)
+
+        result["seconds"] = time.time() - start
+
+        return result
+
+    # ****************************************************************************************************
+
+    def report(self,number,total,result):
+        """
+        Prints the outcome and throughput of a single download.
+        """
+
+        if(result["skipped"]):
+            if(self.verbose):
+                line = "\tSkipped " + result["path"] + " (already downloaded)"
+            else:
+                return
+        elif(result["error"] is not None):
+            line = "\tFAILED " + (result["url"] or result["path"]) + " : " + result["error"]
+        else:
+            line = ("\t" + os.path.basename(result["path"]) + "  " + str(result["bytes"]) + " bytes in " +
+                    ("%.3f" % result["seconds"]) + " s (" + ("%.1f" % self.rate(result["bytes"],result["seconds"])) + " KB/s)")
+
+        self.printLock.acquire()
+        try:
+            print("\t" + str(number) + "/" + str(total) + line)
+        finally:
+            self.printLock.release()
+
+    # ****************************************************************************************************
+
+    def rate(self,size,seconds):
+        """
+        Returns a throughput in KB/s, 0 if no time has passed.
+        """
+
+        if(seconds <= 0):
+            return 0.0
+
+        return size / 1024.0 / seconds
+
+    # ****************************************************************************************************
+
+    def work(self,taskQueue,results,counter):
+        """
+        The body of a worker thread: downloads tasks from the queue until it
+        is empty. Each result is stored at the position of its task, so the
+        results are in task order however the downloads interleave.
+        """
+
+        while(True):
+            try:
+                index, urls, path = taskQueue.get_nowait()
+            except Empty:
+                return
+
+            # Anything fetch does not handle itself (e.g. failing to remove a
+            # partial file) fails this task alone, rather than the worker.
+            try:
+                result = self.fetch(urls,path)
+            except Exception as exception:
+                result = self.newResult(urls[0] if urls else "",path)
+                result["error"] = str(exception)
+
+            results[index] = result
+
+            self.printLock.acquire()
+            try:
+                counter[0] += 1
+                number = counter[0]
+            finally:
+                self.printLock.release()
+
+            self.report(number,len(results),result)
+
+    # ****************************************************************************************************
+
+    def download(self,tasks):
+        """
+        Downloads every task, with at most self.workers in flight at once.
+
+        Parameters:
+        tasks    -    a list of tuples (urls, fileName). File names may
+                      include sub directories of the output directory, and
+                      repeated names are numbered, see uniqueNames().
+
+        Returns:
+        the list of result dictionaries, in task order.
+        """
+
+        fileNames = uniqueNames([fileName for urls, fileName in tasks])
+
+        taskQueue = Queue()
+        for index, (task, fileName) in enumerate(zip(tasks,fileNames)):
+            path = os.path.join(self.outputDir,fileName)
+
+            directory = os.path.dirname(path)
+            if(directory and os.path.isdir(directory) == False):
+                os.makedirs(directory)
+
+            taskQueue.put((index, list(task[0]), path))
+
+        results = [None] * len(tasks)
+        counter = [0]
+
+        threads = []
+        for i in range(min(self.workers,len(tasks))):
+            thread = threading.Thread(target=self.work,args=(taskQueue,results,counter))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+
+        # Joined with a time out, so that Ctrl-C still stops the application.
+        for thread in threads:
+            while(thread.is_alive()):
+                thread.join(0.5)
+
+        return results
+
+    # ****************************************************************************************************
+
+    def printSummary(self,results,seconds):
+        """
+        Prints the totals of a set of downloads.
+
+        Parameters:
+        results    -    the result dictionaries returned by download().
+        seconds    -    the time taken by download() (wall clock).
+
+        Returns:
+        N/A
+        """
+
+        downloaded = [result for result in results if result["error"] is None and result["skipped"] == False]
+        skipped    = [result for result in results if result["skipped"]]
+        failed     = [result for result in results if result["error"] is not None]
+
+        size = sum(result["bytes"] for result in downloaded)
+        requestSeconds = sum(result["seconds"] for result in downloaded)
+
+        print("\n\tDownloaded          : " + str(len(downloaded)))
+        print("\tSkipped             : " + str(len(skipped)))
+        print("\tFailed              : " + str(len(failed)))
+        print("\tBytes               : " + str(size))
+        print("\tTime (s)            : " + ("%.3f" % seconds))
+        print("\tFiles per second    : " + ("%.2f" % (len(downloaded) / seconds if seconds > 0 else 0.0)))
+        print("\tThroughput (KB/s)   : " + ("%.1f" % self.rate(size,seconds)))
+
+        # The mean time of a request, against the wall clock time per file,
+        # shows how much waiting the concurrent requests overlapped.
+        if(downloaded):
+            print("\tMean request (s)    : " + ("%.3f" % (requestSeconds / len(downloaded))))
+
+        for result in failed:
+            print("\tFAILED " + (result["url"] or result["path"]) + " : " + result["error"])
+
+    # ****************************************************************************************************
+
+    def readPaths(self,path,baseUrl=EPN_URL):
+        """
+        Reads a list of profile URLs, one per line, into download tasks.
+        URLs starting with EPN_URL are moved to baseUrl, and each file is
+        named by its path within the database, e.g.
+
+        http://www.epta.eu.org/epndb/ascii/acj+96/J0538+2817/acj+96_430a.txt
+
+        is written to ascii/acj+96/J0538+2817/acj+96_430a.txt.
+
+        Parameters:
+        path       -    the path to the file of URLs.
+        baseUrl    -    the URL of the EPN database to download from.
+
+        Returns:
+        a list of tuples (urls, fileName).
+        """
+
+        pathsFile = open(path,'r')
+        urls = [line.strip() for line in pathsFile if line.strip()]
+        pathsFile.close()
+
+        if(baseUrl.endswith("/") == False):
+            baseUrl += "/"
+
+        tasks = []
+        for url in urls:
+            if(url.startswith(EPN_URL)):
+                fileName = url[len(EPN_URL):]
+                url = baseUrl + fileName
+            else:
+                fileName = url.split("://")[-1].split("/",1)[-1]
+
+            tasks.append(([url], fileName))
+
+        return tasks
+
+    # ******************************
+    #
+    # MAIN METHOD AND ENTRY POINT.
+    #
+    # ******************************
+
+    def main(self,argv=None):
+        """
+        Main entry point for the Application. Processes command line
+        input and begins the downloads.
+
+        """
+
+        # ****************************************
+        #         Execution information
+        # ****************************************
+
+        print(__doc__)
+
+        # ****************************************
+        #    Command line argument processing
+        # ****************************************
+
+        # Python 2.4 argument processing.
+        parser = OptionParser()
+
+        # REQUIRED ARGUMENTS
+        parser.add_option("-p", action="store", dest="pathsPath",help='Path to a file of profile URLs.',default="")
+        parser.add_option("--dir", action="store", dest="outputDir",help='Directory to store downloaded files to.',default="")
+
+        # OPTIONAL ARGUMENTS
+        parser.add_option("-n", action="store", dest="workers",type="int",help='Number of downloads in flight (optional).',default=WORKERS)
+        parser.add_option("-u", action="store", dest="baseUrl",help='URL of the EPN database (optional).',default=EPN_URL)
+        parser.add_option("-t", action="store", dest="timeout",type="float",help='Request time out in seconds (optional).',default=TIMEOUT)
+        parser.add_option("-s", action="store_true", dest="skipExisting",help='Skip files already downloaded (optional).',default=False)
+        parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+
+        (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+        # Update variables with command line parameters.
+        self.outputDir    = args.outputDir
+        self.workers      = max(1,args.workers)
+        self.timeout      = args.timeout
+        self.skipExisting = args.skipExisting
+        self.verbose      = args.verbose
+
+        # ****************************************
+        #   Print command line arguments & Run
+        # ****************************************
+
+        print("\n\t**************************")
+        print("\t| Command Line Arguments |")
+        print("\t**************************")
+        print("\tDebug: " + str(self.verbose))
+        print("\tProfile URL list: " + args.pathsPath)
+        print("\tOutput directory path: " + self.outputDir)
+        print("\tDownloads in flight: " + str(self.workers))
+        print("\tEPN database URL: " + args.baseUrl)
+        print("\tSkip existing files: " + str(self.skipExisting))
+
+        if(os.path.isfile(args.pathsPath) == False):
+            print("\n\tYou must supply a file of profile URLs via the -p flag.")
+            sys.exit()
+
+        if(self.outputDir == ""):
+            print("\n\tYou must supply an output directory via the --dir flag.")
+            sys.exit()
+
+        tasks = self.readPaths(args.pathsPath,args.baseUrl)
+        print("\n\tFiles to download: " + str(len(tasks)) + "\n")
+
+        start = time.time()
+        results = self.download(tasks)
+        self.printSummary(results,time.time() - start)
+
+        print("\n\tDone.")
+        print("\t**************************************************************************") # Used only for formatting purposes.
+
+    # ****************************************************************************************************
+
+if __name__ == '__main__':
+    EPNDownloader(".").main()
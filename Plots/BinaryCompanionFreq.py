@@ -1,35 +1,223 @@
+"""
+    **************************************************************************
+    |                                                                        |
+    |                  Binary Companion Frequency Version 1.0                |
+    |                                                                        |
+    **************************************************************************
+    | Description:                                                           |
+    |                                                                        |
+    | Plots a histogram of the types of binary companion of the pulsars in a |
+    | catalog. The counts are computed from the BINCOMP column, with the     |
+    | reference of each value removed (e.g. "He[fck+03]" counts as "He").    |
+    | Binary pulsars (those with a BINARY model) with no BINCOMP value are   |
+    | counted as "?".                                                        |
+    |                                                                        |
+    **************************************************************************
+    | Author: Rob Lyon                                                       |
+    | Email : robert.lyon@manchester.ac.uk                                   |
+    | web   : www.scienceguyrob.com                                          |
+    **************************************************************************
+    | Required Command Line Arguments:                                       |
+    |                                                                        |
+    | -a (string) full path to a psrcat web interface CSV file holding the   |
+    |             BINARY and BINCOMP columns (e.g. the detailed output), or  |
+    |             to a store converted from one by Data/ParseCSVFile.py.     |
+    |                                                                        |
+    **************************************************************************
+    | Optional Command Line Arguments:                                       |
+    |                                                                        |
+    | -v (boolean) verbose debugging flag.                                   |
+    |                                                                        |
+    | --imports (boolean) report the time taken to import heavy modules.     |
+    |                                                                        |
+    | --noplot (boolean) print the statistics only, without plotting.        |
+    |                                                                        |
+    **************************************************************************
+    | License:                                                               |
+    |                                                                        |
+    | Code made available under the GPLv3 (GNU General Public License), that |
+    | allows you to copy, modify and redistribute the code as you see fit    |
+    | (http://www.gnu.org/copyleft/gpl.html). Though a mention to the        |
+    | original author using the citation above in derivative works, would be |
+    | very much appreciated.                                                 |
+    **************************************************************************
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+
+import os, sys
+
 import numpy as np
-import matplotlib.pyplot as plt
 
-alphab = ["Unknown","CO or ONeMg White Dwarf","CO or ONeMg White Dwarf?",
-          "Helium White Dwarf","Helium White Dwarf?","Helium White Dwarf (T)",
-          "Main-sequence star","Main-sequence star?",
-          "Neutron star","Neutron star?",
-          "Ultra-light companion","Ultra-light companion?","Ultra-light companion (T)"]
+# Shared catalog tools, found in the Catalog directory of this repository.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","Catalog"))
+from Categorical import stripReference
+from CSVCatalog import CSVCatalog
+from LazyModule import LazyModule
+from LazyModule import printImportTimes
+
+# Heavy modules, imported only when first used.
+plt = LazyModule("matplotlib.pyplot")
+
+# The axis labels of the companion types, by BINCOMP value. Other values
+# are labelled as they appear in the catalog.
+COMPANION_LABELS = {"CO"   : "CO WD",     # CO or ONeMg White Dwarf.
+                    "CO(?)": "CO WD?",
+                    "He"   : "He WD",     # Helium White Dwarf.
+                    "He(?)": "He WD?",
+                    "HeT"  : "He WD (T)",
+                    "MS"   : "MS Star",   # Main-sequence star.
+                    "MS(?)": "MS Star?",
+                    "NS"   : "NS",        # Neutron star.
+                    "NS(?)": "NS?",
+                    "UL"   : "UL",        # Ultra-light companion.
+                    "UL(?)": "UL?",
+                    "ULT"  : "UL (T)"}
+
+# The label of binary pulsars whose companion is unknown.
+UNKNOWN_LABEL = "?"
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class BinaryCompanionFreq:
+    """
+    Counts and plots the binary companion types of a catalog.
+    """
+
+    # ****************************************************************************************************
+
+    def countCompanions(self,path):
+        """
+        Counts the pulsars with each type of binary companion.
+
+        Parameters:
+        path    -    the path to the CSV file, or to a converted store directory.
+
+        Returns:
+        a tuple (labels, frequencies), sorted from the most to the least
+        frequent companion type.
+        """
+
+        csvCatalog = CSVCatalog()
+        binary     = csvCatalog.loadCategorical(path,"BINARY")
+        companions = csvCatalog.loadCategorical(path,"BINCOMP").relabel(stripReference)
+
+        labels = [COMPANION_LABELS.get(label,label) for label in companions.labels] + [UNKNOWN_LABEL]
+        frequencies = np.append(companions.counts(),np.count_nonzero(~binary.missing() & companions.missing()))
+
+        # Most frequent first, ties kept in label order.
+        order = np.argsort(-frequencies,kind="mergesort")
+
+        return [labels[i] for i in order], frequencies[order]
+
+    # ******************************
+    #
+    # MAIN METHOD AND ENTRY POINT.
+    #
+    # ******************************
+
+    def main(self,argv=None):
+        """
+        Main entry point for the Application. Processes command line
+        input and plots the histogram.
+
+        """
+
+        # ****************************************
+        #         Execution information
+        # ****************************************
+
+        print(__doc__)
+
+        # ****************************************
+        #    Command line argument processing
+        # ****************************************
+
+        # Python 2.4 argument processing.
+        parser = OptionParser()
+
+        # REQUIRED ARGUMENTS
+        parser.add_option("-a", action="store", dest="csvPath",help='Path to a csv file.',default="")
+
+        # OPTIONAL ARGUMENTS
+        parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+        parser.add_option("--imports", action="store_true", dest="importTimes",help='Report the time taken to import heavy modules (optional).',default=False)
+        parser.add_option("--noplot", action="store_true", dest="noPlot",help='Print statistics only, without plotting (optional).',default=False)
+
+        (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+        # Update variables with command line parameters.
+        self.verbose     = args.verbose
+        self.importTimes = args.importTimes
+        self.noPlot      = args.noPlot
+        self.csvPath     = args.csvPath
+
+        # ****************************************
+        #   Print command line arguments & Run
+        # ****************************************
+
+        print("\n\t**************************")
+        print("\t| Command Line Arguments |")
+        print("\t**************************")
+        print("\tDebug: " + str(self.verbose))
+        print("\tParsed CSV file path: " + self.csvPath)
+
+        # Check arguments for validity...
+        if(os.path.exists(self.csvPath) == False):
+            print("\n\tYou must supply a valid csv file via the -a flag.")
+            sys.exit()
+
+        # Now we know the input files exist...
+
+        # ****************************************
+        #        Counting section
+        # ****************************************
+
+        labels, frequencies = self.countCompanions(self.csvPath)
+
+        print("\n\t+----- BINARY COMPANIONS -----+")
+        for label, frequency in zip(labels,frequencies):
+            print("\t" + label.ljust(10) + ": " + str(frequency))
+
+        if(self.noPlot):
+            if(self.importTimes):
+                printImportTimes()
+
+            print("\n\tDone.")
+            print("\t**************************************************************************") # Used only for formatting purposes.
+            return
+
+        # ****************************************
+        #        Plotting section
+        # ****************************************
+
+        pos = np.arange(len(labels))
+        width = 1.0     # gives histogram aspect to the bar diagram
 
-alphab = ["?","CO WD","CO WD?",
-          "He WD","He WD?","He WD (T)",
-          "MS Star","MS Star?",
-          "NS","NS?",
-          "UL","UL?","UL (T)"]
+        ax = plt.axes()
+        ax.set_xticks(pos + (width / 2))
+        ax.set_xticklabels(labels)
 
-frequencies = [35,30,5,106,7,2,14,3,11,2,40,1,1]
+        plt.bar(pos, frequencies, width, color='r')
+        plt.title("Histogram of Binary Companions")
+        plt.xlabel("Companion type")
+        plt.ylabel("Frequency")
 
-# Ordered.
-frequencies = [106,40,35,30,14,11,7,5,3,2,2,1,1]
+        # Reported before show(), which blocks until the plot is closed.
+        if(self.importTimes):
+            printImportTimes()
 
-alphab = ["He WD","UL","?","CO WD","MS Star","NS","He WD?",
-          "CO WD?","MS Star?","He WD (T)","NS?","UL (T)","UL?"]
+        plt.show()
 
-pos = np.arange(len(alphab))
-width = 1.0     # gives histogram aspect to the bar diagram
+        print("\n\tDone.")
+        print("\t**************************************************************************") # Used only for formatting purposes.
 
-ax = plt.axes()
-ax.set_xticks(pos + (width / 2))
-ax.set_xticklabels(alphab)
+    # ****************************************************************************************************
 
-plt.bar(pos, frequencies, width, color='r')
-plt.title("Histogram of Binary Companions")
-plt.xlabel("Companion type")
-plt.ylabel("Frequency")
-plt.show()
\ No newline at end of file
+if __name__ == '__main__':
+    BinaryCompanionFreq().main()
@@ -24,6 +24,23 @@
     |                                                                        |
     | -v (boolean) verbose debugging flag.                                   |
     |                                                                        |
+    | --imports (boolean) report the time taken to import heavy modules.     |
+    |                                                                        |
+    | --noplot (boolean) print the statistics only, without plotting.        |
+    |                                                                        |
+    | --nocache (boolean) don't use or write the binary catalog cache.       |
+    |                                                                        |
+    | -q (string) catalog query selecting MSPs, by default:                  |
+    |             "P0 < 0.03 && P1 != 0 && P1 < 10e-16"                      |
+    |                                                                        |
+    | -r (float) search radius in degrees. When given, the pulsars lying     |
+    |            within this radius of each FRB, and the nearest pulsar to   |
+    |            each FRB, are listed.                                       |
+    |                                                                        |
+    | -f (string) full path to a list of FRB positions (a CSV file or column |
+    |             store directory, see Catalog/CrossMatch.py), used in place |
+    |             of the hard coded FRB positions.                           |
+    |                                                                        |
     **************************************************************************
     | License:                                                               |
     |                                                                        |
@@ -41,12 +58,20 @@ from optparse import OptionParser
 import os, sys
 
 import numpy as np
-from mpl_toolkits.axes_grid1 import host_subplot
-import mpl_toolkits.axisartist as AA
-from pylab import *
-import matplotlib.pyplot as plt
 import math as m
 
+# Shared catalog tools, found in the Catalog directory of this repository.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","Catalog"))
+from CatalogCache import CatalogCache
+from CatalogQuery import CatalogQuery
+from CatalogStats import CatalogStats
+from CSVCatalog import CSVCatalog
+from LazyModule import LazyModule
+from LazyModule import printImportTimes
+
+# Heavy modules, imported only when first used.
+plt = LazyModule("matplotlib.pyplot")
+
 # ******************************
 #
 # CLASS DEFINITION
@@ -99,22 +124,34 @@ class PlotAitoff_Pulsar:
 
         # OPTIONAL ARGUMENTS
         parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+        parser.add_option("--imports", action="store_true", dest="importTimes",help='Report the time taken to import heavy modules (optional).',default=False)
+        parser.add_option("--noplot", action="store_true", dest="noPlot",help='Print statistics only, without plotting (optional).',default=False)
+        parser.add_option("--nocache", action="store_true", dest="noCache",help='Disable the binary catalog cache (optional).',default=False)
+        parser.add_option("-q", action="store", dest="mspQuery",help='Catalog query selecting MSPs (optional).',default="P0 < 0.03 && P1 != 0 && P1 < 10e-16")
+        parser.add_option("-r", action="store", dest="radius",type="float",help='FRB search radius in degrees (optional).',default=0.0)
+        parser.add_option("-f", action="store", dest="frbPath",help='Path to a list of FRB positions (optional).',default="")
 
         (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
 
         # Update variables with command line parameters.
         self.verbose = args.verbose
+        self.importTimes = args.importTimes
+        self.noPlot = args.noPlot
+        self.noCache = args.noCache
         self.atnfCatalogPath = args.atnfPath
+        self.mspQuery = args.mspQuery
+        self.radius = args.radius
+        self.frbPath = args.frbPath
 
         # ****************************************
         #        File parsing section
         # ****************************************
 
-        # If the catalog file is found...
-        if(os.path.isfile(self.atnfCatalogPath)):
+        # Set when a plot is produced, to be shown once everything is printed.
+        plotted = False
 
-            # Read pulsar catalog file, extract useful variables
-            self.catalogueFile = open(self.atnfCatalogPath,'r') # Read only access
+        # If the catalog file is found...
+        if(os.path.exists(self.atnfCatalogPath)):
 
             # Variables we are looking for:
             # Gl (deg)
@@ -124,198 +161,129 @@ class PlotAitoff_Pulsar:
             # F0 Barycentric rotation frequency (Hz)
             # DM Dispersion measure (cm-3 pc)
 
-            ATNF_GLS           = []
-            ATNF_GBS           = []
-            ATNF_PERIODS       = []
-            ATNF_PERIODS_DERIV = []
-            ATNF_FREQS         = []
-            ATNF_DMS           = []
-
-            ATNF_GLS_MSP     = []
-            ATNF_GBS_MSP     = []
-            ATNF_PERIODS_MSP = []
-            ATNF_FREQS_MSP   = []
-            ATNF_DMS_MSP     = []
-
-            normalPulsarsMissingParameters = 0
-            mspsMissingParameters = 0
-
-            # For each line in the file...
-            for line in self.catalogueFile.readlines():
-
-                GL = "0"
-                GB = "0"
-                P0 = "0"
-                P1 = "0"
-                F0 = "0"
-                DM = "0"
-
-                components = line.rstrip('\n').split(",")
-
-                if ( line.startswith("#,")):
-                    # Ingore header
-                    pass
-                else:
-
-                    # Example input data:
-                    #
-                    #   #,NAME,Gl(deg),Gb(deg),P0(s),P1,F0(Hz),DM
-                    # 1,J0006+1834,108.172,-42.985,0.693748,2.10e-15,1.441446,12.00
-                    # 2,J0007+7303,119.660,10.463,0.315873,3.60e-13,3.165827,*
-                    # 3,B0011+47,116.497,-14.631,1.240699,5.64e-16,0.805997,30.85
-                    # 4,J0023+0923,111.383,-52.849,0.003050,*,327.868852,14.30
-                    # 5,B0021-72C,305.923,-44.892,0.005757,-4.98e-20,173.708219,24.60
-                    #
-                    #   Which when each line is split produces string arrays:
-                    #
-                    #   [ "1" , "J0006+1834" , "108.172" , "-42.985" , "0.693748" , "2.10e-15" , "1.441446"   , "12.00" ]
-                    #   [ "2" , "J0007+7303" , "119.660" , "10.463"  , "0.315873" , "3.60e-13" , "3.165827"   , "*"     ]
-                    #   [ "3" , "B0011+47"   , "116.497" , "-14.631" , "1.240699" , "5.64e-16" , "0.805997"   , "30.85" ]
-                    #   [ "4" , "J0023+0923" , "111.383" , "-52.849" , "0.003050" , "*" , "327.868852" , "14.30" ]
-                    #   [ "5" , "B0021-72C"  , "305.923" , "-44.892" , "0.005757" , "-4.98e-20" , "173.708219" , "24.60" ]
-                    #
-                    #   So the data we are looking for is at index (assuming zero
-                    #   indexing) positions 2, 3, 4, 5, 6, 7.
-
-                    # Check that an asterisk is not in place of an expected numerical value.
-                    # This happens when there is a missing entry in the catalog.
-                    if("*" not in components[2]):
-                        GL = components[2].strip()
-
-                    if("*" not in components[3]):
-                        GB = components[3].strip()
-
-                    if("*" not in components[4]):
-                        P0 = components[4].strip()
-
-                    if("*" not in components[5]):
-                        P1 = components[5].strip()
-
-                    if("*" not in components[6]):
-                        F0 = components[6].strip()
-
-                    if("*" not in components[7]):
-                        DM = components[7].strip()
-
-                    # Don't include pulsars with missing parameters...
-                    if(float(P0) != 0 and float(F0) != 0 and float(DM) > 0 and float(P1) != 0):
-
-                        if( (float(P0)*1000) < 30 and float(P1) < 10e-16 ):
-                            # Catalog GL values go from 0 - 360.
-                            if(float(GL) > 180):
-                                ATNF_GLS_MSP.append(m.radians(float(GL)-360))
-                            else:
-                                ATNF_GLS_MSP.append(m.radians(float(GL)))
-
-                            ATNF_GBS_MSP.append(m.radians(float(GB)))
-                            ATNF_PERIODS_MSP.append(float(P0))
-                            ATNF_FREQS_MSP.append(float(F0))
-                            ATNF_DMS_MSP.append(float(DM))
-                        else:
-
-                             # Catalog GL values go from 0 - 360.
-                            if(float(GL) > 180):
-                                ATNF_GLS.append(m.radians(float(GL)-360))
-                            else:
-                                ATNF_GLS.append(m.radians(float(GL)))
-
-                            ATNF_GBS.append(m.radians(float(GB)))
-                            ATNF_PERIODS.append(float(P0))
-                            ATNF_FREQS.append(float(F0))
-                            ATNF_DMS.append(float(DM))
-
-                    # If all parameters are available except for period derivative...
-                    elif (float(P0) != 0 and float(F0) != 0 and float(DM) > 0):
-                        # Catalog GL values go from 0 - 360.
-                        if(float(GL) > 180):
-                            ATNF_GLS.append(m.radians(float(GL)-360))
-                        else:
-                            ATNF_GLS.append(m.radians(float(GL)))
-
-                        ATNF_GBS.append(m.radians(float(GB)))
-                        ATNF_PERIODS.append(float(P0))
-                        ATNF_FREQS.append(float(F0))
-                        ATNF_DMS.append(float(DM))
-                    else:
-
-                        normalPulsarsMissingParameters+=1
-
-            self.catalogueFile.close()
+            # Example input data:
+            #
+            #   #,NAME,Gl(deg),Gb(deg),P0(s),P1,F0(Hz),DM
+            # 1,J0006+1834,108.172,-42.985,0.693748,2.10e-15,1.441446,12.00
+            # 2,J0007+7303,119.660,10.463,0.315873,3.60e-13,3.165827,*
+            # 3,B0011+47,116.497,-14.631,1.240699,5.64e-16,0.805997,30.85
+            # 4,J0023+0923,111.383,-52.849,0.003050,*,327.868852,14.30
+            # 5,B0021-72C,305.923,-44.892,0.005757,-4.98e-20,173.708219,24.60
+            #
+            #   The columns are found from the header row. An asterisk appears
+            #   in place of a missing entry in the catalog, and is stored as NaN.
+            #   Unless disabled, the loaded columns are cached, so the text is
+            #   only parsed again when the catalog file changes.
+            usecols = ["NAME","GL","GB","P0","P1","F0","DM"]
+
+            if(self.noCache):
+                columns = CSVCatalog(usecols).load(self.atnfCatalogPath)
+            else:
+                columns = CatalogCache(verbose=self.verbose).loadCSV(self.atnfCatalogPath,usecols)
+
+            # Don't include pulsars with missing parameters. Pulsars missing
+            # only a period derivative are still plotted as normal pulsars.
+            complete = CatalogQuery("P0 != 0 && F0 != 0 && DM > 0").evaluate(columns)
+            msp = complete & CatalogQuery(self.mspQuery).evaluate(columns)
+            normal = complete & ~msp
+
+            normalPulsarsMissingParameters = np.count_nonzero(~complete)
+
+            # Catalog GL values go from 0 - 360.
+            GLS = np.radians(np.where(columns["GL"] > 180,columns["GL"] - 360,columns["GL"]))
+            GBS = np.radians(columns["GB"])
+
+            ATNF_GLS           = GLS[normal]
+            ATNF_GBS           = GBS[normal]
+            ATNF_PERIODS       = columns["P0"][normal]
+            ATNF_FREQS         = columns["F0"][normal]
+            ATNF_DMS           = columns["DM"][normal]
+
+            ATNF_GLS_MSP     = GLS[msp]
+            ATNF_GBS_MSP     = GBS[msp]
+            ATNF_PERIODS_MSP = columns["P0"][msp]
+            ATNF_FREQS_MSP   = columns["F0"][msp]
+            ATNF_DMS_MSP     = columns["DM"][msp]
 
             # Print some details of the data collected...
             print "\n\t+----- MSP ATNF DATA -----+"
 
-            print "\tGLs                : ", len(ATNF_GLS_MSP)    , " Mean: ", mean(ATNF_GLS_MSP) , \
-                " Min: ", min(ATNF_GLS_MSP) , " Max: ", max(ATNF_GLS_MSP) , \
-                " Zero elements: ", len(ATNF_GLS_MSP) - count_nonzero(ATNF_GLS_MSP)
+            catalogStats = CatalogStats().update({"GL": ATNF_GLS_MSP, "GB": ATNF_GBS_MSP, "P0": ATNF_PERIODS_MSP, "F0": ATNF_FREQS_MSP, "DM": ATNF_DMS_MSP})
+            catalogStats.printSummary([("GLs","GL"),
+                                       ("GBs","GB"),
+                                       ("Periods parsed","P0"),
+                                       ("Frequencies parsed","F0"),
+                                       ("DMs parsed","DM")])
 
-            print "\tGBs                : ", len(ATNF_GBS_MSP)    , " Mean: ", mean(ATNF_GBS_MSP) , \
-                " Min: ", min(ATNF_GBS_MSP) , " Max: ", max(ATNF_GBS_MSP) , \
-                " Zero elements: ", len(ATNF_GBS_MSP) - count_nonzero(ATNF_GBS_MSP)
+            print "\n\tPulsars missing parameters (not included): ", normalPulsarsMissingParameters
 
-            print "\tPeriods parsed     : ", len(ATNF_PERIODS_MSP) , " Mean: ", mean(ATNF_PERIODS_MSP) , \
-                " Min: ", min(ATNF_PERIODS_MSP) , " Max: ", max(ATNF_PERIODS_MSP) , \
-                " Zero elements: ", len(ATNF_PERIODS_MSP) - count_nonzero(ATNF_PERIODS_MSP)
+            print "\n\t+----- ATNF DATA -----+"
 
-            print "\tFrequencies parsed : ", len(ATNF_FREQS_MSP)   , " Mean: ", mean(ATNF_FREQS_MSP) , \
-                " Min: ", min(ATNF_FREQS_MSP) , " Max: ", max(ATNF_FREQS_MSP) ,\
-                " Zero elements: ", len(ATNF_FREQS_MSP) - count_nonzero(ATNF_FREQS_MSP)
+            catalogStats = CatalogStats().update({"GL": ATNF_GLS, "GB": ATNF_GBS, "P0": ATNF_PERIODS, "F0": ATNF_FREQS, "DM": ATNF_DMS})
+            catalogStats.printSummary([("GLs","GL"),
+                                       ("GBs","GB"),
+                                       ("Periods parsed","P0"),
+                                       ("Frequencies parsed","F0"),
+                                       ("DMs parsed","DM")])
 
-            print "\tDMs parsed         : ", len(ATNF_DMS_MSP)     , " Mean: ", mean(ATNF_DMS_MSP) , \
-                " Min: ", min(ATNF_DMS_MSP) , " Max: ", max(ATNF_DMS_MSP) , \
-                " Zero elements: ", len(ATNF_DMS_MSP) - count_nonzero(ATNF_DMS_MSP)
+            # Hard coded FRB locations, according to GL and GB (deg).
+            frbGLs = [-3.4, -59.4, -113.6, 50.57, -4.14, 80.99, 49.28, -51.78, 7.45, -104.4, -35.2, -99.5, 50.8]
+            frbGBs = [-20.02, -41.8, -60.02, -54.85, -41.75, -59.02, -66.2, -26.2, 27.42, 30.66, 54.74, -21.9, -54.6]
 
-            print "\n\tPulsars missing parameters (not included): ", normalPulsarsMissingParameters
+            # Imported only when needed, as it loads scipy.spatial.
+            if(self.frbPath != "" or self.radius > 0):
+                from CrossMatch import CrossMatch
 
-            print "\n\t+----- ATNF DATA -----+"
+            if(self.frbPath != ""):
+                frbs = CrossMatch().readSources(self.frbPath)
+                frbGLs = np.where(frbs["GL"] > 180,frbs["GL"] - 360,frbs["GL"]).tolist()
+                frbGBs = frbs["GB"].tolist()
 
-            print "\tGLs                : ", len(ATNF_GLS)    , " Mean: ", mean(ATNF_GLS) , \
-                " Min: ", min(ATNF_GLS) , " Max: ", max(ATNF_GLS) , \
-                " Zero elements: ", len(ATNF_GLS) - count_nonzero(ATNF_GLS)
+            frbl = np.radians(frbGLs)
+            frbb = np.radians(frbGBs)
 
-            print "\tGBs                : ", len(ATNF_GBS)    , " Mean: ", mean(ATNF_GBS) , \
-                " Min: ", min(ATNF_GBS) , " Max: ", max(ATNF_GBS) , \
-                " Zero elements: ", len(ATNF_GBS) - count_nonzero(ATNF_GBS)
+            # List the pulsars near each FRB. Every FRB is cross matched
+            # against the catalog at once.
+            if(self.radius > 0):
+                print "\n\tPulsars near FRBs (within", self.radius, "deg):"
 
-            print "\tPeriods parsed     : ", len(ATNF_PERIODS) , " Mean: ", mean(ATNF_PERIODS) , \
-                " Min: ", min(ATNF_PERIODS) , " Max: ", max(ATNF_PERIODS) , \
-                " Zero elements: ", len(ATNF_PERIODS) - count_nonzero(ATNF_PERIODS)
+                # The catalog is indexed only when it is searched.
+                crossMatch = CrossMatch(columns)
+                found, rows, separations = crossMatch.match(frbGLs,frbGBs,self.radius)
 
-            print "\tFrequencies parsed : ", len(ATNF_FREQS)   , " Mean: ", mean(ATNF_FREQS) , \
-                " Min: ", min(ATNF_FREQS) , " Max: ", max(ATNF_FREQS) ,\
-                " Zero elements: ", len(ATNF_FREQS) - count_nonzero(ATNF_FREQS)
+                # Matches are ordered by FRB, so each FRB's matches are a slice.
+                bounds = np.searchsorted(found,np.arange(len(frbGLs) + 1))
 
-            print "\tDMs parsed         : ", len(ATNF_DMS)     , " Mean: ", mean(ATNF_DMS) , \
-                " Min: ", min(ATNF_DMS) , " Max: ", max(ATNF_DMS) , \
-                " Zero elements: ", len(ATNF_DMS) - count_nonzero(ATNF_DMS)
+                for frb, (GL, GB) in enumerate(zip(frbGLs,frbGBs)):
+                    near = slice(bounds[frb],bounds[frb + 1])
+                    nearRows, nearSeparations = rows[near], separations[near]
+                    closestRows, closestSeparations = crossMatch.skyIndex.nearest(GL,GB)
 
-            print "\t\nProducing plot..."
+                    print "\n\tFRB at GL:", GL, " GB:", GB, " Pulsars within radius: ", len(nearRows)
 
-            # OK, now produce the plot...
-            host = subplot(111, projection="aitoff")
-            #host = subplot(111, projection="hammer")
-            grid(True)
+                    for row, separation in zip(nearRows,nearSeparations):
+                        print "\t\t", columns["NAME"][row], "\tSeparation (deg): ", round(separation,3)
 
-            pulsar_bl, pulsarb = [ATNF_GLS, ATNF_GBS]
-            pulsar_msp_bl, pulsar_msp_b = [ATNF_GLS_MSP, ATNF_GBS_MSP]
-            pulsar_msp_bl, pulsar_msp_b = [ATNF_GLS_MSP, ATNF_GBS_MSP]
+                    for row, separation in zip(closestRows,closestSeparations):
+                        print "\t\tNearest: ", columns["NAME"][row], "\tSeparation (deg): ", round(separation,3)
 
-            # Hard coded FRB locations, according to GL and GB.
-            frbl =  [m.radians(-3.4), m.radians(-59.4), m.radians(-113.6), m.radians(50.57), m.radians(-4.14),\
-                          m.radians(80.99), m.radians(49.28), m.radians(-51.78), m.radians(7.45), m.radians(-104.4),\
-                          m.radians(-35.2), m.radians(-99.5), m.radians(50.8)]
+            if(self.noPlot == False):
+                print "\t\nProducing plot..."
 
-            frbb = [m.radians(-20.02), m.radians(-41.8),m.radians(-60.02), m.radians(-54.85), m.radians(-41.75),\
-                    m.radians(-59.02), m.radians(-66.2),m.radians(-26.2), m.radians(27.42), m.radians(30.66),\
-                    m.radians(54.74),m.radians(-21.9), m.radians(-54.6)]
+                # OK, now produce the plot...
+                host = plt.subplot(111, projection="aitoff")
+                #host = plt.subplot(111, projection="hammer")
+                plt.grid(True)
 
+                pulsar_bl, pulsarb = [ATNF_GLS, ATNF_GBS]
+                pulsar_msp_bl, pulsar_msp_b = [ATNF_GLS_MSP, ATNF_GBS_MSP]
 
-            pulsarplot = host.scatter(pulsar_bl,pulsarb, c='blue', marker='.', s=5)
-            host.scatter(pulsar_msp_bl,pulsar_msp_b, c='red', marker='.', s=50)
-            host.scatter(frbl,frbb, c='yellow', marker='*', s=500)
+                pulsarplot = host.scatter(pulsar_bl,pulsarb, c='blue', marker='.', s=5)
+                host.scatter(pulsar_msp_bl,pulsar_msp_b, c='red', marker='.', s=50)
+                host.scatter(frbl,frbb, c='yellow', marker='*', s=500)
 
-            plt.draw()
-            plt.show()
+                plt.draw()
+                plotted = True
 
         else:
             print "Catalog file not found at: ", self.atnfCatalogPath
@@ -329,6 +297,17 @@ class PlotAitoff_Pulsar:
         print "\t**************************"
         print "\tDebug:",self.verbose
         print "\tPulsar catalog file path:",self.atnfCatalogPath
+        print "\tMSP query:",self.mspQuery
+        print "\tFRB search radius (deg):",self.radius
+        print "\tFRB list path:",self.frbPath
+        print "\tNo cache:",self.noCache
+
+        if(self.importTimes):
+            printImportTimes()
+
+        # Shown last, as show() blocks until the plot is closed.
+        if(plotted):
+            plt.show()
 
         print "\tDone."
 
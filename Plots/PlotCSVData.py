@@ -21,6 +21,16 @@
     |                                                                        |
     | -v (boolean) verbose debugging flag.                                   |
     |                                                                        |
+    | -r (int) read the CSV file this many rows at a time, and plot a 2D     |
+    |          histogram of P0 against P1 rather than every point. Memory    |
+    |          use is then bounded, however large the file.                  |
+    |                                                                        |
+    | --imports (boolean) report the time taken to import heavy modules.     |
+    |                                                                        |
+    | --noplot (boolean) print the statistics only, without plotting.        |
+    |                                                                        |
+    | --nocache (boolean) don't use or write the binary catalog cache.       |
+    |                                                                        |
     **************************************************************************
     | License:                                                               |
     |                                                                        |
@@ -46,13 +56,22 @@ from numpy import median
 
 import numpy as np
 
-import matplotlib.pyplot as plt
+# Shared catalog tools, found in the Catalog directory of this repository.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","Catalog"))
+from CatalogCache import CatalogCache
+from CatalogStats import CatalogStats
+from CSVCatalog import CSVCatalog
+from Histogram2D import Histogram2D
+from LazyModule import LazyModule
+from LazyModule import printImportTimes
 
+# The ranges of P0 (s) and P1 (s s^-1) plotted.
+P0_RANGE = (1.0e-3, 1.0e2)
+P1_RANGE = (1.0e-22, 1.0e-8)
 
-# Scipy Imports:
-from scipy import std
-from scipy import stats
-from scipy import arange
+# Heavy modules, imported only when first used.
+plt   = LazyModule("matplotlib.pyplot")
+stats = LazyModule("scipy.stats")
 
 # ******************************
 #
@@ -96,12 +115,20 @@ class PlotCSVData:
 
         # OPTIONAL ARGUMENTS
         parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+        parser.add_option("-r", action="store", dest="chunkRows",type="int",help='Rows read at a time, plotting a 2D histogram (optional).',default=0)
+        parser.add_option("--imports", action="store_true", dest="importTimes",help='Report the time taken to import heavy modules (optional).',default=False)
+        parser.add_option("--noplot", action="store_true", dest="noPlot",help='Print statistics only, without plotting (optional).',default=False)
+        parser.add_option("--nocache", action="store_true", dest="noCache",help='Disable the binary catalog cache (optional).',default=False)
 
         (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
 
         # Update variables with command line parameters.
         self.verbose        = args.verbose
+        self.importTimes    = args.importTimes
+        self.noPlot         = args.noPlot
+        self.noCache        = args.noCache
         self.csvPath = args.csvPath
+        self.chunkRows = args.chunkRows
 
         # ****************************************
         #   Print command line arguments & Run
@@ -112,74 +139,59 @@ class PlotCSVData:
         print "\t**************************"
         print "\tDebug:",self.verbose
         print "\tParsed CSV file path:",self.csvPath
+        print "\tRows per chunk:",self.chunkRows
+        print "\tNo cache:",self.noCache
 
         # Check arguments for validity...
-        if(os.path.isfile(self.csvPath) == False):
+        if(os.path.exists(self.csvPath) == False):
             print "\n\tYou must supply a valid csv file via the -a flag."
             sys.exit()
 
         # Now we know the input files exist...
 
-        # Read parsed pulsar catalog file, extract useful variables:
-        # Period, Frequency, DM, pulse width
-        self.csvFile = open(self.csvPath,'r') # Read only access
-
         # ****************************************
         #        File parsing section
         # ****************************************
 
-        # variables for data
-        NAMES         = []
-        GLS           = []
-        GBS           = []
-        P0            = []
-        P1            = []
-        F0            = []
-        DM            = []
-        BINARY        = []
-        BINARY_PERIOD = []
-        SemiMajor     = []
-        BINCOMP       = []
-        DIST          = []
-        DIST_DM       = []
-        AGE           = []
-        EDOT          = []
-        PMTOT         = []
-
-        for line in self.csvFile.readlines():
-
-            components = line.replace("*","NaN").rstrip('\n').split(",")
-
-            if ( line.startswith("#,NAME")):
-                # Ingore header
-                pass
-
-            else:
-
-                NAMES.append(components[1])
-                GLS.append(float(components[2]))
-                GBS.append(float(components[3]))
-                P0.append(float(components[4]))
-                P1.append(float(components[5]))
-                F0.append(float(components[6]))
-                DM.append(float(components[7]))
-                BINARY.append(components[8])
-                BINARY_PERIOD.append(components[9])
-                SemiMajor.append(float(components[10]))
-                BINCOMP.append(components[11])
-                DIST.append(float(components[12]))
-                DIST_DM.append(float(components[13]))
-                AGE.append(float(components[14]))
-                EDOT.append(float(components[15]))
-                PMTOT.append(float(components[16]))
-
-        self.csvFile.close()
-
         powAge = [0.005192]
         powEDOT = [1.33E-020]
         print "\t1.1.1 Creating histogram for period samples..."
         #plt.hist(AGE, bins=self.freedmanDiaconisRule(AGE), color='w')
-        plt.scatter(P0, P1)
+
+        if(self.chunkRows > 0):
+            # Only one chunk of rows is held at a time.
+            catalogStats, histogram = self.accumulate(self.csvPath,self.chunkRows)
+            catalogStats.printSummary([("Periods parsed","P0"),("P1 parsed","P1")])
+            print "\tPoints plotted: ", histogram.total(), " Points outside the plot: ", histogram.skipped
+        else:
+            # Only the columns plotted are loaded, each as the narrowest type
+            # able to hold its values. Missing values ("*") are NaN. Unless
+            # disabled, the loaded columns are cached, so the text is only
+            # parsed again when the CSV file changes.
+            if(self.noCache):
+                catalog = CSVCatalog(["P0","P1"],compact=True).load(self.csvPath)
+            else:
+                catalog = CatalogCache(verbose=self.verbose).loadCSV(self.csvPath,["P0","P1"],compact=True)
+
+            P0 = catalog["P0"]
+            P1 = catalog["P1"]
+
+            CatalogStats().update(catalog).printSummary([("Periods parsed","P0"),("P1 parsed","P1")])
+
+        if(self.noPlot):
+            if(self.importTimes):
+                printImportTimes()
+
+            print "\n\tDone."
+            print "\t**************************************************************************" # Used only for formatting purposes.
+            return
+
+        if(self.chunkRows > 0):
+            plt.pcolormesh(histogram.xEdges,histogram.yEdges,np.ma.masked_equal(histogram.counts.T,0),cmap='Blues')
+            plt.colorbar(label="Pulsars")
+        else:
+            plt.scatter(P0, P1)
+
         plt.yscale('log')
         plt.xscale('log')
         plt.ylim(10e-23, 10e-9)
@@ -190,12 +202,50 @@ class PlotCSVData:
         plt.scatter(powAge, powEDOT,color='R')
 
         plt.plot([10e-3, 10e-8], [10e0, 10e-8], 'r--', lw=8)
+
+        # Reported before show(), which blocks until the plot is closed.
+        if(self.importTimes):
+            printImportTimes()
+
         plt.show()
+
         print "\n\tDone."
         print "\t**************************************************************************" # Used only for formatting purposes.
 
     # ****************************************************************************************************
 
+    def accumulate(self,path,chunkRows):
+        """
+        Reads a CSV file a chunk of rows at a time, accumulating the
+        statistics of P0 and P1, and a 2D histogram of the pulsars with
+        both values known and positive.
+
+        Parameters:
+        path         -    the path to the CSV file, or to a converted store directory.
+        chunkRows    -    the number of rows in each chunk.
+
+        Returns:
+        a tuple (CatalogStats, Histogram2D).
+        """
+
+        catalogStats = CatalogStats()
+        histogram = Histogram2D(P0_RANGE,P1_RANGE,bins=200,log=True)
+
+        for chunk in CSVCatalog(["P0","P1"]).chunks(path,chunkRows):
+            catalogStats.update(chunk,["P0","P1"])
+
+            with np.errstate(invalid='ignore'):
+                spinningDown = (chunk["P0"] > 0) & (chunk["P1"] > 0)
+
+            histogram.update(chunk["P0"][spinningDown],chunk["P1"][spinningDown])
+
+            if(self.verbose):
+                print "\t\tRows read: ", catalogStats["P0"].count + catalogStats["P0"].nanCount
+
+        return catalogStats, histogram
+
+    # ****************************************************************************************************
+
     def appendToFile(self,path,text):
         """
         Appends the provided text to the file at the specified path.
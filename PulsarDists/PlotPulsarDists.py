@@ -25,6 +25,10 @@
     |                                                                        |
     | -v (boolean) verbose debugging flag.                                   |
     |                                                                        |
+    | --imports (boolean) report the time taken to import heavy modules.     |
+    |                                                                        |
+    | --noplot (boolean) print the statistics only, without plotting.        |
+    |                                                                        |
     **************************************************************************
     | License:                                                               |
     |                                                                        |
@@ -44,23 +48,19 @@ import os, sys
 # Numpy Imports:
 from numpy import ceil
 from numpy import percentile
-from numpy import mean
 from numpy import random
 from numpy import median
-from numpy import count_nonzero
-
-# Scipy Imports:
-from scipy import std
-from scipy import stats
-from scipy import arange
 
+# Shared catalog tools, found in the Catalog directory of this repository.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","Catalog"))
+from CSVCatalog import CSVCatalog
+from CatalogStats import CatalogStats
+from LazyModule import LazyModule
+from LazyModule import printImportTimes
 
-# Other imports
-import matplotlib.pyplot as plt
-
-# For coordinate transformations.
-import ephem
-from astropy.coordinates import SkyCoord
+# Heavy modules, imported only when first used.
+plt   = LazyModule("matplotlib.pyplot")
+stats = LazyModule("scipy.stats")
 
 # ******************************
 #
@@ -116,11 +116,15 @@ class PlotPulsarDists:
 
         # OPTIONAL ARGUMENTS
         parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+        parser.add_option("--imports", action="store_true", dest="importTimes",help='Report the time taken to import heavy modules (optional).',default=False)
+        parser.add_option("--noplot", action="store_true", dest="noPlot",help='Print statistics only, without plotting (optional).',default=False)
 
         (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
 
         # Update variables with command line parameters.
         self.verbose        = args.verbose
+        self.importTimes    = args.importTimes
+        self.noPlot         = args.noPlot
         self.atnfParsedPath = args.atnfPath
 
         # ****************************************
@@ -134,148 +138,63 @@ class PlotPulsarDists:
         print "\tParsed Pulsar catalog file path:",self.atnfParsedPath
 
         # Check arguments for validity...
-        if(os.path.isfile(self.atnfParsedPath) == False):
+        if(os.path.exists(self.atnfParsedPath) == False):
             print "\n\tYou must supply a valid parsed ATNF file via the -a flag."
             sys.exit()
 
         # Now we know the input files exist...
 
-        # Read parsed pulsar catalog file, extract useful variables:
-        # Period, Frequency, DM, pulse width
-        self.atnfFile = open(self.atnfParsedPath,'r') # Read only access
-
         # ****************************************
         #        File parsing section
         # ****************************************
 
         # Variables we are looking for in the parsed ATNF file:
         # Barycentric period of the pulsar (s)
-        # Barycentric rotation frequency (Hz)
         # DM Dispersion measure (cm-3 pc)
-        # W10 Width of pulse at 10% (ms).
-        # W50 Width of pulse at 50% of peak (ms).
-
-        ATNF_NAMES    = []
-        ATNF_DM_DIST  = []
-        ATNF_DM_DIST1 = []
-        ATNF_AGE      = []
-        ATNF_EDOT     = []
-        ATNF_PMTOT    = []
-        ATNF_SMAXIS   = []
-        ATNF_BINARY_P = []
-        ATNF_PERIODS  = []
-        ATNF_FREQS    = []
-        ATNF_DMS      = []
-        binaryCount   = 0
-
-        for line in self.atnfFile.readlines():
-
-            components = line.rstrip('\n').split(",")
-
-            if ( line.startswith("#,NAME")):
-                # Ingore header
-                pass
-
-            else:
-                # Input file variable indexes...
-                # 0     Pulsar number
-                # 1     NAME
-                # 2     Gl(deg)
-                # 3     Gb(deg)
-                # 4     P0(s)
-                # 5     P1
-                # 6     F0(Hz)
-                # 7     DM(cm^-3pc)
-                # 8     BINARY (type)
-                # 9     Binary Period (days)
-                # 10    Semi-major axis
-                # 11    BINCOMP
-                # 12    DIST(kpc)
-                # 13    DIST_DM(kpc)
-                # 14    AGE(Yr)
-                # 15    EDOT(ergs/)
-                # 16    PMTOT(mas/yr)
-
-                if("*" not in components[1]):
-                    ATNF_NAMES.append(components[1])
-
-                if("*" not in components[4]):
-                    p0 = float(components[4])*1000
-                    ATNF_PERIODS.append(p0)
-                    ATNF_FREQS.append(1.0 / p0)
-
-                if("*" not in components[7]):
-                    ATNF_DMS.append(float(components[7]))
-
-                if("*" not in components[8]):
-                    binaryCount +=1
-
-                if("*" not in components[9]):
-                    ATNF_BINARY_P.append(float(components[9]))
-
-                if("*" not in components[10]):
-                    ATNF_SMAXIS.append(float(components[10]))
-
-                if("*" not in components[12]):
-                    ATNF_DM_DIST.append(float(components[12]))
-
-                if("*" not in components[13]):
-                    ATNF_DM_DIST1.append(float(components[13]))
-
-                if("*" not in components[14]):
-                    ATNF_AGE.append(float(components[14]))
-
-                if("*" not in components[15]):
-                    ATNF_EDOT.append(float(components[15]))
-
-                if("*" not in components[16]):
-                    ATNF_PMTOT.append(float(components[16]))
-
-        self.atnfFile.close()
+        # Binary type, period (days) and semi-major axis
+        # Distances (kpc), characteristic age (yr), Edot (ergs/s)
+        # Total proper motion (mas/yr)
+        #
+        # Missing values ("*") are loaded as NaN (or "" for text), and are
+        # left out of each variable below.
+        catalog = CSVCatalog(["NAME","P0","DM","BINARY","PB","A1","DIST","DIST_DM","AGE","EDOT","PMTOT"]).load(self.atnfParsedPath)
+
+        ATNF_NAMES    = catalog.values("NAME")
+        ATNF_DM_DIST  = catalog.values("DIST")
+        ATNF_DM_DIST1 = catalog.values("DIST_DM")
+        ATNF_AGE      = catalog.values("AGE")
+        ATNF_EDOT     = catalog.values("EDOT")
+        ATNF_PMTOT    = catalog.values("PMTOT")
+        ATNF_SMAXIS   = catalog.values("A1")
+        ATNF_BINARY_P = catalog.values("PB")
+        ATNF_PERIODS  = catalog.values("P0") * 1000
+        ATNF_FREQS    = 1.0 / ATNF_PERIODS
+        ATNF_DMS      = catalog.values("DM")
+        binaryCount   = len(catalog.values("BINARY"))
 
         # Print some details of the data collected...
         print "\n\t+----- ATNF DATA -----+"
-        print "\tPeriods parsed     : ", len(ATNF_PERIODS) , " Mean: ", mean(ATNF_PERIODS) , \
-            " Min: ", min(ATNF_PERIODS) , " Max: ", max(ATNF_PERIODS) , \
-            " Zero elements: ", len(ATNF_PERIODS) - count_nonzero(ATNF_PERIODS)
-
-        print "\tFrequencies parsed : ", len(ATNF_FREQS)   , " Mean: ", mean(ATNF_FREQS) , \
-            " Min: ", min(ATNF_FREQS) , " Max: ", max(ATNF_FREQS) ,\
-            " Zero elements: ", len(ATNF_FREQS) - count_nonzero(ATNF_FREQS)
-
-        print "\tDMs parsed         : ", len(ATNF_DMS)     , " Mean: ", mean(ATNF_DMS) , \
-            " Min: ", min(ATNF_DMS) , " Max: ", max(ATNF_DMS) , \
-            " Zero elements: ", len(ATNF_DMS) - count_nonzero(ATNF_DMS)
-
-        print "\tBinary periods     : ", len(ATNF_BINARY_P)    , " Mean: ", mean(ATNF_BINARY_P) , \
-            " Min: ", min(ATNF_BINARY_P) , " Max: ", max(ATNF_BINARY_P) , \
-            " Zero elements: ", len(ATNF_BINARY_P) - count_nonzero(ATNF_BINARY_P)
-
-        print "\tSemi-major axis    : ", len(ATNF_SMAXIS)    , " Mean: ", mean(ATNF_SMAXIS) , \
-            " Min: ", min(ATNF_SMAXIS) , " Max: ", max(ATNF_SMAXIS) , \
-            " Zero elements: ", len(ATNF_SMAXIS) - count_nonzero(ATNF_SMAXIS)
+        catalogStats = CatalogStats().update({"P0": ATNF_PERIODS, "F0": ATNF_FREQS, "DM": ATNF_DMS, "PB": ATNF_BINARY_P, "A1": ATNF_SMAXIS, "DIST": ATNF_DM_DIST, "DIST_DM": ATNF_DM_DIST1, "AGE": ATNF_AGE, "EDOT": ATNF_EDOT, "PMTOT": ATNF_PMTOT})
+        catalogStats.printSummary([("Periods parsed","P0"),
+                                   ("Frequencies parsed","F0"),
+                                   ("DMs parsed","DM"),
+                                   ("Binary periods","PB"),
+                                   ("Semi-major axis","A1"),
+                                   ("DM Dists parsed","DIST"),
+                                   ("DM Dists 1 parsed","DIST_DM"),
+                                   ("Ages Parsed","AGE"),
+                                   ("Edots parsed","EDOT"),
+                                   ("PMTOTS parsed","PMTOT")])
 
-        print "\tDM Dists parsed    : ", len(ATNF_DM_DIST)    , " Mean: ", mean(ATNF_DM_DIST) , \
-            " Min: ", min(ATNF_DM_DIST) , " Max: ", max(ATNF_DM_DIST) , \
-            " Zero elements: ", len(ATNF_DM_DIST) - count_nonzero(ATNF_DM_DIST)
-
-        print "\tDM Dists 1 parsed  : ", len(ATNF_DM_DIST1)    , " Mean: ", mean(ATNF_DM_DIST1) , \
-            " Min: ", min(ATNF_DM_DIST1) , " Max: ", max(ATNF_DM_DIST1) , \
-            " Zero elements: ", len(ATNF_DM_DIST1) - count_nonzero(ATNF_DM_DIST1)
-
-        print "\tAges Parsed        : ", len(ATNF_AGE)    , " Mean: ", mean(ATNF_AGE) , \
-            " Min: ", min(ATNF_AGE) , " Max: ", max(ATNF_AGE) , \
-            " Zero elements: ", len(ATNF_AGE) - count_nonzero(ATNF_AGE)
-
-        print "\tEdots parsed       : ", len(ATNF_EDOT)    , " Mean: ", mean(ATNF_EDOT) , \
-            " Min: ", min(ATNF_EDOT) , " Max: ", max(ATNF_EDOT) , \
-            " Zero elements: ", len(ATNF_EDOT) - count_nonzero(ATNF_EDOT)
+        print "\tBinaries           : ", binaryCount
 
-        print "\tPMTOTS parsed      : ", len(ATNF_PMTOT)    , " Mean: ", mean(ATNF_PMTOT) , \
-            " Min: ", min(ATNF_PMTOT) , " Max: ", max(ATNF_PMTOT) , \
-            " Zero elements: ", len(ATNF_PMTOT) - count_nonzero(ATNF_PMTOT)
+        if(self.noPlot):
+            if(self.importTimes):
+                printImportTimes()
 
-        print "\tBinaries           : ", binaryCount
+            print "\n\tDone."
+            print "\t**************************************************************************" # Used only for formatting purposes.
+            return
 
         # ****************************************
         #
@@ -306,6 +225,11 @@ class PlotPulsarDists:
         plt.xlabel("Pulse period (ms)")
         plt.ylabel("Frequency")
         plt.legend(loc='upper right')
+
+        # Reported before show(), which blocks until the plot is closed.
+        if(self.importTimes):
+            printImportTimes()
+
         plt.show()
 
         print "\n\tDone."
@@ -313,96 +237,6 @@ class PlotPulsarDists:
 
     # ****************************************************************************************************
 
-    def checkCoords(self,RA,DEC,EL,EB):
-        """
-        Checks that RA, DEC, GL and GB coordinates are correct.
-        Some ATNF entries have no RAJ or DECJ listed, only Equatorial
-        longitude and latitude. Likewise some candidates have RAJ and DECJ
-        listed but not galactic coordinates.
-
-        This function then computes RAJ and DECJ given ELong or ELat, and
-        also computes galactic longitude and latitude.
-
-        Parameters:
-        line    -    the line to extract data from.
-
-        Returns:
-            the RAJ, DECJ, GL, GB cooridinates of a ATNF catalog entry.
-
-        """
-
-        if("00:00:00" in RA and "00:00:00" in DEC):
-            # No RA and DEC provided. Try to create from EL and EB
-            if(EL == "0" and EB == "0"):
-                return [RA,DEC,EL,EB] #  Here just return the inputs, since we can't convert...
-            else:
-
-                # Use pyephem to convert from ecliptic to Equatorial coordinates...
-                ec = ephem.Ecliptic(EL,EB,epoch='2000')
-                RA = str(ec.to_radec()[0])
-                DEC = str(ec.to_radec()[1])
-
-                # Since we can't just convert from RA and DEC to GL and GB in pyephem,
-                # we instead use astropy to do the job. This requires that we first do
-                # some daft parsing of the string into pieces, then reform it in to the
-                # format required by astropy...
-                RA_COMPS = RA.split(":")
-                DEC_COMPS = DEC.split(":")
-                # Now reform the text into astropy format...
-                coordinateString = RA_COMPS[0] +"h"+ RA_COMPS[1] + "m" +RA_COMPS[2] + "s " + DEC_COMPS[0] +"d"+ DEC_COMPS[1] + "m" +DEC_COMPS[2] + "s"
-                # Now get galactic coordinates.
-                GL, GB = str(SkyCoord(coordinateString).galactic.to_string()).split()
-
-                return [RA,DEC,GL,GB]
-
-        if(EL == "0" and EB == "0"):
-            # No EL and EB provided.
-            if("00:00:00" in RA and "00:00:00" in DEC):
-                return [RA,DEC,EL,EB] #  Here just return the inputs, since we can't convert...
-            else:
-                # Since we can't just convert from RA and DEC to GL and GB in pyephem,
-                # we instead use astropy to do the job. This requires that we first do
-                # some daft parsing of the string into pieces, then reform it in to the
-                # format required by astropy...
-                RA_COMPS = self.checkFormatEquatorialCoordinate(RA).split(":")
-                DEC_COMPS = self.checkFormatEquatorialCoordinate(DEC).split(":")
-                # Now reform the text into astropy format...
-                coordinateString = RA_COMPS[0] +"h"+ RA_COMPS[1] + "m" +RA_COMPS[2] + "s " + DEC_COMPS[0] +"d"+ DEC_COMPS[1] + "m" +DEC_COMPS[2] + "s"
-                # Now get galactic coordinates.
-                GL, GB = str(SkyCoord(coordinateString).galactic.to_string()).split()
-
-                return [RA,DEC,GL,GB]
-
-        return [RA,DEC,EL,EB]
-
-    # ****************************************************************************************************
-
-    def checkFormatEquatorialCoordinate(self,coord):
-        """
-        Checks an equatorial coordinate component (RA or DEC) is
-        correctly formed as a string, i.e. has the format:
-
-        HH:MM:SS or DD:MM:SS
-        :param coord:
-            the coordinate the check.
-        :return:
-            the correctly formatted string.
-        """
-        components=coord.split(":")
-        length = len(components)
-        formatedCoord = ""
-        if(length<3):
-            if(length==1):
-                formatedCoord=coord+":00:00"
-            elif(length==2):
-                formatedCoord=coord+":00"
-        else:
-            formatedCoord = coord
-
-        return formatedCoord
-
-    # ****************************************************************************************************
-
     def extractRAAndDec(self,line):
         """
         Extracts RA and DEC values from a line of text.
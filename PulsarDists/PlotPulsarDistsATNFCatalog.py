@@ -25,6 +25,14 @@
     |                                                                        |
     | -v (boolean) verbose debugging flag.                                   |
     |                                                                        |
+    | --imports (boolean) report the time taken to import heavy modules.     |
+    |                                                                        |
+    | --noplot (boolean) print the statistics only, without plotting.        |
+    |                                                                        |
+    | --nocache (boolean) don't use or write the binary catalog cache.       |
+    |                                                                        |
+    | -p (int) number of processes used to parse the catalog (default 1).    |
+    |                                                                        |
     **************************************************************************
     | License:                                                               |
     |                                                                        |
@@ -44,23 +52,20 @@ import os, sys
 # Numpy Imports:
 from numpy import ceil
 from numpy import percentile
-from numpy import mean
 from numpy import random
 from numpy import median
-from numpy import count_nonzero
-
-# Scipy Imports:
-from scipy import std
-from scipy import stats
-from scipy import arange
 
+# Shared catalog tools, found in the Catalog directory of this repository.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","Catalog"))
+from CatalogLoader import CatalogLoader
+from CatalogCache import CatalogCache
+from CatalogStats import CatalogStats
+from LazyModule import LazyModule
+from LazyModule import printImportTimes
 
-# Other imports
-import matplotlib.pyplot as plt
-
-# For coordinate transformations.
-import ephem
-from astropy.coordinates import SkyCoord
+# Heavy modules, imported only when first used.
+plt   = LazyModule("matplotlib.pyplot")
+stats = LazyModule("scipy.stats")
 
 # ******************************
 #
@@ -153,12 +158,20 @@ class PlotPulsarDistsATNFCatalog:
 
         # OPTIONAL ARGUMENTS
         parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+        parser.add_option("--imports", action="store_true", dest="importTimes",help='Report the time taken to import heavy modules (optional).',default=False)
+        parser.add_option("--noplot", action="store_true", dest="noPlot",help='Print statistics only, without plotting (optional).',default=False)
+        parser.add_option("--nocache", action="store_true", dest="noCache",help='Disable the binary catalog cache (optional).',default=False)
+        parser.add_option("-p", action="store", dest="processes",type="int",help='Number of processes used to parse the catalog (optional).',default=1)
 
         (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
 
         # Update variables with command line parameters.
         self.verbose        = args.verbose
+        self.importTimes    = args.importTimes
+        self.noPlot         = args.noPlot
         self.atnfParsedPath = args.atnfPath
+        self.noCache        = args.noCache
+        self.processes      = args.processes
 
         # ****************************************
         #   Print command line arguments & Run
@@ -169,6 +182,8 @@ class PlotPulsarDistsATNFCatalog:
         print "\t**************************"
         print "\tDebug:",self.verbose
         print "\tParsed Pulsar catalog file path:",self.atnfParsedPath
+        print "\tNo cache:",self.noCache
+        print "\tParsing processes:",self.processes
 
         # Check arguments for validity...
         if(os.path.isfile(self.atnfParsedPath) == False):
@@ -177,119 +192,29 @@ class PlotPulsarDistsATNFCatalog:
 
         # Now we know the input files exist...
 
-        # Read parsed pulsar catalog file, extract useful variables:
-        # Period, Frequency, DM, pulse width
-        self.catalogFile = open(self.atnfParsedPath,'r') # Read only access
-
         # ****************************************
         #          File parsing section
         # ****************************************
 
 
-        # Variable stores...
-        ATNF_PERIODS  = []
-        ATNF_FREQS    = []
-        ATNF_DMS      = []
-        ATNF_W10S     = []
-        ATNF_W50S     = []
-
-
-        # Row variables...
-        Name = "Unknown"
-        RA   = "00:00:00"
-        DEC  = "00:00:00"
-        EL   = "0"
-        EB   = "0"
-        P0   = "0"
-        F0   = "0"
-        DM   = "0"
-        W10  = "0"
-        W50  = "0"
-
-        # For each line in the file...
-        for line in self.catalogFile.readlines():
-            if ( line[0] == '#'):
-                pass
-                    # Ignore these lines.
-            elif ( line[0] == '@'):
-                # This signals the end of the current source
-                # int the catalog file, so simply add the details
-                # collected to the output file.
-
-                # Compute period and frequency if not listed in catalog file.
-                if ( P0 == "0" and F0 != "0"):
-                    P0 = str( 1.0 / (float(F0)) )
-
-                if ( F0 == "0" and P0 != "0"):
-                    F0 = str( 1.0 / (float(P0)) )
-
-                # Check coordinates are valid, or convert them to make
-                # them valid. Also does equatorial to galactic conversion.
-                RA,DEC, GL,GB = self.checkCoords(RA,DEC,EL,EB)
-
-                if(P0 != "0"):
-                    ATNF_PERIODS.append(float(P0))
-
-                if(F0 != "0"):
-                    ATNF_FREQS.append(float(F0))
-
-                if(DM != "0"):
-                    ATNF_DMS.append(float(DM))
-
-                if(W10 != "0"):
-                    ATNF_W10S.append(float(W10))
-
-                if(W50 != "0"):
-                    ATNF_W50S.append(float(W50))
-
-                # Reset variables. This is useful as not all entries in the catalog
-                # have the values we're looking for (e.g. W10 or W50 are often empty).
-                Name = "Unknown"
-                RA   = "00:00:00"
-                DEC  = "00:00:00"
-                EL   = "0"
-                EB   = "0"
-                P0   = "0"
-                F0   = "0"
-                DM   = "0"
-                W10  = "0"
-                W50  = "0"
-                DM_DIST   = "0"
-                DM_DIST_1 = "0"
-
-            elif ( len(line) > 2 ):
-                pass
-                # If the line doesn't begin with '#' or '@' and isn't
-                # an empty line, then process it.
-
-                if ( line.startswith("PSRJ")):
-                    Name = self.extractRAAndDec(line)
-                #elif ( line.startswith("RAJ")):
-                #    RA = self.extractRAAndDec(line)
-                #elif ( line.startswith("DECJ")):
-                #    DEC = self.extractRAAndDec(line)
-                #elif ( line.startswith("ELONG")):
-                #    EL = self.extractFromCatalogFile(line)
-                #elif ( line.startswith("ELAT")):
-                #    EB = self.extractFromCatalogFile(line)
-                elif ( line.startswith("P0")):
-                    P0 = self.extractFromCatalogFile(line)
-                elif ( line.startswith("F0")):
-                    F0 = self.extractFromCatalogFile(line)
-                elif ( line.startswith("DM") and "DMEPOCH" not in line and "DIST" not in line):
-                    DM = self.extractFromCatalogFile(line)
-                #elif ( line.startswith("DIST_DM") and "DMEPOCH" not in line and "1" not in line):
-                #    DM_DIST = self.extractFromCatalogFile(line)
-                #elif ( line.startswith("DIST_DM1") and "DMEPOCH" not in line):
-                #    DM_DIST_1 = self.extractFromCatalogFile(line)
-                elif ( line.startswith("W10")):
-                    W10 = self.extractFromCatalogFile(line)
-                elif ( line.startswith("W50")):
-                    W50 = self.extractFromCatalogFile(line)
-            else:
-                pass # else ignore
-
-        self.catalogFile.close()
+        # Load the pulsar catalog into columns, extracting the useful
+        # variables: Period, Frequency, DM, pulse width. Missing values are
+        # stored as NaN, and P0 and F0 are computed from one another where
+        # only one of them is listed in the catalog file. Unless disabled,
+        # the parsed columns are cached, so the text is only parsed again
+        # when the catalog file changes.
+        parameters = ["PSRJ","P0","F0","DM","W10","W50"]
+
+        if(self.noCache):
+            catalog = CatalogLoader(self.processes,parameters).load(self.atnfParsedPath)
+        else:
+            catalog = CatalogCache(verbose=self.verbose).loadDatabase(self.atnfParsedPath,parameters,self.processes)
+
+        ATNF_PERIODS  = catalog.values("P0")
+        ATNF_FREQS    = catalog.values("F0")
+        ATNF_DMS      = catalog.values("DM")
+        ATNF_W10S     = catalog.values("W10")
+        ATNF_W50S     = catalog.values("W50")
 
         # ****************************************
         #       Print stats of data collected
@@ -297,25 +222,22 @@ class PlotPulsarDistsATNFCatalog:
 
         # Print some details of the data collected...
         print "\n\t+----- ATNF DATA -----+"
-        print "\tPeriods parsed     : ", len(ATNF_PERIODS) , " Mean: ", mean(ATNF_PERIODS) , \
-            " Min: ", min(ATNF_PERIODS) , " Max: ", max(ATNF_PERIODS) , \
-            " Zero elements: ", len(ATNF_PERIODS) - count_nonzero(ATNF_PERIODS)
-
-        print "\tFrequencies parsed : ", len(ATNF_FREQS)   , " Mean: ", mean(ATNF_FREQS) , \
-            " Min: ", min(ATNF_FREQS) , " Max: ", max(ATNF_FREQS) ,\
-            " Zero elements: ", len(ATNF_FREQS) - count_nonzero(ATNF_FREQS)
-
-        print "\tDMs parsed         : ", len(ATNF_DMS)     , " Mean: ", mean(ATNF_DMS) , \
-            " Min: ", min(ATNF_DMS) , " Max: ", max(ATNF_DMS) , \
-            " Zero elements: ", len(ATNF_DMS) - count_nonzero(ATNF_DMS)
-
-        print "\t10% Widths parsed  : ", len(ATNF_W10S)    , " Mean: ", mean(ATNF_W10S) , \
-            " Min: ", min(ATNF_W10S) , " Max: ", max(ATNF_W10S) , \
-            " Zero elements: ", len(ATNF_W10S) - count_nonzero(ATNF_W10S)
-
-        print "\t50% Widths parsed  : ", len(ATNF_W50S)    , " Mean: ", mean(ATNF_W50S) , \
-            " Min: ", min(ATNF_W50S) , " Max: ", max(ATNF_W50S) , \
-            " Zero elements: ", len(ATNF_W50S) - count_nonzero(ATNF_W50S)
+        # Every statistic of every column is computed in one pass over the
+        # columns. Missing values are not included, but are counted.
+        catalogStats = CatalogStats().update(catalog,["P0","F0","DM","W10","W50"])
+        catalogStats.printSummary([("Periods parsed","P0"),
+                                   ("Frequencies parsed","F0"),
+                                   ("DMs parsed","DM"),
+                                   ("10% Widths parsed","W10"),
+                                   ("50% Widths parsed","W50")])
+
+        if(self.noPlot):
+            if(self.importTimes):
+                printImportTimes()
+
+            print "\n\tDone."
+            print "\t**************************************************************************" # Used only for formatting purposes.
+            return
 
         # ****************************************
         #
@@ -346,6 +268,11 @@ class PlotPulsarDistsATNFCatalog:
         plt.xlabel("Pulse Width (ms)")
         plt.ylabel("Frequency")
         plt.legend(loc='upper right')
+
+        # Reported before show(), which blocks until the plot is closed.
+        if(self.importTimes):
+            printImportTimes()
+
         plt.show()
 
         print "\n\tDone."
@@ -355,173 +282,6 @@ class PlotPulsarDistsATNFCatalog:
 
     # ****************************************************************************************************
 
-    def checkCoords(self,RA,DEC,EL,EB):
-        """
-        Checks that RA, DEC, GL and GB coordinates are correct.
-        Some ATNF entries have no RAJ or DECJ listed, only Equatorial
-        longitude and latitude. Likewise some candidates have RAJ and DECJ
-        listed but not galactic coordinates.
-
-        This function then computes RAJ and DECJ given ELong or ELat, and
-        also computes galactic longitude and latitude.
-
-        Parameters:
-        line    -    the line to extract data from.
-
-        Returns:
-            the RAJ, DECJ, GL, GB cooridinates of a ATNF catalog entry.
-
-        """
-
-        if("00:00:00" in RA and "00:00:00" in DEC):
-            # No RA and DEC provided. Try to create from EL and EB
-            if(EL == "0" and EB == "0"):
-                return [RA,DEC,EL,EB] #  Here just return the inputs, since we can't convert...
-            else:
-
-                # Use pyephem to convert from ecliptic to Equatorial coordinates...
-                ec = ephem.Ecliptic(EL,EB,epoch='2000')
-                RA = str(ec.to_radec()[0])
-                DEC = str(ec.to_radec()[1])
-
-                # Since we can't just convert from RA and DEC to GL and GB in pyephem,
-                # we instead use astropy to do the job. This requires that we first do
-                # some daft parsing of the string into pieces, then reform it in to the
-                # format required by astropy...
-                RA_COMPS = RA.split(":")
-                DEC_COMPS = DEC.split(":")
-                # Now reform the text into astropy format...
-                coordinateString = RA_COMPS[0] +"h"+ RA_COMPS[1] + "m" +RA_COMPS[2] + "s " + DEC_COMPS[0] +"d"+ DEC_COMPS[1] + "m" +DEC_COMPS[2] + "s"
-                # Now get galactic coordinates.
-                GL, GB = str(SkyCoord(coordinateString).galactic.to_string()).split()
-
-                return [RA,DEC,GL,GB]
-
-        if(EL == "0" and EB == "0"):
-            # No EL and EB provided.
-            if("00:00:00" in RA and "00:00:00" in DEC):
-                return [RA,DEC,EL,EB] #  Here just return the inputs, since we can't convert...
-            else:
-                # Since we can't just convert from RA and DEC to GL and GB in pyephem,
-                # we instead use astropy to do the job. This requires that we first do
-                # some daft parsing of the string into pieces, then reform it in to the
-                # format required by astropy...
-                RA_COMPS = self.checkFormatEquatorialCoordinate(RA).split(":")
-                DEC_COMPS = self.checkFormatEquatorialCoordinate(DEC).split(":")
-                # Now reform the text into astropy format...
-                coordinateString = RA_COMPS[0] +"h"+ RA_COMPS[1] + "m" +RA_COMPS[2] + "s " + DEC_COMPS[0] +"d"+ DEC_COMPS[1] + "m" +DEC_COMPS[2] + "s"
-                # Now get galactic coordinates.
-                GL, GB = str(SkyCoord(coordinateString).galactic.to_string()).split()
-
-                return [RA,DEC,GL,GB]
-
-        return [RA,DEC,EL,EB]
-
-    # ****************************************************************************************************
-
-    def checkFormatEquatorialCoordinate(self,coord):
-        """
-        Checks an equatorial coordinate component (RA or DEC) is
-        correctly formed as a string, i.e. has the format:
-
-        HH:MM:SS or DD:MM:SS
-        :param coord:
-            the coordinate the check.
-        :return:
-            the correctly formatted string.
-        """
-        components=coord.split(":")
-        length = len(components)
-        formatedCoord = ""
-        if(length<3):
-            if(length==1):
-                formatedCoord=coord+":00:00"
-            elif(length==2):
-                formatedCoord=coord+":00"
-        else:
-            formatedCoord = coord
-
-        return formatedCoord
-
-    # ****************************************************************************************************
-
-    def extractRAAndDec(self,line):
-        """
-        Extracts RA and DEC values from a line of text.
-
-        Expects lines of the form:
-
-        PSRJ     J0006+1834                    cnt96
-        RAJ      00:06:04.8               2    cn95
-        RAJ      03:48:43.639000          4    afw+13
-        DECJ     +04:32:11.4580           2    afw+13
-
-        Parameters:
-        line    -    the line to extract data from.
-
-        Returns:
-            the string representation of the value stored in the line. For
-            the strings shown above, the function would return:
-
-            "J0006+1834"
-            "00:06:04.8"
-            "03:48:43.639000"
-            "+04:32:11.4580"
-
-        """
-
-        # Split string on whitespace. This should return an array of strings (see the
-        # more detailed description below).
-        components = line.split()
-
-        # If after splitting on whitespace the array has a length greater than zero (has data)...
-        if(len(components) > 1):
-
-            return components[1].strip()
-        else:
-            # For some reason there are no string components, so return 0
-            return "00:00:00"
-
-    # ****************************************************************************************************
-
-    def extractFromCatalogFile(self,line):
-        """
-        Extracts RA and DEC values from a line of text.
-
-        Expects lines of the form:
-
-        P0       0.69374767047            14   cn95
-        P1       2.097E-15                12   cn95
-        DM       12.0                     6    cn95
-        W50      82                            cn95
-
-        Parameters:
-        line    -    the line to extract data from.
-
-        Returns:
-            the string representation of the value stored in the line. For
-            the strings shown above, the function would return:
-
-            "0.69374767047"
-            "2.097E-15"
-            "12.0"
-            "82"
-
-        """
-
-        # Split string on whitespace. This should return an array of strings (see the
-        # more detailed description below).
-        components = line.split()
-
-        # If after splitting on whitespace the array has a length greater than zero (has data)...
-        if(len(components) > 0):
-            return components[1].strip()
-        else:
-            # For some reason there are no string components, so return 0
-            return "0"
-
-    # ****************************************************************************************************
-
     def appendToFile(self,path,text):
         """
         Appends the provided text to the file at the specified path.
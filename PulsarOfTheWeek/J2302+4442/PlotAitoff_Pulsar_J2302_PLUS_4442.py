@@ -24,6 +24,16 @@
     |                                                                        |
     | -v (boolean) verbose debugging flag.                                   |
     |                                                                        |
+    | --imports (boolean) report the time taken to import heavy modules.     |
+    |                                                                        |
+    | --noplot (boolean) print the statistics only, without plotting.        |
+    |                                                                        |
+    | -d (string) full path to a ATNF pulsar catalog database (psrcat.db).   |
+    |             When given, the pulsar of the week is looked up in it      |
+    |             rather than using hard coded values.                       |
+    |                                                                        |
+    | -n (string) name of the pulsar of the week, default "J2302+4442".      |
+    |                                                                        |
     **************************************************************************
     | License:                                                               |
     |                                                                        |
@@ -41,12 +51,21 @@ from optparse import OptionParser
 import os, sys
 
 import numpy as np
-from mpl_toolkits.axes_grid1 import host_subplot
-import mpl_toolkits.axisartist as AA
-from pylab import *
-import matplotlib.pyplot as plt
 import math as m
 
+# Shared catalog tools, found in the Catalog directory of this repository.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","..","Catalog"))
+from CatalogQuery import CatalogQuery
+from CatalogStats import CatalogStats
+from Coordinates import Coordinates
+from CSVCatalog import CSVCatalog
+from RecordIndex import RecordIndex
+from LazyModule import LazyModule
+from LazyModule import printImportTimes
+
+# Heavy modules, imported only when first used.
+plt = LazyModule("matplotlib.pyplot")
+
 # ******************************
 #
 # CLASS DEFINITION
@@ -99,18 +118,26 @@ class PlotAitoff_Pulsar_J2302_PLUS_4442:
 
         # OPTIONAL ARGUMENTS
         parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+        parser.add_option("--imports", action="store_true", dest="importTimes",help='Report the time taken to import heavy modules (optional).',default=False)
+        parser.add_option("--noplot", action="store_true", dest="noPlot",help='Print statistics only, without plotting (optional).',default=False)
+        parser.add_option("-d", action="store", dest="databasePath",help='Path to a psrcat.db file (optional).',default="")
+        parser.add_option("-n", action="store", dest="pulsarName",help='Name of the pulsar of the week (optional).',default="J2302+4442")
 
         (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
 
         # Update variables with command line parameters.
         self.verbose = args.verbose
+        self.importTimes = args.importTimes
+        self.noPlot = args.noPlot
         self.atnfCatalogPath = args.atnfPath
+        self.databasePath = args.databasePath
+        self.pulsarName = args.pulsarName
 
-        # If the catalog file is found...
-        if(os.path.isfile(self.atnfCatalogPath)):
+        # Set when a plot is produced, to be shown once everything is printed.
+        plotted = False
 
-            # Read pulsar catalog file, extract useful variables
-            self.catalogueFile = open(self.atnfCatalogPath,'r') # Read only access
+        # If the catalog file is found...
+        if(os.path.exists(self.atnfCatalogPath)):
 
             # Variables we are looking for:
             # Gl (deg)
@@ -119,122 +146,82 @@ class PlotAitoff_Pulsar_J2302_PLUS_4442:
             # F0 Barycentric rotation frequency (Hz)
             # DM Dispersion measure (cm-3 pc)
 
-            ATNF_GLS     = []
-            ATNF_GBS     = []
-            ATNF_PERIODS = []
-            ATNF_FREQS   = []
-            ATNF_DMS     = []
-
-            # For each line in the file...
-            for line in self.catalogueFile.readlines():
-
-                GL = "0"
-                GB = "0"
-                P0 = "0"
-                F0 = "0"
-                DM = "0"
-
-                components = line.rstrip('\n').split(",")
-
-                if ( line.startswith("#,")):
-                    # Ingore header
-                    pass
-                else:
-
-                    # Example input data:
-                    #
-                    #   #,NAME,Gl (deg),Gb (deg),P0 (s),F0(Hz),DM
-                    #   1,J0006+1834,108.172,-42.985,0.693748,1.441446,12.00
-                    #   2,J0007+7303,119.660,10.463,0.315873,3.165827,*
-                    #   3,B0011+47,116.497,-14.631,1.240699,0.805997,30.85
-                    #   4,J0023+0923,111.383,-52.849,0.003050,327.868852,14.30
-                    #   5,B0021-72C,305.923,-44.892,0.005757,173.708219,24.60
-                    #
-                    #   Which when each line is split produces string arrays:
-                    #
-                    #   [ "1" , "J0006+1834" , "108.172" , "-42.985" , "0.693748" , "1.441446"   , "12.00" ]
-                    #   [ "2" , "J0007+7303" , "119.660" , "10.463"  , "0.315873" , "3.165827"   , "*"     ]
-                    #   [ "3" , "B0011+47"   , "116.497" , "-14.631" , "1.240699" , "0.805997"   , "30.85" ]
-                    #   [ "4" , "J0023+0923" , "111.383" , "-52.849" , "0.003050" , "327.868852" , "14.30" ]
-                    #   [ "5" , "B0021-72C"  , "305.923" , "-44.892" , "0.005757" , "173.708219" , "24.60" ]
-                    #
-                    #   So the data we are looking for is at index (assuming zero
-                    #   indexing) are at positions 2, 3, 4, 5, 6.
-
-                    if("*" not in components[2]):
-                        GL = components[2].strip()
-
-                    if("*" not in components[3]):
-                        GB = components[3].strip()
-
-                    if("*" not in components[4]):
-                        P0 = components[4].strip()
-
-                    if("*" not in components[5]):
-                        F0 = components[5].strip()
-
-                    if("*" not in components[6]):
-                        DM = components[6].strip()
-
-                    # Don't inlcude pulsars with missing parameters...
-                    if(float(P0) != 0 and float(F0) != 0 and float(DM) > 0 ):
-
-                        # Catalog GL values go from 0 - 360.
-                        if(float(GL) > 180):
-                            ATNF_GLS.append(m.radians(float(GL)-360))
-                        else:
-                            ATNF_GLS.append(m.radians(float(GL)))
-
-                        ATNF_GBS.append(m.radians(float(GB)))
-                        ATNF_PERIODS.append(float(P0))
-                        ATNF_FREQS.append(float(F0))
-                        ATNF_DMS.append(float(DM))
-
-            self.catalogueFile.close()
+            # Example input data:
+            #
+            #   #,NAME,Gl (deg),Gb (deg),P0 (s),F0(Hz),DM
+            #   1,J0006+1834,108.172,-42.985,0.693748,1.441446,12.00
+            #   2,J0007+7303,119.660,10.463,0.315873,3.165827,*
+            #   3,B0011+47,116.497,-14.631,1.240699,0.805997,30.85
+            #
+            #   The columns are found from the header row. An asterisk appears
+            #   in place of a missing entry in the catalog, and is stored as NaN.
+            columns = CSVCatalog(["GL","GB","P0","F0","DM"]).load(self.atnfCatalogPath)
+
+            # Don't inlcude pulsars with missing parameters...
+            complete = CatalogQuery("P0 != 0 && F0 != 0 && DM > 0").evaluate(columns)
+
+            # Catalog GL values go from 0 - 360. A missing position is plotted at 0.
+            GLS = np.nan_to_num(columns["GL"][complete])
+            GBS = np.nan_to_num(columns["GB"][complete])
+
+            ATNF_GLS     = np.radians(np.where(GLS > 180,GLS - 360,GLS))
+            ATNF_GBS     = np.radians(GBS)
+            ATNF_PERIODS = columns["P0"][complete]
+            ATNF_FREQS   = columns["F0"][complete]
+            ATNF_DMS     = columns["DM"][complete]
 
             # Print some details of the data collected...
             print "\n\t+----- ATNF DATA -----+"
 
-            print "\tGLs                : ", len(ATNF_GLS)    , " Mean: ", mean(ATNF_GLS) , \
-                " Min: ", min(ATNF_GLS) , " Max: ", max(ATNF_GLS) , \
-                " Zero elements: ", len(ATNF_GLS) - count_nonzero(ATNF_GLS)
+            catalogStats = CatalogStats().update({"GL": ATNF_GLS, "GB": ATNF_GBS, "P0": ATNF_PERIODS, "F0": ATNF_FREQS, "DM": ATNF_DMS})
+            catalogStats.printSummary([("GLs","GL"),
+                                       ("GBs","GB"),
+                                       ("Periods parsed","P0"),
+                                       ("Frequencies parsed","F0"),
+                                       ("DMs parsed","DM")])
 
-            print "\tGBs                : ", len(ATNF_GBS)    , " Mean: ", mean(ATNF_GBS) , \
-                " Min: ", min(ATNF_GBS) , " Max: ", max(ATNF_GBS) , \
-                " Zero elements: ", len(ATNF_GBS) - count_nonzero(ATNF_GBS)
+            # Now find the pulsar of the week!!
+            # J2302+4442 GL (deg): 103.395 GB (deg):-14.005
+            GL = 103.395
+            GB = -14.005
 
-            print "\tPeriods parsed     : ", len(ATNF_PERIODS) , " Mean: ", mean(ATNF_PERIODS) , \
-                " Min: ", min(ATNF_PERIODS) , " Max: ", max(ATNF_PERIODS) , \
-                " Zero elements: ", len(ATNF_PERIODS) - count_nonzero(ATNF_PERIODS)
+            # Only the one entry is read from the catalog database.
+            if(self.databasePath != ""):
+                powCatalog = RecordIndex(self.databasePath,verbose=self.verbose).catalog([self.pulsarName],["PSRJ","RAJ","DECJ","ELONG","ELAT"])
 
-            print "\tFrequencies parsed : ", len(ATNF_FREQS)   , " Mean: ", mean(ATNF_FREQS) , \
-                " Min: ", min(ATNF_FREQS) , " Max: ", max(ATNF_FREQS) ,\
-                " Zero elements: ", len(ATNF_FREQS) - count_nonzero(ATNF_FREQS)
+                if(len(powCatalog) == 0):
+                    print "\tPulsar not found in catalog database: ", self.pulsarName
+                    sys.exit()
 
-            print "\tDMs parsed         : ", len(ATNF_DMS)     , " Mean: ", mean(ATNF_DMS) , \
-                " Min: ", min(ATNF_DMS) , " Max: ", max(ATNF_DMS) , \
-                " Zero elements: ", len(ATNF_DMS) - count_nonzero(ATNF_DMS)
+                Coordinates().deriveColumns(powCatalog)
+                GL = powCatalog["GL"][0]
+                GB = powCatalog["GB"][0]
 
-            print "\tProducing plot..."
+                print "\t", powCatalog["PSRJ"][0], "GL (deg): ", GL, " GB (deg): ", GB
 
-            # OK, now produce the plot...
-            host = subplot(111, projection="aitoff")
-            #host = subplot(111, projection="hammer")
-            grid(True)
+            # Catalog GL values go from 0 - 360.
+            if(GL > 180):
+                GL = GL - 360
 
-            pulsar_bl, pulsarb = [ATNF_GLS, ATNF_GBS]
-            pulsarplot = host.scatter(pulsar_bl,pulsarb, c='blue', marker='.', s=1)
+            bl = m.radians(GL)
+            b  = m.radians(GB)
 
-            # Now plot the pulsar of the week!!
-            # J2302+4442 GL (deg): 103.395 GB (deg):-14.005
+            if(self.noPlot == False):
+                print "\tProducing plot..."
 
-            bl = m.radians(103.395)
-            b  = m.radians(-14.005)
+                # OK, now produce the plot...
+                host = plt.subplot(111, projection="aitoff")
+                #host = plt.subplot(111, projection="hammer")
+                plt.grid(True)
 
-            host.scatter(bl,b, c='red', marker='.', s=150)
+                pulsar_bl, pulsarb = [ATNF_GLS, ATNF_GBS]
+                pulsarplot = host.scatter(pulsar_bl,pulsarb, c='blue', marker='.', s=1)
 
-            plt.draw()
-            plt.show()
+                # Now plot the pulsar of the week!!
+                host.scatter(bl,b, c='red', marker='.', s=150)
+
+                plt.draw()
+                plotted = True
 
         else:
             print "Catalog file not found at: ", self.atnfCatalogPath
@@ -248,6 +235,15 @@ class PlotAitoff_Pulsar_J2302_PLUS_4442:
         print "\t**************************"
         print "\tDebug:",self.verbose
         print "\tPulsar catalog file path:",self.atnfCatalogPath
+        print "\tPulsar catalog database path:",self.databasePath
+        print "\tPulsar of the week:",self.pulsarName
+
+        if(self.importTimes):
+            printImportTimes()
+
+        # Shown last, as show() blocks until the plot is closed.
+        if(plotted):
+            plt.show()
 
         print "\tDone."
 
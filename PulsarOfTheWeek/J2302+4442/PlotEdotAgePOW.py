@@ -21,6 +21,23 @@
     |                                                                        |
     | -v (boolean) verbose debugging flag.                                   |
     |                                                                        |
+    | --imports (boolean) report the time taken to import heavy modules.     |
+    |                                                                        |
+    | --noplot (boolean) print the statistics only, without plotting.        |
+    |                                                                        |
+    | -d (string) full path to a ATNF pulsar catalog database (psrcat.db).   |
+    |             When given, the pulsar of the week is looked up in it      |
+    |             rather than using hard coded values.                       |
+    |                                                                        |
+    | -n (string) name of the pulsar of the week, default "J2302+4442".      |
+    |                                                                        |
+    | -t (int) print the N pulsars with the highest Edot, and the N oldest,  |
+    |          in place of keeping sorted copies of the CSV file.            |
+    |                                                                        |
+    | -r (int) read the CSV file this many rows at a time, and plot a 2D     |
+    |          histogram of Age against Edot rather than every point.        |
+    |          Memory use is then bounded, however large the file.           |
+    |                                                                        |
     **************************************************************************
     | License:                                                               |
     |                                                                        |
@@ -46,13 +63,23 @@ from numpy import median
 
 import numpy as np
 
-import matplotlib.pyplot as plt
+# Shared catalog tools, found in the Catalog directory of this repository.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","..","Catalog"))
+from RecordIndex import RecordIndex
+from CatalogStats import CatalogStats
+from CSVCatalog import CSVCatalog
+from Histogram2D import Histogram2D
+from PulsarCatalog import PulsarCatalog
+from LazyModule import LazyModule
+from LazyModule import printImportTimes
 
+# The ranges of AGE (yr) and EDOT (ergs/s) plotted.
+AGE_RANGE  = (1.0e2, 1.0e12)
+EDOT_RANGE = (1.0e27, 1.0e40)
 
-# Scipy Imports:
-from scipy import std
-from scipy import stats
-from scipy import arange
+# Heavy modules, imported only when first used.
+plt   = LazyModule("matplotlib.pyplot")
+stats = LazyModule("scipy.stats")
 
 # ******************************
 #
@@ -96,12 +123,24 @@ class PlotCSVData:
 
         # OPTIONAL ARGUMENTS
         parser.add_option("-v", action="store_true", dest="verbose",help='Verbose debugging flag (optional).',default=False)
+        parser.add_option("--imports", action="store_true", dest="importTimes",help='Report the time taken to import heavy modules (optional).',default=False)
+        parser.add_option("--noplot", action="store_true", dest="noPlot",help='Print statistics only, without plotting (optional).',default=False)
+        parser.add_option("-d", action="store", dest="databasePath",help='Path to a psrcat.db file (optional).',default="")
+        parser.add_option("-n", action="store", dest="pulsarName",help='Name of the pulsar of the week (optional).',default="J2302+4442")
+        parser.add_option("-r", action="store", dest="chunkRows",type="int",help='Rows read at a time, plotting a 2D histogram (optional).',default=0)
+        parser.add_option("-t", action="store", dest="topCount",type="int",help='Number of pulsars to list by Edot and Age (optional).',default=0)
 
         (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
 
         # Update variables with command line parameters.
         self.verbose        = args.verbose
+        self.importTimes    = args.importTimes
+        self.noPlot         = args.noPlot
         self.csvPath = args.csvPath
+        self.databasePath = args.databasePath
+        self.pulsarName = args.pulsarName
+        self.topCount = args.topCount
+        self.chunkRows = args.chunkRows
 
         # ****************************************
         #   Print command line arguments & Run
@@ -112,80 +151,95 @@ class PlotCSVData:
         print "\t**************************"
         print "\tDebug:",self.verbose
         print "\tParsed CSV file path:",self.csvPath
+        print "\tPulsar catalog database path:",self.databasePath
+        print "\tPulsar of the week:",self.pulsarName
+        print "\tTop pulsars listed:",self.topCount
+        print "\tRows per chunk:",self.chunkRows
 
         # Check arguments for validity...
-        if(os.path.isfile(self.csvPath) == False):
+        if(os.path.exists(self.csvPath) == False):
             print "\n\tYou must supply a valid csv file via the -a flag."
             sys.exit()
 
         # Now we know the input files exist...
 
-        # Read parsed pulsar catalog file, extract useful variables:
-        # Period, Frequency, DM, pulse width
-        self.csvFile = open(self.csvPath,'r') # Read only access
-
         # ****************************************
         #        File parsing section
         # ****************************************
 
-        # variables for data
-        NAMES         = []
-        GLS           = []
-        GBS           = []
-        P0            = []
-        P1            = []
-        F0            = []
-        DM            = []
-        BINARY        = []
-        BINARY_PERIOD = []
-        SemiMajor     = []
-        BINCOMP       = []
-        DIST          = []
-        DIST_DM       = []
-        AGE           = []
-        EDOT          = []
-        PMTOT         = []
-
-        for line in self.csvFile.readlines():
-
-            components = line.replace("*","NaN").rstrip('\n').split(",")
-
-            if ( line.startswith("#,NAME")):
-                # Ingore header
-                pass
-
-            else:
-
-                NAMES.append(components[1])
-                GLS.append(float(components[2]))
-                GBS.append(float(components[3]))
-                P0.append(float(components[4]))
-                P1.append(float(components[5]))
-                F0.append(float(components[6]))
-                DM.append(float(components[7]))
-                BINARY.append(components[8])
-                BINARY_PERIOD.append(components[9])
-                SemiMajor.append(float(components[10]))
-                BINCOMP.append(components[11])
-                DIST.append(float(components[12]))
-                DIST_DM.append(float(components[13]))
-                AGE.append(float(components[14]))
-                EDOT.append(float(components[15]))
-                PMTOT.append(float(components[16]))
-
-        self.csvFile.close()
+        # Only the columns plotted are loaded. Missing values ("*") are NaN.
+        usecols = ["NAME","AGE","EDOT"] if self.topCount > 0 else ["AGE","EDOT"]
+
+        if(self.chunkRows > 0):
+            # Only one chunk of rows is held at a time.
+            catalogStats, histogram, tops = self.accumulate(self.csvPath,usecols,self.chunkRows)
+            catalogStats.printSummary([("Ages parsed","AGE"),("Edots parsed","EDOT")])
+            print "\tPoints plotted: ", histogram.total(), " Points outside the plot: ", histogram.skipped
+        else:
+            catalog = CSVCatalog(usecols).load(self.csvPath)
+
+            AGE = catalog["AGE"]
+            EDOT = catalog["EDOT"]
+
+            CatalogStats().update(catalog,["AGE","EDOT"]).printSummary([("Ages parsed","AGE"),("Edots parsed","EDOT")])
+
+            # The catalog is not re-sorted, only the row indexes of the top
+            # pulsars are found.
+            tops = {}
+            if(self.topCount > 0):
+                for key in ["EDOT","AGE"]:
+                    tops[key] = catalog.select(catalog.top(key,self.topCount))
 
         powAge = [6190000000]
         powEDOT = [3.75E+033]
+
+        # Only the one entry is read from the catalog database.
+        if(self.databasePath != ""):
+            powCatalog = RecordIndex(self.databasePath,verbose=self.verbose).catalog([self.pulsarName],["PSRJ","P0","P1","F0","F1"])
+
+            if(len(powCatalog) == 0):
+                print "\tPulsar not found in catalog database: ", self.pulsarName
+                sys.exit()
+
+            powAge = powCatalog["AGE"].tolist()
+            powEDOT = powCatalog["EDOT"].tolist()
+
+            print "\t", powCatalog["PSRJ"][0], "Age (yr): ", powAge[0], " Edot: ", powEDOT[0]
+
+        if(self.topCount > 0):
+            for key, label in [("EDOT","Highest Edot"),("AGE","Oldest")]:
+                print "\n\t" + label + ":"
+                for row in range(len(tops[key])):
+                    print "\t\t", tops[key]["NAME"][row], " Age (yr): ", tops[key]["AGE"][row], " Edot: ", tops[key]["EDOT"][row]
+
+        if(self.noPlot):
+            if(self.importTimes):
+                printImportTimes()
+
+            print "\n\tDone."
+            print "\t**************************************************************************" # Used only for formatting purposes.
+            return
+
         print "\t1.1.1 Creating histogram for period samples..."
         #plt.hist(AGE, bins=self.freedmanDiaconisRule(AGE), color='w')
-        plt.scatter(AGE, EDOT)
+
+        if(self.chunkRows > 0):
+            plt.pcolormesh(histogram.xEdges,histogram.yEdges,np.ma.masked_equal(histogram.counts.T,0),cmap='Blues')
+            plt.colorbar(label="Pulsars")
+        else:
+            plt.scatter(AGE, EDOT)
+
         plt.yscale('log')
         plt.xscale('log')
         plt.title("Edot vs. Age")
         plt.xlabel("Age (yr)")
         plt.ylabel("Edot")
         plt.scatter(powAge, powEDOT,color='R')
+
+        # Reported before show(), which blocks until the plot is closed.
+        if(self.importTimes):
+            printImportTimes()
+
         plt.show()
 
         print "\n\tDone."
@@ -193,6 +247,54 @@ class PlotCSVData:
 
     # ****************************************************************************************************
 
+    def accumulate(self,path,usecols,chunkRows):
+        """
+        Reads a CSV file a chunk of rows at a time, accumulating the
+        statistics of AGE and EDOT, a 2D histogram of AGE against EDOT, and
+        (when NAME is loaded) the top pulsars by each.
+
+        Parameters:
+        path         -    the path to the CSV file, or to a converted store directory.
+        usecols      -    the parameter keys of the columns to load.
+        chunkRows    -    the number of rows in each chunk.
+
+        Returns:
+        a tuple (CatalogStats, Histogram2D, tops), where tops maps EDOT and
+        AGE to a PulsarCatalog of the top pulsars, in order.
+        """
+
+        catalogStats = CatalogStats()
+        histogram = Histogram2D(AGE_RANGE,EDOT_RANGE,bins=200,log=True)
+        tops = {}
+
+        for chunk in CSVCatalog(usecols).chunks(path,chunkRows):
+            catalogStats.update(chunk,["AGE","EDOT"])
+
+            # Only pulsars with an age and Edot can be placed on the log axes,
+            # so skipped counts only those outside the range of the plot.
+            with np.errstate(invalid='ignore'):
+                known = (chunk["AGE"] > 0) & (chunk["EDOT"] > 0)
+
+            histogram.update(chunk["AGE"][known],chunk["EDOT"][known])
+
+            # The top pulsars of the chunk are added to those found so far,
+            # and only the best of both kept.
+            if(self.topCount > 0):
+                for key in ["EDOT","AGE"]:
+                    best = chunk.select(chunk.top(key,self.topCount))
+
+                    if(key in tops):
+                        best = PulsarCatalog(dict((name, np.concatenate((tops[key][name],best[name]))) for name in usecols))
+
+                    tops[key] = best.select(best.top(key,self.topCount))
+
+            if(self.verbose):
+                print "\t\tRows read: ", catalogStats["AGE"].count + catalogStats["AGE"].nanCount
+
+        return catalogStats, histogram, tops
+
+    # ****************************************************************************************************
+
     def appendToFile(self,path,text):
         """
         Appends the provided text to the file at the specified path.